@@ -0,0 +1,107 @@
+"""
+Exact vs histogram gradient boosting on synthetic tables.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_engines --rows 3000 10000 30000 100000 300000 --output benchmarks/results/engines.json
+
+Prints one JSON line per (rows, engine) with preprocessing/fit/predict seconds
+and the holdout score. ``--output`` also writes them, with the run's platform
+and the fit speedup per size, to a JSON file; the checked-in
+benchmarks/results/engines.json is what ``HIST_GB_MIN_ROWS`` is set from.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from services.trainer import MODEL_MAP, make_preprocessor, engine_params
+
+
+def make_table(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Numeric and categorical features with 5% missing values and a binary target."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({f"num_{i}": rng.normal(size=n_rows) for i in range(8)})
+    df["city"] = rng.choice([f"city_{i}" for i in range(40)], size=n_rows)
+    df["segment"] = rng.choice(list("ABCDE"), size=n_rows)
+    logit = df["num_0"] - 0.5 * df["num_1"] + (df["segment"] == "C") * 1.5
+    df["target"] = (logit + rng.normal(scale=0.5, size=n_rows) > 0).astype(int)
+    for col in ["num_2", "num_3", "city"]:
+        df.loc[rng.random(n_rows) < 0.05, col] = np.nan
+    return df
+
+
+def bench(engine: str, df: pd.DataFrame) -> dict:
+    X, y = df.drop(columns=["target"]), df["target"].to_numpy()
+    split = int(len(df) * 0.8)
+
+    start = time.perf_counter()
+    preprocessor = make_preprocessor(engine).fit(X.iloc[:split])
+    Xt_train, Xt_test = preprocessor.transform(X.iloc[:split]), preprocessor.transform(X.iloc[split:])
+    preprocess_s = time.perf_counter() - start
+
+    estimator = MODEL_MAP[engine](**engine_params(engine, preprocessor))
+    start = time.perf_counter()
+    estimator.fit(Xt_train, y[:split])
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score = estimator.score(Xt_test, y[split:])
+    predict_s = time.perf_counter() - start
+
+    return {
+        "rows": len(df),
+        "engine": engine,
+        "preprocess_s": round(preprocess_s, 3),
+        "fit_s": round(fit_s, 3),
+        "predict_s": round(predict_s, 3),
+        "accuracy": round(float(score), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--engines", nargs="+",
+                        default=["GradientBoostingClassifier", "HistGradientBoostingClassifier"])
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    records, speedups = [], []
+    for n_rows in args.rows:
+        df = make_table(n_rows)
+        results = {engine: bench(engine, df) for engine in args.engines}
+        for result in results.values():
+            print(json.dumps(result), flush=True)
+        records += results.values()
+        if len(results) == 2:
+            exact, fast = results.values()
+            speedup = {
+                "rows": n_rows,
+                "fit_speedup": round(exact["fit_s"] / fast["fit_s"], 1),
+                "accuracy_delta": round(fast["accuracy"] - exact["accuracy"], 4),
+            }
+            print(json.dumps(speedup), flush=True)
+            speedups.append(speedup)
+
+    if args.output:
+        meta = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        }
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(
+            json.dumps({"meta": meta, "results": records, "speedups": speedups}, indent=2) + "\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
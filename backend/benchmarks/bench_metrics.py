@@ -0,0 +1,92 @@
+"""
+Classification metrics: separate sklearn calls vs the shared confusion-matrix engine.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_metrics --rows 1000000 5000000 --classes 2 10
+
+Prints one JSON line per (rows, classes) with the seconds of the sklearn path
+(classification_report + confusion_matrix + four *_score calls + class counts,
+as the tester used to do) and of ``classification_metrics``, after checking
+both give the same numbers.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import (
+    accuracy_score,
+    classification_report,
+    confusion_matrix,
+    f1_score,
+    precision_score,
+    recall_score,
+)
+
+from services.metrics import classification_metrics
+
+
+def make_labels(n_rows: int, n_classes: int, seed: int = 0):
+    """True labels and predictions that agree about 80% of the time."""
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(0, n_classes, size=n_rows)
+    y_pred = np.where(rng.random(n_rows) < 0.8, y_true, rng.integers(0, n_classes, size=n_rows))
+    return y_true, y_pred
+
+
+def sklearn_metrics(y_true, y_pred) -> dict:
+    return {
+        "classification_report": classification_report(y_true, y_pred, output_dict=True, zero_division=0),
+        "confusion_matrix": confusion_matrix(y_true, y_pred).tolist(),
+        "accuracy": float(accuracy_score(y_true, y_pred)),
+        "f1_macro": float(f1_score(y_true, y_pred, average="macro", zero_division=0)),
+        "precision_macro": float(precision_score(y_true, y_pred, average="macro", zero_division=0)),
+        "recall_macro": float(recall_score(y_true, y_pred, average="macro", zero_division=0)),
+        "class_distribution": pd.Series(y_true).value_counts().to_dict(),
+    }
+
+
+def check_equal(expected: dict, actual: dict) -> None:
+    assert expected["confusion_matrix"] == actual["confusion_matrix"]
+    assert expected["class_distribution"] == actual["class_distribution"]
+    for key in ("accuracy", "f1_macro", "precision_macro", "recall_macro"):
+        assert np.isclose(expected[key], actual[key]), key
+    for label, row in expected["classification_report"].items():
+        other = actual["classification_report"][label]
+        if isinstance(row, dict):
+            assert all(np.isclose(row[k], other[k]) for k in row), label
+        else:
+            assert np.isclose(row, other), label
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--classes", type=int, nargs="+", default=[2, 10])
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        for n_classes in args.classes:
+            y_true, y_pred = make_labels(n_rows, n_classes)
+            expected, sklearn_s = timed(sklearn_metrics, y_true, y_pred)
+            actual, engine_s = timed(classification_metrics, y_true, y_pred)
+            check_equal(expected, actual)
+            print(json.dumps({
+                "rows": n_rows,
+                "classes": n_classes,
+                "sklearn_s": round(sklearn_s, 3),
+                "engine_s": round(engine_s, 3),
+                "speedup": round(sklearn_s / engine_s, 1),
+            }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Response serialization: convert_numpy_types + FastAPI's encoder vs NumpyJSONResponse.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialization --classes 10 200 --predict-rows 100000
+
+Builds /train, /evaluate and /predict/batch payloads with the real services
+(``train_model``, ``evaluate_model``, ``predict_frame``) on synthetic data and
+prints one JSON line per payload with the milliseconds of the old path (recursive
+``convert_numpy_types``, then ``jsonable_encoder``, then Starlette's
+``JSONResponse.render``) and of ``NumpyJSONResponse.render``, after checking
+both produce the same JSON.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from services.predictor import predict_frame
+from services.serialization import NumpyJSONResponse
+from services.tester import evaluate_model
+from services.trainer import train_model
+
+
+def convert_numpy_types(obj):
+    """The helper trainer.py and tester.py used to apply to every result, kept as the baseline."""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    elif isinstance(obj, np.floating):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {key: convert_numpy_types(value) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_numpy_types(item) for item in obj]
+    elif hasattr(obj, 'item'):
+        return obj.item()
+    return obj
+
+
+def make_table(n_rows: int, n_classes: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({f"num_{i}": rng.normal(size=n_rows) for i in range(6)})
+    df["segment"] = rng.choice(list("ABCDE"), size=n_rows)
+    bucket = (df["num_0"].rank(pct=True) * n_classes).astype(int).clip(upper=n_classes - 1)
+    df["target"] = np.where(rng.random(n_rows) < 0.7, bucket, rng.integers(0, n_classes, size=n_rows))
+    return df
+
+
+def payloads(n_classes: int, predict_rows: int, cv_folds: int):
+    n_rows = max(20 * n_classes, 5000)
+    df = make_table(n_rows, n_classes)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "train.csv")
+        df.to_csv(path, index=False)
+        report, model = train_model(path, "target", "RandomForestClassifier",
+                                    model_params={"n_estimators": 20}, cv_folds=cv_folds)[:2]
+    evaluation = evaluate_model(model, df.drop(columns=["target"]), df["target"],
+                                task_type="classification", plot=False)
+    yield "train", {"job_id": "bench", "status": "completed", "result": {"metrics": report}}
+    yield "evaluate", {"evaluation_results": evaluation, "test_samples": n_rows}
+    scored = make_table(predict_rows, n_classes, seed=1).drop(columns=["target"])
+    yield "predict_batch", predict_frame(model, scored)
+
+
+def same_json(a, b) -> bool:
+    """Equal parsed JSON, floats up to the last digits (the encoders format them differently)."""
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(same_json(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(same_json(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return bool(np.isclose(a, b))
+    return a == b
+
+
+def legacy_render(content) -> bytes:
+    return JSONResponse(jsonable_encoder(convert_numpy_types(content))).body
+
+
+def timed(fn, content, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(content)
+        best = min(best, time.perf_counter() - start)
+    return body, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--classes", type=int, nargs="+", default=[10, 200])
+    parser.add_argument("--predict-rows", type=int, default=100_000)
+    parser.add_argument("--cv-folds", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for n_classes in args.classes:
+        for name, content in payloads(n_classes, args.predict_rows, args.cv_folds):
+            legacy_body, legacy_s = timed(legacy_render, content, args.repeat)
+            body, orjson_s = timed(lambda c: NumpyJSONResponse(c).body, content, args.repeat)
+            assert same_json(json.loads(legacy_body), json.loads(body)), name
+            print(json.dumps({
+                "payload": name,
+                "classes": n_classes,
+                "bytes": len(body),
+                "legacy_ms": round(legacy_s * 1000, 2),
+                "orjson_ms": round(orjson_s * 1000, 2),
+                "speedup": round(legacy_s / orjson_s, 1),
+            }))
+
+
+if __name__ == "__main__":
+    main()
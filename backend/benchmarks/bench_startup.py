@@ -0,0 +1,86 @@
+"""
+Cold start of the API process: import time, memory and time to the first /health.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_startup --runs 5 --output benchmarks/results/startup.json
+
+Every run is a fresh interpreter. Prints (and optionally writes) one JSON
+document with the median wall time of ``import main``, the peak RSS after the
+import, the time until ``/health`` has answered, and a breakdown of import
+time by top-level package from ``python -X importtime``. Also lists which heavy
+packages the import pulled in; scikit-learn, plotly, groq and matplotlib are
+expected to load only once an endpoint needs them.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+HEAVY_PACKAGES = ("sklearn", "scipy", "plotly", "groq", "matplotlib", "seaborn")
+
+PROBE = """
+import json, resource, sys, time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+import main
+import_s = time.perf_counter() - start
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    assert client.get("/health").status_code == 200
+health_s = time.perf_counter() - start
+heavy = sorted({m.split(".")[0] for m in sys.modules} & set(%r))
+print(json.dumps({"import_s": import_s, "rss_mb": rss_mb, "health_s": health_s, "heavy_loaded": heavy}))
+""" % (HEAVY_PACKAGES,)
+
+
+def probe(cwd: Path) -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=cwd, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_breakdown(cwd: Path, top: int) -> dict:
+    """Self time of every imported module summed per top-level package, in milliseconds."""
+    out = subprocess.run([sys.executable, "-W", "ignore", "-X", "importtime", "-c", "import main"],
+                         cwd=cwd, capture_output=True, text=True, check=True)
+    per_package = defaultdict(int)
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        per_package[name.strip().split(".")[0]] += int(self_us)
+    ranked = sorted(per_package.items(), key=lambda item: -item[1])[:top]
+    return {name: round(us / 1000, 1) for name, us in ranked}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Packages listed in the import breakdown")
+    parser.add_argument("--output", help="Also write the result to this JSON file")
+    args = parser.parse_args()
+
+    cwd = Path(__file__).resolve().parent.parent
+    runs = [probe(cwd) for _ in range(args.runs)]
+    result = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import_main_s": round(statistics.median(r["import_s"] for r in runs), 3),
+        "first_health_s": round(statistics.median(r["health_s"] for r in runs), 3),
+        "rss_after_import_mb": round(statistics.median(r["rss_mb"] for r in runs), 1),
+        "heavy_packages_loaded": runs[0]["heavy_loaded"],
+        "import_ms_by_package": import_breakdown(cwd, args.top),
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Synthetic datasets modeled on the diabetes schema, for the benchmarks.
+
+Every kind has the eight diabetes features (same ranges, zero-inflated
+Insulin/SkinThickness, skewed DiabetesPedigreeFunction and Age) and a binary
+``Outcome`` driven mostly by Glucose, BMI and Age:
+
+- ``numeric``: the diabetes columns only.
+- ``categorical``: plus low-cardinality string columns (Sex, Region, Smoker).
+- ``high_cardinality``: plus an ID-like PatientId and a ZipCode with thousands of values.
+- ``missing_heavy``: the categorical kind with about 30% of every feature missing.
+
+Files are written in chunks, so 10M-row datasets never sit in memory at once,
+and reused across runs from ``BENCH_DATA_DIR``.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATASET_KINDS = ("numeric", "categorical", "high_cardinality", "missing_heavy")
+BENCH_DATA_DIR = Path(os.getenv("AUTOML_BENCH_DATA_DIR", ".cache/bench"))
+WRITE_CHUNK_ROWS = 1_000_000
+MISSING_RATE = 0.3
+
+REGIONS = ["north", "south", "east", "west", "central", "coastal", "mountain", "islands"]
+SMOKER = ["never", "former", "current"]
+
+
+def diabetes_like(n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Numeric diabetes columns and the Outcome target."""
+    pregnancies = np.clip(rng.negative_binomial(1.6, 0.3, n_rows), 0, 17)
+    glucose = np.clip(rng.normal(121, 32, n_rows), 44, 199).round()
+    glucose[rng.random(n_rows) < 0.006] = 0
+    blood_pressure = np.clip(rng.normal(72, 12, n_rows), 24, 122).round()
+    blood_pressure[rng.random(n_rows) < 0.045] = 0
+    skin = np.clip(rng.normal(29, 10, n_rows), 7, 99).round()
+    skin[rng.random(n_rows) < 0.3] = 0
+    insulin = np.clip(rng.lognormal(4.8, 0.7, n_rows), 14, 846).round()
+    insulin[rng.random(n_rows) < 0.49] = 0
+    bmi = np.clip(rng.normal(32.4, 6.9, n_rows), 18, 67).round(1)
+    bmi[rng.random(n_rows) < 0.014] = 0
+    pedigree = np.clip(rng.lognormal(-0.95, 0.6, n_rows), 0.078, 2.42).round(3)
+    age = np.clip(21 + rng.exponential(12, n_rows), 21, 81).astype(int)
+
+    logit = (-9.2 + 0.035 * glucose + 0.09 * bmi + 0.015 * age
+             + 0.12 * pregnancies + 0.9 * pedigree)
+    outcome = (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype(int)
+    return pd.DataFrame({
+        "Pregnancies": pregnancies,
+        "Glucose": glucose,
+        "BloodPressure": blood_pressure,
+        "SkinThickness": skin,
+        "Insulin": insulin,
+        "BMI": bmi,
+        "DiabetesPedigreeFunction": pedigree,
+        "Age": age,
+        "Outcome": outcome,
+    })
+
+
+def make_chunk(kind: str, n_rows: int, rng: np.random.Generator, total_rows: int = 0) -> pd.DataFrame:
+    """``n_rows`` rows of ``kind``; ``total_rows`` sizes the ID and zip code ranges to the whole file."""
+    if kind not in DATASET_KINDS:
+        raise ValueError(f"Unknown dataset kind '{kind}'. Choose from {list(DATASET_KINDS)}")
+    df = diabetes_like(n_rows, rng)
+    if kind == "numeric":
+        return df
+
+    df.insert(len(df.columns) - 1, "Sex", rng.choice(["F", "M"], n_rows))
+    df.insert(len(df.columns) - 1, "Region", rng.choice(REGIONS, n_rows))
+    df.insert(len(df.columns) - 1, "Smoker", rng.choice(SMOKER, n_rows, p=[0.6, 0.25, 0.15]))
+
+    if kind == "high_cardinality":
+        total_rows = max(total_rows, n_rows)
+        # About two visits per patient and one zip code per ~20 rows, capped at 30k codes
+        patients = rng.integers(0, max(1, total_rows // 2), n_rows)
+        df.insert(0, "PatientId", pd.Series(patients).map("P{:08d}".format).to_numpy())
+        n_zip = min(30_000, max(10, total_rows // 20))
+        df.insert(len(df.columns) - 1, "ZipCode", (10_000 + rng.integers(0, n_zip, n_rows)).astype(str))
+    elif kind == "missing_heavy":
+        for col in df.columns.drop("Outcome"):
+            mask = rng.random(n_rows) < MISSING_RATE
+            df[col] = df[col].where(~mask)
+    return df
+
+
+def make_dataset(kind: str, n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """The whole dataset in memory (for small sizes)."""
+    return make_chunk(kind, n_rows, np.random.default_rng(seed), total_rows=n_rows)
+
+
+def dataset_path(kind: str, n_rows: int, data_dir: Path = BENCH_DATA_DIR) -> Path:
+    return Path(data_dir) / f"{kind}_{n_rows}.csv"
+
+
+def write_dataset(kind: str, n_rows: int, data_dir: Path = BENCH_DATA_DIR, seed: int = 0) -> Path:
+    """
+    Write (or reuse) the CSV for ``kind`` at ``n_rows`` rows.
+
+    Returns:
+        Path: The CSV file.
+    """
+    path = dataset_path(kind, n_rows, data_dir)
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", newline="") as f:
+        for offset in range(0, n_rows, WRITE_CHUNK_ROWS):
+            chunk = make_chunk(kind, min(WRITE_CHUNK_ROWS, n_rows - offset), rng, n_rows)
+            chunk.to_csv(f, index=False, header=offset == 0)
+    os.replace(tmp_path, path)
+    return path
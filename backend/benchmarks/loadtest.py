@@ -0,0 +1,278 @@
+"""
+HTTP load test of the API: concurrent users walking the whole pipeline.
+
+Run from the backend directory:
+
+    python -m benchmarks.loadtest --users 4 --iterations 2 --rows 10000
+    python -m benchmarks.loadtest --server --workers 2 --users 8
+    python -m benchmarks.loadtest --url http://localhost:8000 --users 8
+
+Each virtual user uploads its own copy of a synthetic dataset (see
+benchmarks/datasets.py) and walks /upload -> /analyze -> /clean ->
+/select-model -> /train, polling /jobs/{id} until the job is done, then
+/evaluate. Meanwhile a prober calls /health every ``--health-interval``
+seconds; its tail latency shows how long other requests block the event loop.
+
+By default the app runs in this process behind httpx's ASGI transport. The
+threadpool and the training processes are real, only the socket is skipped.
+``--server`` starts uvicorn with ``--workers`` processes and talks HTTP to it.
+In both cases the Groq client is a StubLLMClient (benchmarks/stub_app.py)
+that answers after ``--llm-latency`` seconds. ``--url`` targets a server that
+was started elsewhere. With several workers a training job is only known to
+the worker that accepted it. A /jobs poll that reaches another worker, for
+example over a new connection, comes back as a 404 error.
+
+The report lists count, errors, error rate, p50/p95/p99/max latency (ms) and
+throughput (req/s) per endpoint. It adds "train_job", the time from submit to
+completed for each run. ``--output`` writes it as JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from benchmarks.datasets import DATASET_KINDS, make_dataset
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TARGET = "Outcome"
+ENDPOINT_ORDER = ("/upload", "/analyze", "/clean", "/select-model", "/train", "/jobs/{id}",
+                  "train_job", "/evaluate", "/health")
+
+
+class PipelineError(Exception):
+    """A step of a pipeline run failed; the run is abandoned and counted as an error."""
+
+
+class Recorder:
+    """Latency and outcome of every request, per endpoint."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(list)
+
+    def add(self, endpoint: str, seconds: float, ok: bool, error: str = None) -> None:
+        self.samples[endpoint].append((seconds, ok))
+        if not ok and error and len(self.errors[endpoint]) < 5:
+            self.errors[endpoint].append(error)
+
+    def summary(self, wall_s: float) -> dict:
+        report = {}
+        names = [e for e in ENDPOINT_ORDER if e in self.samples] + sorted(set(self.samples) - set(ENDPOINT_ORDER))
+        for endpoint in names:
+            latencies = np.array([s for s, _ in self.samples[endpoint]]) * 1000
+            errors = sum(not ok for _, ok in self.samples[endpoint])
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            report[endpoint] = {
+                "count": len(latencies),
+                "errors": errors,
+                "error_rate": round(errors / len(latencies), 4),
+                "p50_ms": round(float(p50), 1),
+                "p95_ms": round(float(p95), 1),
+                "p99_ms": round(float(p99), 1),
+                "max_ms": round(float(latencies.max()), 1),
+                "throughput_rps": round(len(latencies) / wall_s, 3),
+                "sample_errors": self.errors.get(endpoint, []),
+            }
+        return report
+
+
+async def call(client: httpx.AsyncClient, recorder: Recorder, endpoint: str, method: str, url: str, **kwargs):
+    """Send one request, record it under ``endpoint`` and return the JSON body (PipelineError on failure)."""
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        recorder.add(endpoint, time.perf_counter() - start, False, f"{type(e).__name__}: {e}")
+        raise PipelineError(endpoint) from e
+    ok = response.status_code < 400
+    recorder.add(endpoint, time.perf_counter() - start, ok, None if ok else f"{response.status_code}: {response.text[:200]}")
+    if not ok:
+        raise PipelineError(endpoint)
+    return response.json()
+
+
+async def run_pipeline(client, recorder: Recorder, csv_bytes: bytes, name: str, args) -> None:
+    uploaded = await call(client, recorder, "/upload", "POST", "/upload",
+                          files={"file": (name, csv_bytes, "text/csv")})
+    filepath = uploaded["filepath"]
+    await call(client, recorder, "/analyze", "POST", "/analyze", json={"filepath": filepath})
+    cleaned = (await call(client, recorder, "/clean", "POST", "/clean", json={"filepath": filepath}))["cleaned_filepath"]
+    selection = await call(client, recorder, "/select-model", "POST", "/select-model",
+                           json={"filepath": cleaned, "target_column": TARGET})
+    model_name = args.model or selection["best_model"]["name"]
+
+    submitted = await call(client, recorder, "/train", "POST", "/train",
+                           json={"filepath": cleaned, "target_column": TARGET, "model_name": model_name})
+    started = time.perf_counter()
+    while True:
+        job = await call(client, recorder, "/jobs/{id}", "GET", f"/jobs/{submitted['job_id']}")
+        if job["status"] == "completed":
+            recorder.add("train_job", time.perf_counter() - started, True)
+            break
+        if job["status"] in ("failed", "cancelled"):
+            recorder.add("train_job", time.perf_counter() - started, False, f"{job['status']}: {job.get('error')}")
+            raise PipelineError("train_job")
+        await asyncio.sleep(args.poll_interval)
+
+    await call(client, recorder, "/evaluate", "POST", "/evaluate",
+               json={"model_path": job["result"]["model_path"], "test_data_path": cleaned, "target_column": TARGET})
+
+
+async def user_loop(client, recorder: Recorder, csv_bytes: bytes, user: int, args) -> None:
+    for iteration in range(args.iterations):
+        try:
+            await run_pipeline(client, recorder, csv_bytes, f"load_u{user}_i{iteration}.csv", args)
+        except PipelineError:
+            pass
+
+
+async def probe_health(client, recorder: Recorder, interval: float, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            await call(client, recorder, "/health", "GET", "/health")
+        except PipelineError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def drive(client, args, csv_bytes: bytes) -> dict:
+    recorder = Recorder()
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe_health(client, recorder, args.health_interval, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(user_loop(client, recorder, csv_bytes, user, args) for user in range(args.users)))
+    wall_s = time.perf_counter() - start
+    stop.set()
+    await prober
+    pipelines = args.users * args.iterations
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "wall_s": round(wall_s, 2),
+        "pipelines": pipelines,
+        "pipelines_per_min": round(pipelines / wall_s * 60, 2),
+        "endpoints": recorder.summary(wall_s),
+    }
+
+
+async def run_in_process(args, csv_bytes: bytes) -> dict:
+    """Serve ``main.app`` from this event loop, in a scratch working directory for uploads and caches."""
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ["AUTOML_STUB_LLM_LATENCY"] = str(args.llm_latency)
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from benchmarks.stub_app import app
+        from services.jobs import job_manager
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+                result = await drive(client, args, csv_bytes)
+        job_manager.shutdown()
+        os.chdir(BACKEND_DIR)
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_until_up(url: str, timeout: float) -> float:
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.perf_counter() - start < timeout:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not answer /health within {timeout}s")
+
+
+async def run_against_url(args, csv_bytes: bytes, url: str) -> dict:
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout) as client:
+        return await drive(client, args, csv_bytes)
+
+
+async def run_with_server(args, csv_bytes: bytes) -> dict:
+    """Start uvicorn serving benchmarks.stub_app:app and load it over HTTP."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as workdir:
+        env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR), "AUTOML_STUB_LLM_LATENCY": str(args.llm_latency)}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmarks.stub_app:app", "--host", "127.0.0.1",
+             "--port", str(port), "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=workdir, env=env,
+        )
+        try:
+            startup_s = await wait_until_up(url, timeout=120)
+            result = await run_against_url(args, csv_bytes, url)
+            result["server_startup_s"] = round(startup_s, 2)
+            return result
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def print_table(result: dict) -> None:
+    print(f"{result['pipelines']} pipelines in {result['wall_s']}s ({result['pipelines_per_min']} per minute)")
+    header = f"{'endpoint':<14}{'count':>7}{'err%':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'req/s':>9}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, s in result["endpoints"].items():
+        print(f"{endpoint:<14}{s['count']:>7}{s['error_rate'] * 100:>7.1f}{s['p50_ms']:>10}{s['p95_ms']:>10}"
+              f"{s['p99_ms']:>10}{s['max_ms']:>10}{s['throughput_rps']:>9}")
+    for endpoint, s in result["endpoints"].items():
+        for error in s["sample_errors"]:
+            print(f"  {endpoint}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=4, help="Concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=2, help="Pipeline runs per user")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows of the uploaded dataset")
+    parser.add_argument("--dataset", default="categorical", choices=DATASET_KINDS)
+    parser.add_argument("--model", help="Model to train (default: the /select-model pick)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds the stub LLM takes per call")
+    parser.add_argument("--health-interval", type=float, default=0.1)
+    parser.add_argument("--poll-interval", type=float, default=0.2, help="Seconds between /jobs polls")
+    parser.add_argument("--timeout", type=float, default=600, help="Per-request timeout in seconds")
+    parser.add_argument("--server", action="store_true", help="Run the app under uvicorn instead of in process")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --server")
+    parser.add_argument("--url", help="Load an already running server instead")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    csv_bytes = make_dataset(args.dataset, args.rows).to_csv(index=False).encode()
+    if args.url:
+        result = asyncio.run(run_against_url(args, csv_bytes, args.url))
+    elif args.server:
+        result = asyncio.run(run_with_server(args, csv_bytes))
+    else:
+        result = asyncio.run(run_in_process(args, csv_bytes))
+
+    print_table(result)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(result, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+``main.app`` with the Groq client replaced by a local ``StubLLMClient``.
+
+Used by the load test, in process or as ``uvicorn benchmarks.stub_app:app``
+(every uvicorn worker imports it, so every worker gets the stub). The stub
+answers every prompt with ``STUB_LLM_RESPONSE`` after
+``AUTOML_STUB_LLM_LATENCY`` seconds, mimicking the network round trip.
+"""
+import os
+
+from benchmarks.suite import STUB_LLM_RESPONSE
+from main import app
+from services.llm import StubLLMClient, set_llm_client
+
+STUB_LLM_LATENCY = float(os.getenv("AUTOML_STUB_LLM_LATENCY", "0.3"))
+
+set_llm_client(StubLLMClient(STUB_LLM_RESPONSE, latency=STUB_LLM_LATENCY))
+
+__all__ = ["app"]
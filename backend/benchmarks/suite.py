@@ -0,0 +1,250 @@
+"""
+Benchmark suite: every service on synthetic diabetes-like datasets at growing sizes.
+
+Run from the backend directory:
+
+    python -m benchmarks.suite --rows 10000 100000 --output benchmarks/results/baseline.json
+    python -m benchmarks.suite --rows 10000 100000 --compare benchmarks/results/baseline.json
+
+Cases (``--services``):
+
+- ``metadata``: ``compute_metadata``, the profiling done once at upload.
+- ``analyze``: ``analyze_dataset`` in auto mode with the upload's sidecar present.
+- ``clean``: ``clean_data`` in auto mode.
+- ``select``: ``select_model`` with the "proxy" and "llm" strategies.
+- ``train``: ``train_model`` for every ``MODEL_MAP`` entry (classifiers on
+  Outcome, regressors on Glucose).
+- ``evaluate``: dataset load + ``evaluate_model`` as /evaluate does it, and
+  ``evaluate_model_chunked``, for a model trained on the 10k-row file of the
+  same kind.
+
+Every case runs in a fresh interpreter so caches, imports and memory do not
+leak between cases. The LLM is a ``StubLLMClient`` and the LLM response cache
+is a throwaway file, so no network call is made. Wall time covers the service
+call only; ``peak_mb`` is the growth of peak RSS during the call (Linux resets
+the high-water mark through /proc/self/clear_refs; elsewhere the peak since
+start is used, and on Windows memory is not measured; see services/telemetry.py).
+
+``--output`` writes a JSON baseline (run metadata plus one record per case);
+``--compare`` reruns the same cases and exits with status 1 when a case got
+slower or hungrier than the baseline beyond ``--tolerance``.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.datasets import BENCH_DATA_DIR, DATASET_KINDS, write_dataset
+from services.telemetry import current_rss_bytes, peak_rss_bytes, reset_peak_rss
+
+SERVICES = ("metadata", "analyze", "clean", "select", "train", "evaluate")
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000, 10_000_000)
+CLASSIFICATION_TARGET = "Outcome"
+REGRESSION_TARGET = "Glucose"
+# Rows of the file the evaluate cases train their model on
+EVALUATE_TRAIN_ROWS = 10_000
+STUB_LLM_RESPONSE = json.dumps({
+    "target_column": CLASSIFICATION_TARGET,
+    "graphs": [{"type": "histogram", "columns": ["Glucose"]}, {"type": "box", "columns": ["BMI"]}],
+    "best_model": {"name": "RandomForestClassifier", "description": "stub"},
+    "other_options": [{"name": "LogisticRegression", "description": "stub"}],
+})
+
+
+def measure(fn, *args, **kwargs):
+    """Call ``fn`` and return (result, wall seconds, peak RSS growth in MB)."""
+    # Growth from the current RSS where the peak can be reset, else from the peak so far
+    before = current_rss_bytes() if reset_peak_rss() else peak_rss_bytes()
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    wall = time.perf_counter() - start
+    return result, wall, max(0.0, (peak_rss_bytes() - before) / 2**20)
+
+
+def run_case(case: dict) -> dict:
+    """Run one case in this process. Imports happen here, outside the measured call."""
+    from services.llm import StubLLMClient, set_llm_client
+
+    set_llm_client(StubLLMClient(STUB_LLM_RESPONSE, latency=case.get("llm_latency", 0.0)))
+    path = Path(case["path"])
+    service, variant = case["service"], case["variant"]
+    detail = {}
+
+    if service == "metadata":
+        from services.metadata import compute_metadata, remove_metadata
+
+        remove_metadata(path)
+        _, wall, peak = measure(compute_metadata, path)
+    elif service == "analyze":
+        from services.analyzer import analyze_dataset
+        from services.metadata import get_metadata
+
+        get_metadata(path)
+        result, wall, peak = measure(analyze_dataset, str(path), mode="auto")
+        detail["graphs"] = len(result.get("plotly_graphs", {}))
+    elif service == "clean":
+        from services.cleaner import clean_data
+
+        cleaned, wall, peak = measure(clean_data, str(path), mode="auto")
+        if cleaned:
+            Path(cleaned).unlink(missing_ok=True)
+    elif service == "select":
+        from services.metadata import get_metadata
+        from services.model_selector import select_model
+
+        get_metadata(path)
+        result, wall, peak = measure(select_model, str(path), CLASSIFICATION_TARGET, variant)
+        detail["best_model"] = result.get("best_model", {}).get("name")
+    elif service == "train":
+        from services.trainer import is_classification_model, train_model
+
+        target = CLASSIFICATION_TARGET if is_classification_model(variant) else REGRESSION_TARGET
+        (report, _), wall, peak = measure(train_model, str(path), target, variant)
+        detail["engine"] = report["meta"]["model"]
+        detail["score"] = round(float(report.get("accuracy", report.get("r2_score"))), 4)
+    elif service == "evaluate":
+        from services.dataset_cache import load_dataset
+        from services.tester import evaluate_model, evaluate_model_chunked
+        from services.trainer import train_model
+
+        _, model = train_model(case["train_path"], CLASSIFICATION_TARGET, "HistGradientBoostingClassifier")
+        if variant == "chunked":
+            result, wall, peak = measure(evaluate_model_chunked, model, str(path), CLASSIFICATION_TARGET)
+        else:
+            def evaluate_file():
+                df = load_dataset(path)
+                return evaluate_model(model, df.drop(columns=[CLASSIFICATION_TARGET]), df[CLASSIFICATION_TARGET])
+            result, wall, peak = measure(evaluate_file)
+        detail["accuracy"] = result.get("accuracy")
+    else:
+        raise ValueError(f"Unknown service '{service}'. Choose from {list(SERVICES)}")
+
+    return {"wall_s": round(wall, 4), "peak_mb": round(peak, 1), "detail": detail}
+
+
+def build_cases(services, kinds, rows, models, data_dir: Path) -> list:
+    from services.trainer import MODEL_MAP
+
+    cases = []
+    for n_rows in rows:
+        for kind in kinds:
+            base = {"dataset": kind, "rows": n_rows, "path": str(write_dataset(kind, n_rows, data_dir))}
+            variants = {
+                "metadata": ["auto"],
+                "analyze": ["auto"],
+                "clean": ["auto"],
+                "select": ["proxy", "llm"],
+                "train": [m for m in MODEL_MAP if not models or m in models],
+                "evaluate": ["full", "chunked"],
+            }
+            for service in services:
+                for variant in variants[service]:
+                    case = {**base, "service": service, "variant": variant}
+                    if service == "evaluate":
+                        case["train_path"] = str(write_dataset(kind, EVALUATE_TRAIN_ROWS, data_dir))
+                    case["id"] = f"{service}/{variant}/{kind}/{n_rows}"
+                    cases.append(case)
+    return cases
+
+
+def run_isolated(case: dict, timeout: float) -> dict:
+    """Run ``case`` in a fresh interpreter and return its record."""
+    record = {k: case[k] for k in ("id", "service", "variant", "dataset", "rows")}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "AUTOML_LLM_CACHE_PATH": os.path.join(tmp, "llm_cache.sqlite3")}
+        try:
+            out = subprocess.run([sys.executable, "-W", "ignore", "-m", "benchmarks.suite", "--case", json.dumps(case)],
+                                 capture_output=True, text=True, timeout=timeout, env=env,
+                                 cwd=Path(__file__).resolve().parent.parent)
+        except subprocess.TimeoutExpired:
+            return {**record, "status": "timeout", "wall_s": None, "peak_mb": None}
+    if out.returncode != 0:
+        error = (out.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return {**record, "status": "error", "wall_s": None, "peak_mb": None, "error": error}
+    return {**record, "status": "ok", **json.loads(out.stdout.strip().splitlines()[-1])}
+
+
+def run_metadata(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "rows": args.rows,
+        "datasets": args.datasets,
+        "services": args.services,
+        "timeout_s": args.timeout,
+    }
+
+
+def compare(results: list, baseline: dict, tolerance: float, min_seconds: float, min_mb: float) -> list:
+    """Cases slower or hungrier than in ``baseline`` by more than ``tolerance`` (and the absolute floors)."""
+    previous = {r["id"]: r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get(r["id"])
+        if old is None or old["status"] != "ok":
+            continue
+        if r["status"] != "ok":
+            regressions.append({"id": r["id"], "metric": "status", "baseline": "ok", "current": r["status"]})
+            continue
+        for metric, floor in (("wall_s", min_seconds), ("peak_mb", min_mb)):
+            if r[metric] > old[metric] * (1 + tolerance) and r[metric] - old[metric] > floor:
+                regressions.append({"id": r["id"], "metric": metric, "baseline": old[metric], "current": r[metric]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS))
+    parser.add_argument("--datasets", nargs="+", default=list(DATASET_KINDS), choices=DATASET_KINDS)
+    parser.add_argument("--services", nargs="+", default=list(SERVICES), choices=SERVICES)
+    parser.add_argument("--models", nargs="+", help="MODEL_MAP entries for the train cases (default: all)")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds before a case is recorded as a timeout")
+    parser.add_argument("--data-dir", default=str(BENCH_DATA_DIR))
+    parser.add_argument("--output", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown/memory growth")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--min-mb", type=float, default=10, help="Ignore memory growth smaller than this")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return
+
+    cases = build_cases(args.services, args.datasets, args.rows, args.models, Path(args.data_dir))
+    results = []
+    for case in cases:
+        record = run_isolated(case, args.timeout)
+        results.append(record)
+        print(json.dumps(record), flush=True)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps({"meta": run_metadata(args), "results": results}, indent=2) + "\n")
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()),
+                              args.tolerance, args.min_seconds, args.min_mb)
+        for regression in regressions:
+            print(f"REGRESSION {regression['id']} {regression['metric']}: "
+                  f"{regression['baseline']} -> {regression['current']}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
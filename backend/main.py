@@ -1,22 +1,36 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Body,APIRouter
+from fastapi import FastAPI, File, UploadFile, HTTPException, Body,APIRouter, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
 import os
-import shutil
+import logging
 import pandas as pd
 from pathlib import Path
-import numpy as np
-from typing import Optional
-import joblib
+from typing import Optional, List, Dict, Any, Literal
 
-# Import your existing services
-from services.analyzer import analyze_dataset
+# Import your existing services. Only modules that stay clear of scikit-learn,
+# plotly and groq are imported here so a new worker serves /health quickly; the
+# analysis, model selection, training and evaluation services are imported by
+# the endpoints that use them (see benchmarks/bench_startup.py).
 from services.cleaner import clean_data
-from services.model_selector import select_model
-from services.trainer import train_model
-from services.tester import evaluate_model
-
-app = FastAPI(title="AutoML API", version="1.0.0")
+from services.profiler import should_stream
+from services.dataset_cache import dataset_cache, load_dataset
+from services.llm import llm_cache
+from services.predictor import model_cache, load_model, predict_frame, warm_up_models
+from services.batcher import micro_batcher
+from services.metadata import compute_metadata, copy_and_hash, load_metadata, remove_metadata
+from services.jobs import job_manager, run_training_job, run_automl_job, QueueFullError
+from services.serialization import NumpyJSONResponse
+from services.telemetry import configure_logging, render_metrics, track_request
+
+# Structured logs (AUTOML_LOG_FORMAT=json|text) at AUTOML_LOG_LEVEL
+configure_logging()
+
+# Responses are rendered by orjson with NumPy/pandas support. Endpoints with large
+# result payloads return a NumpyJSONResponse themselves, which skips FastAPI's
+# jsonable_encoder pass so the payload is walked only once.
+app = FastAPI(title="AutoML API", version="1.0.0", default_response_class=NumpyJSONResponse)
 
 # CORS middleware for React
 app.add_middleware(
@@ -27,25 +41,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latency, status and peak RSS of every request, labelled by route template"""
+    with track_request(request.method) as info:
+        try:
+            response = await call_next(request)
+            info["status"] = response.status_code
+        finally:
+            route = request.scope.get("route")
+            info["endpoint"] = route.path if route is not None else "unmatched"
+    return response
+
 # Create uploads directory
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Upper bound on hyperparameter search trials a single /train request may ask for
+MAX_TUNING_TRIALS = int(os.getenv("AUTOML_MAX_TUNING_TRIALS", "200"))
+
+def resolve_upload_path(path: str) -> Path:
+    """Map a client-supplied path, with or without the uploads/ prefix, into UPLOAD_DIR"""
+    return UPLOAD_DIR / Path(path).name
+
 # Request models
 class AnalyzeRequest(BaseModel):
     filepath: str
+    mode: Optional[str] = "auto"  # "full", "chunked", "approximate" or "auto"
 
 class CleanRequest(BaseModel):
     filepath: str
+    mode: Optional[str] = "auto"  # "full", "chunked", "approximate" or "auto"
 
 class ModelSelectionRequest(BaseModel):
     filepath: str
     target_column: str
+    strategy: Optional[str] = "llm"  # "llm", "proxy" or "auto" (proxy with LLM fallback)
 class TrainingRequest(BaseModel):
     filepath: str
     target_column: str
     model_name: str
     test_size: Optional[float] = 0.2
+    model_params: Optional[Dict[str, Any]] = None
+    # Hyperparameter search, same values as services.tuning.SEARCH_MODES
+    search: Optional[Literal["random", "bayesian"]] = None
+    n_trials: int = Field(20, ge=1, le=MAX_TUNING_TRIALS)
+    time_budget_s: Optional[float] = None
+    cv_folds: Optional[int] = None  # K-fold cross-validation on top of the holdout split
     
     class Config:
         schema_extra = {
@@ -56,11 +98,29 @@ class TrainingRequest(BaseModel):
                 "test_size": 0.2
             }
         }
+class AutoMLRequest(BaseModel):
+    filepath: str
+    target_column: str
+    test_size: Optional[float] = 0.2
+    eta: Optional[int] = 2
+    time_budget_s: Optional[float] = None
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "filepath": "diabetes_cleaned.csv",
+                "target_column": "Outcome",
+                "test_size": 0.2,
+                "eta": 2,
+                "time_budget_s": 300
+            }
+        }
 class EvaluationRequest(BaseModel):
     model_path: str
     test_data_path: str
     target_column: str
     task_type: Optional[str] = None
+    mode: Optional[str] = "auto"  # "full", "chunked" or "auto"
     
     class Config:
         schema_extra = {
@@ -73,6 +133,25 @@ class EvaluationRequest(BaseModel):
         }
 
 
+class PredictionRequest(BaseModel):
+    model_path: str
+    rows: List[Dict[str, Any]]
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "model_path": "trained_RandomForestClassifier_diabetes_Outcome.joblib",
+                "rows": [{"Pregnancies": 6, "Glucose": 148, "BloodPressure": 72, "SkinThickness": 35,
+                          "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627, "Age": 50}]
+            }
+        }
+
+
+def check_target_column(filepath: Path, target_column: str) -> None:
+    """Reject an unknown target before queueing a job, using the metadata sidecar if it is current"""
+    metadata = load_metadata(filepath)
+    if metadata is not None and target_column not in metadata["columns"]:
+        raise ValueError(f"Target column '{target_column}' not found in dataset. Available columns: {metadata['columns']}")
 
 @app.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
@@ -82,13 +161,25 @@ async def upload_file(file: UploadFile = File(...)):
     
     file_path = UPLOAD_DIR / file.filename
     
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Drop the parsed copy and metadata of a previous upload with the same name
+    remove_metadata(file_path)
+    content_hash = await run_in_threadpool(copy_and_hash, file.file, file_path)
+    dataset_cache.invalidate(file_path)
+
+    # Profile the file once; schema and sample questions are answered from the sidecar
+    try:
+        metadata = await run_in_threadpool(compute_metadata, file_path, content_hash)
+    except Exception as e:
+        logging.warning(f"Could not compute metadata for {file_path}: {e}")
+        metadata = None
     
     return {
         "filename": file.filename,
         "filepath": str(file_path),
-        "message": "File uploaded successfully"
+        "message": "File uploaded successfully",
+        "content_hash": content_hash,
+        "n_rows": metadata["n_rows"] if metadata else None,
+        "n_columns": metadata["n_columns"] if metadata else None,
     }
 
 @app.post("/analyze")
@@ -102,8 +193,15 @@ async def analyze_data(request: AnalyzeRequest):
         if not absolute_path.exists():
             raise HTTPException(status_code=404, detail=f"File not found: {absolute_path}")
         
-        results = analyze_dataset(str(absolute_path))
-        return results
+        from services.analyzer import analyze_dataset
+
+        # Run off the event loop so other requests are served meanwhile
+        results = await run_in_threadpool(analyze_dataset, str(absolute_path), mode=request.mode or "auto")
+        return NumpyJSONResponse(results)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -112,11 +210,13 @@ async def analyze_data(request: AnalyzeRequest):
 async def clean_dataset(request: CleanRequest):
     """Clean the dataset"""
     try:
-        cleaned_path = clean_data(request.filepath)
+        cleaned_path = await run_in_threadpool(clean_data, request.filepath, mode=request.mode or "auto")
         return {
             "cleaned_filepath": cleaned_path,
             "message": "Data cleaned successfully"
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -124,7 +224,7 @@ async def clean_dataset(request: CleanRequest):
 async def select_best_model(request: ModelSelectionRequest):
     """Select the best model for the dataset"""
     try:
-        print(f"Received model selection request for: {request.filepath}, target: {request.target_column}")
+        logging.info("Model selection requested", extra={"path": request.filepath, "target_column": request.target_column})
         
         # Normalize the filepath to avoid double uploads folder
         filepath = request.filepath
@@ -142,60 +242,60 @@ async def select_best_model(request: ModelSelectionRequest):
         if not input_file_path.is_absolute():
             input_file_path = UPLOAD_DIR / input_file_path.name
         
-        print(f"Normalized filepath: {filepath}")
-        print(f"Looking for file at: {input_file_path.absolute()}")
+        logging.debug(f"Normalized filepath: {filepath}")
+        logging.debug(f"Looking for file at: {input_file_path.absolute()}")
         
         # Check if file exists
         if not input_file_path.exists():
             # Try alternative path construction
             alternative_path = UPLOAD_DIR / Path(request.filepath).name
-            print(f"Trying alternative path: {alternative_path.absolute()}")
+            logging.debug(f"Trying alternative path: {alternative_path.absolute()}")
             
             if alternative_path.exists():
                 input_file_path = alternative_path
-                print(f"Found file at alternative path: {input_file_path.absolute()}")
+                logging.debug(f"Found file at alternative path: {input_file_path.absolute()}")
             else:
                 raise HTTPException(
                     status_code=404, 
                     detail=f"File not found at: {input_file_path.absolute()} or {alternative_path.absolute()}"
                 )
         
-        print("File found, calling select_model...")
-        model_suggestions = select_model(str(input_file_path), request.target_column)
+        from services.model_selector import select_model
+
+        model_suggestions = await run_in_threadpool(
+            select_model, str(input_file_path), request.target_column, request.strategy or "llm"
+        )
         
         if not model_suggestions:
             raise HTTPException(status_code=500, detail="Model selection failed - no suggestions returned")
         
-        print(f"Model selection completed: {model_suggestions.get('best_model', {}).get('name', 'Unknown')}")
+        logging.info("Model selection completed", extra={"best_model": model_suggestions.get("best_model", {}).get("name")})
         return model_suggestions
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
     except ValueError as e:
-        print(f"Validation error: {str(e)}")
+        logging.warning(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
     except FileNotFoundError as e:
-        print(f"File not found error: {str(e)}")
+        logging.warning(f"File not found error: {e}")
         raise HTTPException(status_code=404, detail=f"File not found: {str(e)}")
     except Exception as e:
-        print(f"Error in select_best_model: {str(e)}")
+        logging.exception(f"Error in select_best_model: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-
-import numpy as np
-
 @app.post("/train")
 async def train_selected_model(request: TrainingRequest):
-    """Train the selected model"""
+    """Queue training of the selected model and return the job ID right away"""
     try:
         # --- KEY CHANGE: Unify path logic using pathlib ---
         # No need to check if it starts with 'uploads/', this handles both cases.
         filename = Path(request.filepath).name
         input_file_path = UPLOAD_DIR / filename
 
-        print(f"Looking for file at: {input_file_path}")
+        logging.debug(f"Looking for file at: {input_file_path}")
 
         if not input_file_path.exists():
             raise HTTPException(
@@ -203,16 +303,13 @@ async def train_selected_model(request: TrainingRequest):
                 detail=f"File not found: {input_file_path}"
             )
 
-        print("File found, calling train_model...")
-        metrics, trained_model = train_model(
-            filepath=str(input_file_path),
-            target_column=request.target_column,
-            model_name=request.model_name,
-            test_size=getattr(request, 'test_size', 0.2)
-        )
+        from services.trainer import MODEL_MAP
 
-        if trained_model is None:
-            raise HTTPException(status_code=500, detail="Model training failed unexpectedly.")
+        if request.model_name not in MODEL_MAP:
+            raise ValueError(f"Unsupported model '{request.model_name}'. Choose from {list(MODEL_MAP.keys())}")
+        check_target_column(input_file_path, request.target_column)
+        if request.cv_folds is not None and request.cv_folds < 2:
+            raise ValueError("cv_folds must be at least 2")
 
         # --- KEY CHANGE: Simplified and robust model saving ---
         # Create a clear model filename
@@ -220,37 +317,143 @@ async def train_selected_model(request: TrainingRequest):
         
         # Define the full, absolute path to save the model
         model_save_path = UPLOAD_DIR / model_filename
-        
-        # Save the model
-        joblib.dump(trained_model, model_save_path)
-        print(f"Model trained and saved to: {model_save_path}")
 
         # For the API response, return a simple relative path string that the frontend can use.
         relative_model_path = f"uploads/{model_filename}"
 
+        def build_result(metrics):
+            return {
+                "message": "Model trained successfully",
+                "metrics": metrics,
+                "model_path": relative_model_path, # Simple string path for frontend
+                "model_filename": model_filename,
+                "model_name": request.model_name,
+                "target_column": request.target_column
+            }
+
+        # Training runs in a worker process, the event loop stays free for other requests
+        job_id = job_manager.submit(
+            run_training_job,
+            str(input_file_path),
+            request.target_column,
+            request.model_name,
+            getattr(request, 'test_size', 0.2),
+            model_params=request.model_params,
+            search=request.search,
+            n_trials=request.n_trials,
+            time_budget_s=request.time_budget_s,
+            cv_folds=request.cv_folds,
+            # The job writes a temporary file that replaces this one on success
+            artifact_path=str(model_save_path),
+            finalize=build_result,
+        )
+        job = job_manager.get(job_id)
+
         return {
-            "message": "Model trained successfully",
-            "metrics": metrics,
-            "model_path": relative_model_path, # Simple string path for frontend
-            "model_filename": model_filename,
+            "message": "Training job submitted",
+            "job_id": job_id,
+            "status": job["status"],
+            "queue_position": job["queue_position"],
             "model_name": request.model_name,
             "target_column": request.target_column
         }
 
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except ValueError as e:
-        # This will now catch ValueErrors from your trainer, like from train_test_split
-        print(f"Validation error in training: {e}")
+        logging.warning(f"Validation error in training: {e}")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         # General catch-all for other unexpected errors
-        print(f"An unexpected error occurred in /train: {e}")
+        logging.exception(f"An unexpected error occurred in /train: {e}")
+        raise HTTPException(status_code=500, detail=f"An internal server error occurred: {e}")
+
+@app.post("/automl")
+async def run_automl_race(request: AutoMLRequest):
+    """Queue a successive-halving race over all eligible models and return the job ID"""
+    try:
+        filename = Path(request.filepath).name
+        input_file_path = UPLOAD_DIR / filename
+        if not input_file_path.exists():
+            raise HTTPException(status_code=404, detail=f"File not found: {input_file_path}")
+        if request.eta is None or request.eta < 2:
+            raise ValueError("eta must be at least 2")
+        if request.time_budget_s is not None and request.time_budget_s <= 0:
+            raise ValueError("time_budget_s must be positive")
+        check_target_column(input_file_path, request.target_column)
+
+        model_filename = f"automl_{Path(filename).stem}_{request.target_column}.joblib"
+        model_save_path = UPLOAD_DIR / model_filename
+        relative_model_path = f"uploads/{model_filename}"
+
+        def build_result(report):
+            return {
+                "message": "AutoML race finished",
+                **report,
+                "model_path": relative_model_path,
+                "model_filename": model_filename,
+                "model_name": report["best_model"],
+                "target_column": request.target_column
+            }
+
+        job_id = job_manager.submit(
+            run_automl_job,
+            str(input_file_path),
+            request.target_column,
+            request.test_size if request.test_size is not None else 0.2,
+            request.eta,
+            time_budget_s=request.time_budget_s,
+            artifact_path=str(model_save_path),
+            finalize=build_result,
+        )
+        job = job_manager.get(job_id)
+
+        return {
+            "message": "AutoML job submitted",
+            "job_id": job_id,
+            "status": job["status"],
+            "queue_position": job["queue_position"],
+            "target_column": request.target_column
+        }
+
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.exception(f"An unexpected error occurred in /automl: {e}")
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {e}")
 
+@app.get("/jobs")
+async def list_jobs():
+    """List training jobs and the state of the worker pool"""
+    return NumpyJSONResponse({"jobs": job_manager.list(), "pool": job_manager.stats()})
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Report status, queue position and result of a training job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return NumpyJSONResponse(job)
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running training job"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return NumpyJSONResponse(job)
+
 @app.post("/evaluate")
 async def evaluate_trained_model(request: EvaluationRequest):
     """Evaluate a trained model"""
     try:
-        print(f"Received evaluation request for model: {request.model_path}")
+        logging.info("Evaluation requested", extra={"model_path": request.model_path, "test_data_path": request.test_data_path})
         
         # Normalize model path to avoid double uploads folder
         model_path = request.model_path
@@ -275,19 +478,17 @@ async def evaluate_trained_model(request: EvaluationRequest):
         if not test_file_path.is_absolute():
             test_file_path = UPLOAD_DIR / test_file_path.name
         
-        print(f"Normalized model path: {model_path}")
-        print(f"Normalized test data path: {test_data_path}")
-        print(f"Looking for model at: {model_file_path.absolute()}")
-        print(f"Looking for test data at: {test_file_path.absolute()}")
+        logging.debug(f"Looking for model at: {model_file_path.absolute()}")
+        logging.debug(f"Looking for test data at: {test_file_path.absolute()}")
         
         # Check if model file exists with fallback
         if not model_file_path.exists():
             alternative_model_path = UPLOAD_DIR / Path(request.model_path).name
-            print(f"Trying alternative model path: {alternative_model_path.absolute()}")
+            logging.debug(f"Trying alternative model path: {alternative_model_path.absolute()}")
             
             if alternative_model_path.exists():
                 model_file_path = alternative_model_path
-                print(f"Found model at alternative path: {model_file_path.absolute()}")
+                logging.debug(f"Found model at alternative path: {model_file_path.absolute()}")
             else:
                 raise HTTPException(
                     status_code=404, 
@@ -297,72 +498,86 @@ async def evaluate_trained_model(request: EvaluationRequest):
         # Check if test data file exists with fallback
         if not test_file_path.exists():
             alternative_test_path = UPLOAD_DIR / Path(request.test_data_path).name
-            print(f"Trying alternative test data path: {alternative_test_path.absolute()}")
+            logging.debug(f"Trying alternative test data path: {alternative_test_path.absolute()}")
             
             if alternative_test_path.exists():
                 test_file_path = alternative_test_path
-                print(f"Found test data at alternative path: {test_file_path.absolute()}")
+                logging.debug(f"Found test data at alternative path: {test_file_path.absolute()}")
             else:
                 raise HTTPException(
                     status_code=404, 
                     detail=f"Test data file not found at: {test_file_path.absolute()} or {alternative_test_path.absolute()}"
                 )
         
-        # Load model
-        import joblib
-        model = joblib.load(model_file_path)
-        print("Model loaded successfully")
-        
-        # Load test data
-        df_test = pd.read_csv(test_file_path)
-        print(f"Test data loaded: {df_test.shape}")
+        from services.tester import evaluate_model, evaluate_model_chunked, CHUNKED_EVALUATE_MB
+        from services.preprocessing import has_fitted_preprocessing, legacy_prepare_features
+
+        # Load model (served from memory if it was used recently)
+        model = await run_in_threadpool(load_model, model_file_path)
         
-        if request.target_column not in df_test.columns:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Target column '{request.target_column}' not found in test data. Available columns: {list(df_test.columns)}"
+        mode = request.mode or "auto"
+        if mode == "auto":
+            mode = "chunked" if should_stream(test_file_path, threshold_mb=CHUNKED_EVALUATE_MB) else "full"
+        if mode not in ("full", "chunked"):
+            raise ValueError(f"Unknown evaluation mode: {mode}")
+
+        if mode == "chunked":
+            # Stream the test file through running metric accumulators, memory stays bounded
+            logging.info(f"Evaluating model on {test_file_path.name} in chunks")
+            results = await run_in_threadpool(
+                evaluate_model_chunked, model, str(test_file_path), request.target_column,
+                task_type=request.task_type,
             )
+            test_samples = results["meta"]["test_samples"]
+        else:
+            # Load test data; parsing (or the cache lookup) runs off the event loop
+            df_test = await run_in_threadpool(load_dataset, test_file_path)
+            logging.debug(f"Test data loaded: {df_test.shape}")
+            
+            if request.target_column not in df_test.columns:
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Target column '{request.target_column}' not found in test data. Available columns: {list(df_test.columns)}"
+                )
+            
+            # Prepare test data; the target itself is never imputed
+            df_test = df_test.dropna(subset=[request.target_column])
+            X_test = df_test.drop(columns=[request.target_column])
+            y_test = df_test[request.target_column]
+            
+            # Models trained by /train apply their own fitted preprocessing
+            if not has_fitted_preprocessing(model):
+                X_test = await run_in_threadpool(legacy_prepare_features, X_test, model)
+                y_test = y_test.loc[X_test.index]
+            
+            if len(X_test) == 0:
+                raise HTTPException(status_code=400, detail="No valid test samples after preprocessing")
+            
+            logging.info(f"Evaluating model on {len(X_test)} test samples")
+            results = await run_in_threadpool(
+                evaluate_model, model, X_test, y_test, task_type=request.task_type, plot=False
+            )
+            test_samples = len(X_test)
         
-        # Prepare test data (same preprocessing as training)
-        X_test = df_test.drop(columns=[request.target_column])
-        y_test = df_test[request.target_column]
-        
-        # Apply same preprocessing as in training
-        X_test = pd.get_dummies(X_test)
-        X_test.replace([np.inf, -np.inf], np.nan, inplace=True)
-        
-        # Handle missing values by dropping or filling
-        valid_idx = X_test.dropna().index
-        X_test = X_test.loc[valid_idx]
-        y_test = y_test.loc[valid_idx]
-        
-        if len(X_test) == 0:
-            raise HTTPException(status_code=400, detail="No valid test samples after preprocessing")
-        
-        print(f"Evaluating model on {len(X_test)} test samples...")
-        results = evaluate_model(model, X_test, y_test, task_type=request.task_type, plot=False)
-        
-        print("Model evaluation completed successfully")
-        
-        return {
+        return NumpyJSONResponse({
             "evaluation_results": results,
-            "test_samples": len(X_test),
+            "test_samples": test_samples,
             "model_used": str(model_file_path.name),
             "test_data_used": str(test_file_path.name),
             "message": "Model evaluation completed successfully"
-        }
+        })
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
     except ValueError as e:
-        print(f"Validation error: {str(e)}")
+        logging.warning(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
     except FileNotFoundError as e:
-        print(f"File not found error: {str(e)}")
+        logging.warning(f"File not found error: {e}")
         raise HTTPException(status_code=404, detail=f"File not found: {str(e)}")
     except Exception as e:
-        print(f"Error in evaluate_trained_model: {str(e)}")
+        logging.exception(f"Error in evaluate_trained_model: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
@@ -371,10 +586,83 @@ async def evaluate_trained_model(request: EvaluationRequest):
 
 
 
+@app.post("/predict")
+async def predict(request: PredictionRequest):
+    """Score JSON rows with a trained model"""
+    model_file_path = resolve_upload_path(request.model_path)
+    if not model_file_path.exists():
+        raise HTTPException(status_code=404, detail=f"Model file not found: {model_file_path}")
+    if not request.rows:
+        raise HTTPException(status_code=400, detail="No rows to score")
+    try:
+        if len(request.rows) <= micro_batcher.max_batch_rows:
+            # Small requests are coalesced with concurrent ones for the same model
+            result = await micro_batcher.submit(model_file_path, request.rows)
+        else:
+            model = await run_in_threadpool(load_model, model_file_path)
+            result = await run_in_threadpool(predict_frame, model, pd.DataFrame(request.rows))
+        result["model_used"] = model_file_path.name
+        return NumpyJSONResponse(result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
+    except Exception as e:
+        logging.exception(f"Error in predict: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.get("/predict/stats")
+async def prediction_stats():
+    """Report micro-batching queue depth and batch sizes"""
+    return micro_batcher.stats()
+
+@app.post("/predict/batch")
+async def predict_batch(model_path: str = Form(...), file: UploadFile = File(...)):
+    """Score an uploaded CSV batch with a trained model"""
+    model_file_path = resolve_upload_path(model_path)
+    if not model_file_path.exists():
+        raise HTTPException(status_code=404, detail=f"Model file not found: {model_file_path}")
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    try:
+        model = await run_in_threadpool(load_model, model_file_path)
+        df = await run_in_threadpool(pd.read_csv, file.file)
+        result = await run_in_threadpool(predict_frame, model, df)
+        result["model_used"] = model_file_path.name
+        return NumpyJSONResponse(result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
+    except Exception as e:
+        logging.exception(f"Error in predict_batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Report hit/miss counters of the parsed-dataset and LLM response caches"""
+    return {
+        "datasets": dataset_cache.stats(),
+        "llm": llm_cache.stats(),
+        "models": model_cache.stats(),
+    }
+
+@app.on_event("startup")
+def warm_up():
+    # AUTOML_WARM_MODELS: "all" or a comma-separated list of artifact filenames
+    names = os.getenv("AUTOML_WARM_MODELS")
+    if names:
+        warm_up_models(UPLOAD_DIR, names)
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    job_manager.shutdown()
+
 @app.get("/health")
 async def health_check():
     return {"status": "AutoML API is running"}
 
+@app.get("/metrics")
+async def metrics():
+    """Stage, request and job histograms in the Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
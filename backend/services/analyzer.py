@@ -1,17 +1,28 @@
-import os
 import logging
 import pandas as pd
-from dotenv import load_dotenv
-from groq import Groq
-import plotly.express as px
 import plotly.io as pio
 import json
+import time
+from typing import Optional
+
+from services.dataset_cache import load_dataset
+from services.profiler import profile_csv, should_stream, PROFILE_CHUNKSIZE
+from services.metadata import load_metadata, load_sample
+from services.plots import bar_figure, histogram_figure, scatter_figure, box_figure, PLOT_POINT_BUDGET
+from services.llm import (
+    get_llm_client,
+    llm_cache,
+    llm_fingerprint,
+    submit_llm_call,
+    wait_llm_result,
+    LLM_MODEL,
+    LLM_TIMEOUT_SECONDS,
+)
+from services.telemetry import stage
 
-load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+ANALYZE_MODES = ("auto", "full", "chunked", "approximate")
 
 PROMPT_TEMPLATE = """
 You are an expert data analyst. Here's the dataset summary:
@@ -30,28 +41,41 @@ Please:
   }}
 """
 
-def call_llm_for_graphs(summary: str) -> dict:
+def call_llm_for_graphs(summary: str, schema: Optional[dict] = None) -> dict:
     """
     Calls LLM to get target column guess and graph suggestions.
     Returns a dict with keys: target_column, graphs (list of dicts).
+
+    Responses are cached on disk, keyed by the schema and a hash of the summary,
+    so structurally identical datasets skip the network round trip.
     """
+    cache_key = llm_fingerprint("graphs", template=PROMPT_TEMPLATE, schema=schema, summary=summary)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        logging.info("Using cached LLM graph suggestions")
+        return cached
+    groq_client = get_llm_client()
     if not groq_client:
         logging.warning("No LLM client available. Skipping LLM suggestions.")
         return {}
     prompt = PROMPT_TEMPLATE.format(summary=summary)
     try:
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=512,
-        )
+        with stage("llm_call", model=LLM_MODEL, kind="graphs"):
+            response = groq_client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                max_tokens=512,
+                timeout=LLM_TIMEOUT_SECONDS,
+            )
         text = response.choices[0].message.content
         # Safely parse JSON section
         import re
         match = re.search(r'({.*})', text, re.DOTALL)
         if match:
-            return json.loads(match.group(1))
+            result = json.loads(match.group(1))
+            llm_cache.set(cache_key, result)
+            return result
         else:
             logging.warning("LLM did not return proper JSON. Output: %s", text)
             return {}
@@ -59,10 +83,15 @@ def call_llm_for_graphs(summary: str) -> dict:
         logging.error(f"LLM call failed: {e}")
         return {}
 
-def generate_plotly_graphs(df: pd.DataFrame, graph_suggestions: list):
+def generate_plotly_graphs(df: pd.DataFrame, graph_suggestions: list, point_budget: int = PLOT_POINT_BUDGET,
+                           scatter_strategy: str = "sample"):
     """
     Generates up to 2 plotly graphs as dicts based on LLM or fallback suggestions.
     Returns a dict: {label: plotly_json}
+
+    Data is aggregated server-side (value counts, histogram bins, box quartiles,
+    downsampled or binned scatter) so each figure carries at most ``point_budget``
+    points regardless of the row count.
     """
     graphs = {}
     count = 0
@@ -72,62 +101,125 @@ def generate_plotly_graphs(df: pd.DataFrame, graph_suggestions: list):
         kind, columns = g.get("type"), g.get("columns", [])
         try:
             if kind == "bar" and len(columns) == 1 and columns[0] in df.columns:
-                fig = px.bar(df[columns[0]].value_counts().reset_index(),
-                             x="index", y=columns[0],
-                             title=f"Bar plot of {columns[0]}")
+                fig = bar_figure(df[columns[0]], title=f"Bar plot of {columns[0]}")
             elif kind == "histogram" and len(columns) == 1 and columns[0] in df.columns:
-                fig = px.histogram(df, x=columns[0], title=f"Histogram of {columns[0]}")
+                fig = histogram_figure(df[columns[0]], title=f"Histogram of {columns[0]}")
             elif kind == "scatter" and len(columns) == 2 and all(c in df.columns for c in columns):
-                fig = px.scatter(df, x=columns[0], y=columns[1], title=f"Scatter: {columns[0]} vs {columns[1]}")
+                fig = scatter_figure(df, columns[0], columns[1], title=f"Scatter: {columns[0]} vs {columns[1]}",
+                                     point_budget=point_budget, strategy=scatter_strategy)
             elif kind == "box" and len(columns) == 1 and columns[0] in df.columns:
-                fig = px.box(df, y=columns[0], title=f"Boxplot of {columns[0]}")
+                fig = box_figure(df[columns[0]], title=f"Boxplot of {columns[0]}", max_outliers=point_budget)
             else:
                 continue  # Skip unsupported/invalid
             # Serialize for web
-            graphs[f"{kind}_{'_'.join(columns)}"] = pio.to_json(fig)
+            with stage("plot_serialization", kind=kind):
+                graphs[f"{kind}_{'_'.join(columns)}"] = pio.to_json(fig)
             count += 1
         except Exception as e:
             logging.warning(f"Plotly graph '{kind}' for columns {columns} failed: {e}")
     return graphs
 
-def analyze_dataset(filepath: str) -> dict:
+def analyze_dataset(filepath: str, mode: str = "auto", chunksize: int = PROFILE_CHUNKSIZE) -> dict:
     """
     Analyzes a CSV, suggests a target, issues basic stats, and provides web-friendly plotly graphs.
+
+    Args:
+        filepath (str): Path to the CSV file.
+        mode (str): "full" loads the whole file, "chunked" profiles it in a single
+            streaming pass with bounded memory, "approximate" streams it with
+            sketch-based distinct counts/quantiles/top values and reports their
+            error bounds, "auto" uses the upload's metadata sidecar when it is
+            current and its distinct counts are exact (see services/metadata.py)
+            and otherwise picks chunked for large files. "approximate" also
+            answers from a current sidecar, exact or not.
+
+    The analysis reports "unique_exact"; when False, "error_bounds" holds the
+    bounds of the sketch-based values.
+        chunksize (int): Rows per chunk in chunked mode.
+
+    Raises:
+        ValueError: If ``mode`` is not one of ``ANALYZE_MODES``.
     """
+    # Validated outside the try so a bad request is not reported as a failed load
+    if mode not in ANALYZE_MODES:
+        raise ValueError(f"Unknown analysis mode '{mode}'. Choose from {list(ANALYZE_MODES)}")
     try:
-        df = pd.read_csv(filepath)
+        metadata = load_metadata(filepath) if mode in ("auto", "approximate") else None
+        # Large files get sketch-based distinct counts in the sidecar; those are
+        # only served when the caller asked for approximation
+        if metadata is not None and (metadata["unique_exact"] or mode == "approximate"):
+            # Answer from the sidecar written at upload, the file itself is not read
+            mode = "metadata"
+            analysis = {
+                "shape": (metadata["n_rows"], metadata["n_columns"]),
+                "dtypes": metadata["dtypes"],
+                "nulls": metadata["nulls"],
+                "unique": metadata["unique"],
+            }
+            if not metadata["unique_exact"]:
+                analysis["error_bounds"] = metadata["error_bounds"]
+            summary_stats = pd.DataFrame.from_dict(metadata["summary"], orient="index").to_string()
+            df = load_sample(metadata)
+        elif mode == "auto":
+            mode = "chunked" if should_stream(filepath) else "full"
+        if mode in ("chunked", "approximate"):
+            profile = profile_csv(filepath, chunksize=chunksize, approximate=mode == "approximate")
+            analysis = profile["analysis"]
+            summary_stats = profile["summary"].to_string()
+            # Plots and fallback heuristics work on a uniform row sample
+            df = profile["sample"]
+        elif mode == "full":
+            df = load_dataset(filepath)
     except Exception as e:
         logging.error(f"Failed to load CSV: {e}")
         return {"error": str(e)}
 
-    analysis = {
-        "shape": df.shape,
-        "dtypes": df.dtypes.astype(str).to_dict(),
-        "nulls": df.isnull().sum().to_dict(),
-        "unique": df.nunique().to_dict(),
-    }
-    # Dataset short stats for LLM
-    summary_stats = df.describe(include="all", percentiles=[.25, .5, .75]).transpose().to_string()
-    llm_output = call_llm_for_graphs(summary_stats)
+    if mode == "full":
+        # Dataset short stats for LLM
+        summary_stats = df.describe(include="all", percentiles=[.25, .5, .75]).transpose().to_string()
+        schema = df.dtypes.astype(str).to_dict()
+    else:
+        schema = analysis["dtypes"]
+
+    # Ask the LLM in the background and do the local work while it is in flight
+    llm_started = time.monotonic()
+    llm_future = submit_llm_call(call_llm_for_graphs, summary_stats, schema=schema)
+
+    if mode == "full":
+        analysis = {
+            "shape": df.shape,
+            "dtypes": schema,
+            "nulls": df.isnull().sum().to_dict(),
+            "unique": df.nunique().to_dict(),
+        }
+
+    # fallback: use object column with 2-10 uniques
+    candidates = [c for c in df.columns if analysis["dtypes"][c] == 'object' and 2 <= analysis["unique"][c] <= 10]
+    fallback_target = candidates[0] if candidates else df.columns[0]
+    # fallback suggestion: distribution on target, correlation heatmap
+    fallback_suggestions = [{"type": "bar", "columns": [fallback_target]}]
+    num_cols = df.select_dtypes(include='number').columns
+    if len(num_cols) >= 2:
+        fallback_suggestions.append({"type": "scatter", "columns": [num_cols[0], num_cols[1]]})
+    # Render the fallback plots while waiting, unless the LLM has already answered
+    fallback_graphs = None if llm_future.done() else generate_plotly_graphs(df, fallback_suggestions)
+
+    llm_output = wait_llm_result(llm_future, llm_started)
     # Use LLM's target_column or fallback
     if llm_output.get("target_column") and llm_output["target_column"] in df.columns:
         target = llm_output["target_column"]
     else:
-        # fallback: use object column with 2-10 uniques
-        candidates = [c for c in df.columns if df[c].dtype == 'object' and 2 <= df[c].nunique() <= 10]
-        target = candidates[0] if candidates else df.columns[0]
+        target = fallback_target
     analysis["suggested_target"] = target
+    analysis["unique_exact"] = "error_bounds" not in analysis
     # Use LLM's graph suggestions or fallback
     if llm_output.get("graphs"):
-        graph_suggestions = llm_output["graphs"]
+        plotly_graphs = generate_plotly_graphs(df, llm_output["graphs"])
+    elif fallback_graphs is not None and target == fallback_target:
+        plotly_graphs = fallback_graphs
     else:
-        # fallback suggestion: distribution on target, correlation heatmap
-        graph_suggestions = [{"type": "bar", "columns": [target]}]
-        num_cols = df.select_dtypes(include='number').columns
-        if len(num_cols) >= 2:
-            graph_suggestions.append({"type": "scatter", "columns": [num_cols[0], num_cols[1]]})
-
-    plotly_graphs = generate_plotly_graphs(df, graph_suggestions)
+        fallback_suggestions[0] = {"type": "bar", "columns": [target]}
+        plotly_graphs = generate_plotly_graphs(df, fallback_suggestions)
     # Return analysis and serialized graphs for web
     return {
         "analysis": analysis,
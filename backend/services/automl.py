@@ -0,0 +1,272 @@
+import os
+import math
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from services.trainer import (
+    MODEL_MAP,
+    DENSE_FEATURE_BUDGET_MB,
+    FAST_ENGINES,
+    is_classification_model,
+    is_classification_target,
+    resolve_engine,
+    load_training_data,
+    split_train_test,
+    build_report,
+    shared_matrix,
+)
+from services.preprocessing import TabularPreprocessor
+from services.dataset_cache import load_dataset
+from services.telemetry import record_stage, stage
+
+logging.basicConfig(level=logging.INFO)
+
+# Parallel workers used to race candidates (-1: one per core)
+AUTOML_N_JOBS = int(os.getenv("AUTOML_N_JOBS", "-1"))
+# Smallest training subsample used in the first halving round
+AUTOML_MIN_RESOURCES = int(os.getenv("AUTOML_MIN_RESOURCES", "200"))
+# Share of the training split held out to score the race; the test split is
+# only used for the winner's final report
+AUTOML_VALIDATION_SIZE = 0.2
+
+
+def eligible_models(is_classification: bool, n_rows: int, sparse_input: bool = False) -> List[str]:
+    """
+    MODEL_MAP entries that fit the task, with GradientBoosting* raced as its
+    histogram engine on large data (unless the shared matrix is sparse, which
+    the histogram engines do not accept).
+    """
+    fast = set(FAST_ENGINES.values())
+    names = []
+    for name in MODEL_MAP:
+        if name in fast or is_classification_model(name) != is_classification:
+            continue
+        names.append(name if sparse_input else resolve_engine(name, n_rows)[0])
+    return names
+
+
+def _subsample(X, y, n_samples: int, is_classification: bool, random_state: int):
+    """First ``n_samples`` rows of a (stratified when possible) random subsample."""
+    if n_samples >= X.shape[0]:
+        return X, y
+    try:
+        X_sub, _, y_sub, _ = train_test_split(
+            X, y, train_size=n_samples, random_state=random_state,
+            stratify=y if is_classification else None,
+        )
+    except ValueError:
+        X_sub, _, y_sub, _ = train_test_split(X, y, train_size=n_samples, random_state=random_state)
+    return X_sub, y_sub
+
+
+def _fit_and_score(name: str, estimator, X_train, y_train, X_val, y_val,
+                   is_classification: bool, return_estimator: bool,
+                   feature_names: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Fit one candidate and score it on the validation split. Runs in a worker process."""
+    if feature_names is not None:
+        # Zero-copy frames over the shared arrays, so the returned estimator
+        # knows its feature names like one fitted inside the Pipeline
+        X_train = pd.DataFrame(X_train, columns=feature_names, copy=False)
+        X_val = pd.DataFrame(X_val, columns=feature_names, copy=False)
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = estimator.predict(X_val)
+    score = accuracy_score(y_val, y_pred) if is_classification else r2_score(y_val, y_pred)
+    score_time = time.perf_counter() - start
+
+    return {
+        "name": name,
+        "score": float(score),
+        "fit_time": fit_time,
+        "score_time": score_time,
+        "estimator": estimator if return_estimator else None,
+    }
+
+
+def successive_halving(
+    candidates: Dict[str, Any],
+    X_train,
+    y_train,
+    X_val,
+    y_val,
+    is_classification: bool,
+    eta: int = 2,
+    min_resources: int = AUTOML_MIN_RESOURCES,
+    n_jobs: int = AUTOML_N_JOBS,
+    random_state: int = 42,
+    deadline: Optional[float] = None,
+    feature_names: Optional[np.ndarray] = None,
+) -> Tuple[List[Dict[str, Any]], Any]:
+    """
+    Race estimators with successive halving.
+
+    Every round fits the surviving candidates in parallel on a training
+    subsample, scores them on the validation split and keeps the best
+    ``1/eta``. The subsample grows by ``eta`` each round so the final round
+    uses the full training set. Once ``deadline`` (a ``time.perf_counter()``
+    value) has passed, only the current leader goes on to the final round.
+    The rounds are scheduled so that a single candidate is left for the final
+    round, whose fit on the full training set is returned rather than redone.
+
+    Returns:
+        leaderboard (list): One entry per candidate, best first, with its score
+            history and timings per round.
+        best_estimator: The winner, fitted on the full training set.
+    """
+    n_train = X_train.shape[0]
+    n_rounds = max(1, math.ceil(math.log(len(candidates), eta)) + 1) if len(candidates) > 1 else 1
+    n_min = max(min(min_resources, n_train), int(n_train / eta ** (n_rounds - 1)))
+
+    history = {name: {"name": name, "rounds": [], "eliminated_in_round": None} for name in candidates}
+    alive = list(candidates)
+    best_estimator = None
+
+    with Parallel(n_jobs=min(len(candidates), n_jobs if n_jobs > 0 else os.cpu_count() or 1)) as parallel:
+        for round_idx in range(n_rounds):
+            last_round = round_idx == n_rounds - 1 or len(alive) == 1
+            n_samples = n_train if last_round else min(n_train, n_min * eta ** round_idx)
+            X_sub, y_sub = _subsample(X_train, y_train, n_samples, is_classification, random_state)
+            logging.info(f"Halving round {round_idx}: {len(alive)} candidates on {n_samples} rows")
+
+            results = parallel(
+                delayed(_fit_and_score)(name, clone(candidates[name]), X_sub, y_sub, X_val, y_val,
+                                        is_classification, last_round, feature_names)
+                for name in alive
+            )
+            for result in results:
+                # Fitted in joblib workers; their timings are recorded here. Labelled
+                # by estimator class: candidate names are trial ids when tuning
+                model = type(candidates[result["name"]]).__name__
+                record_stage("fit", result["fit_time"], model=model)
+                record_stage("predict", result["score_time"], model=model)
+                history[result["name"]]["rounds"].append({
+                    "round": round_idx,
+                    "n_samples": int(n_samples),
+                    "score": result["score"],
+                    "fit_time": result["fit_time"],
+                    "score_time": result["score_time"],
+                })
+
+            results.sort(key=lambda r: r["score"], reverse=True)
+            if last_round:
+                best_estimator = results[0]["estimator"]
+                for result in results[1:]:
+                    history[result["name"]]["eliminated_in_round"] = round_idx
+                break
+            keep = max(1, math.ceil(len(alive) / eta))
+            if deadline is not None and time.perf_counter() >= deadline:
+                logging.info("Time budget reached, fitting the current leader on the full training set")
+                keep = 1
+            for result in results[keep:]:
+                history[result["name"]]["eliminated_in_round"] = round_idx
+            alive = [r["name"] for r in results[:keep]]
+
+    leaderboard = []
+    for entry in history.values():
+        last = entry["rounds"][-1]
+        leaderboard.append({
+            **entry,
+            "final_score": last["score"],
+            "final_n_samples": last["n_samples"],
+            "total_fit_time": sum(r["fit_time"] for r in entry["rounds"]),
+        })
+    # Candidates that survived longer rank first, then by their last score
+    leaderboard.sort(key=lambda e: (len(e["rounds"]), e["final_score"]), reverse=True)
+    for rank, entry in enumerate(leaderboard, start=1):
+        entry["rank"] = rank
+    return leaderboard, best_estimator
+
+
+def run_automl(
+    filepath: str,
+    target_column: str,
+    test_size: float = 0.2,
+    eta: int = 2,
+    min_resources: int = AUTOML_MIN_RESOURCES,
+    n_jobs: int = AUTOML_N_JOBS,
+    random_state: int = 42,
+    time_budget_s: Optional[float] = None,
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    Race every eligible MODEL_MAP estimator and return the winner.
+
+    The task is inferred from the target, features are preprocessed once and
+    shared by all candidates, and candidates are pruned by successive halving
+    on a validation split carved out of the training data. The winner is the
+    race's final-round fit (all training rows outside the validation split),
+    reported on the untouched test split. Once ``time_budget_s`` has elapsed the
+    race stops halving and only the current leader gets its final-round fit.
+
+    Returns:
+        report (dict): leaderboard (validation scores), best model name and its test-split evaluation report
+            (same layout as ``train_model``), plus total wall time.
+        model (sklearn Pipeline): Fitted preprocessing followed by the winner.
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget_s if time_budget_s else None
+    df = load_dataset(filepath)
+    if target_column not in df.columns:
+        raise ValueError(f"Target column '{target_column}' not found in dataset")
+    is_classification = is_classification_target(df[target_column].dropna())
+
+    X, y, target_classes = load_training_data(filepath, target_column, is_classification)
+    with stage("split", rows=len(X)):
+        X_train, X_test, y_train, y_test = split_train_test(X, y, test_size, random_state, is_classification)
+
+    with stage("preprocess", rows=len(X_train)):
+        preprocessor = TabularPreprocessor(dense_budget_mb=DENSE_FEATURE_BUDGET_MB).fit(X_train)
+        Xt_train, Xt_test = preprocessor.transform(X_train), preprocessor.transform(X_test)
+    # Plain arrays are memory-mapped by joblib instead of pickled per worker
+    Xt_train, Xt_test = shared_matrix(Xt_train), shared_matrix(Xt_test)
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+
+    X_fit, X_val, y_fit, y_val = split_train_test(
+        Xt_train, y_train, AUTOML_VALIDATION_SIZE, random_state, is_classification
+    )
+
+    names = eligible_models(is_classification, len(X), sparse.issparse(Xt_train))
+    candidates = {name: MODEL_MAP[name]() for name in names}
+    feature_names = None if sparse.issparse(Xt_train) else preprocessor.get_feature_names_out()
+    logging.info(f"AutoML race on {filepath}: {names}")
+
+    leaderboard, best_estimator = successive_halving(
+        candidates, X_fit, y_fit, X_val, y_val, is_classification,
+        eta=eta, min_resources=min_resources, n_jobs=n_jobs, random_state=random_state,
+        deadline=deadline, feature_names=feature_names,
+    )
+    best_name = leaderboard[0]["name"]
+
+    model = Pipeline([("preprocess", preprocessor), ("model", best_estimator)])
+    model.target_classes_ = target_classes
+
+    with stage("predict", model=best_name, rows=len(X_test)):
+        y_pred = model.predict(X_test)
+    metrics = build_report(best_name, is_classification, y, y_train, y_test, y_pred,
+                           len(preprocessor.get_feature_names_out()), target_classes)
+
+    report = {
+        "task": "classification" if is_classification else "regression",
+        "metric": "accuracy" if is_classification else "r2_score",
+        "best_model": best_name,
+        "leaderboard": leaderboard,
+        "validation_rows": int(X_val.shape[0]),
+        "metrics": metrics,
+        "time_budget_s": time_budget_s,
+        "budget_exhausted": deadline is not None and time.perf_counter() >= deadline,
+        "wall_time": time.perf_counter() - start,
+    }
+    logging.info(f"AutoML finished in {report['wall_time']:.2f}s, best model: {best_name}")
+    return report, model
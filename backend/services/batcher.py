@@ -0,0 +1,143 @@
+import os
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from services.predictor import load_model, predict_frame
+
+logging.basicConfig(level=logging.INFO)
+
+# How long the first request for a model waits for others to join its batch
+BATCH_WINDOW_MS = float(os.getenv("AUTOML_BATCH_WINDOW_MS", "5"))
+# A batch is scored as soon as it holds this many rows
+BATCH_MAX_ROWS = int(os.getenv("AUTOML_BATCH_MAX_ROWS", "256"))
+
+
+def _score_batch(model_path: str, requests: List[List[dict]]) -> Dict[str, Any]:
+    # Runs in a worker thread: loading (on a cache miss) and predict stay off the event loop
+    model = load_model(model_path)
+    return predict_frame(model, pd.DataFrame([row for rows in requests for row in rows]))
+
+
+def _slice_result(result: Dict[str, Any], start: int, stop: int) -> Dict[str, Any]:
+    probabilities = result["probabilities"]
+    return {
+        "predictions": result["predictions"][start:stop],
+        "probabilities": probabilities[start:stop] if probabilities is not None else None,
+        "classes": result["classes"],
+        "n_rows": stop - start,
+    }
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests for the same model into one
+    vectorized ``predict``/``predict_proba`` call.
+
+    Requests are grouped by model and by the set of input columns (so a row
+    missing a feature still fails on its own instead of being imputed because
+    another client sent it). A group is scored when it reaches ``max_batch_rows``
+    or ``window_ms`` after its first request, whichever comes first, and each
+    caller gets back the slice of results for its own rows. If a batch fails,
+    its requests are retried one by one so a bad request only fails itself.
+    """
+
+    def __init__(self, window_ms: float = BATCH_WINDOW_MS, max_batch_rows: int = BATCH_MAX_ROWS):
+        self.window_ms = window_ms
+        self.max_batch_rows = max_batch_rows
+        self._pending: Dict[Tuple, List[Tuple[List[dict], asyncio.Future]]] = {}
+        self._pending_rows: Dict[Tuple, int] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+        self.requests = 0
+        self.batches = 0
+        self.batched_rows = 0
+        self.max_queue_depth = 0
+        self.in_flight = 0
+
+    async def submit(self, model_path, rows: List[dict]) -> Dict[str, Any]:
+        """Queue ``rows`` for scoring by ``model_path`` and wait for their results."""
+        loop = asyncio.get_running_loop()
+        columns = frozenset(col for row in rows for col in row)
+        key = (str(model_path), columns)
+        future = loop.create_future()
+
+        self._pending.setdefault(key, []).append((rows, future))
+        self._pending_rows[key] = self._pending_rows.get(key, 0) + len(rows)
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth())
+
+        if self._pending_rows[key] >= self.max_batch_rows:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window_ms / 1000, self._flush, key)
+        return await future
+
+    def _flush(self, key: Tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(key, [])
+        self._pending_rows.pop(key, None)
+        if items:
+            asyncio.get_running_loop().create_task(self._run_batch(key[0], items))
+
+    async def _run_batch(self, model_path: str, items: List[Tuple[List[dict], asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.batched_rows += sum(len(rows) for rows, _ in items)
+        self.in_flight += 1
+        try:
+            result = await loop.run_in_executor(None, _score_batch, model_path, [rows for rows, _ in items])
+        except Exception as e:
+            if len(items) == 1:
+                self._resolve(items[0][1], error=e)
+            else:
+                logging.warning(f"Batch of {len(items)} requests failed ({e}), scoring them individually")
+                for rows, future in items:
+                    try:
+                        self._resolve(future, await loop.run_in_executor(None, _score_batch, model_path, [rows]))
+                    except Exception as item_error:
+                        self._resolve(future, error=item_error)
+            return
+        finally:
+            self.in_flight -= 1
+
+        offset = 0
+        for rows, future in items:
+            self._resolve(future, _slice_result(result, offset, offset + len(rows)))
+            offset += len(rows)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any = None, error: Exception = None) -> None:
+        if future.done():  # caller went away (request cancelled)
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def queue_depth(self) -> int:
+        """Requests waiting for their batch to be dispatched."""
+        return sum(len(items) for items in self._pending.values())
+
+    def stats(self) -> Dict[str, Any]:
+        per_model: Dict[str, int] = {}
+        for (model_path, _), items in self._pending.items():
+            per_model[model_path] = per_model.get(model_path, 0) + len(items)
+        return {
+            "window_ms": self.window_ms,
+            "max_batch_rows": self.max_batch_rows,
+            "queue_depth": self.queue_depth(),
+            "queue_depth_by_model": per_model,
+            "max_queue_depth": self.max_queue_depth,
+            "batches_in_flight": self.in_flight,
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_rows": self.batched_rows / self.batches if self.batches else 0.0,
+        }
+
+
+# Shared batcher for the /predict endpoint
+micro_batcher = MicroBatcher()
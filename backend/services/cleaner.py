@@ -1,8 +1,126 @@
 import pandas as pd
+import numpy as np
 import os
 import logging
+from typing import Dict, Any
 
-def clean_data(filepath: str) -> str:
+from services.dataset_cache import load_dataset
+from services.profiler import should_stream, PROFILE_CHUNKSIZE
+from services.metadata import load_metadata
+from services.sketches import BoundedValueCounts, ColumnSketch
+
+# Files above this size are cleaned in chunks when mode is "auto"
+CHUNKED_CLEAN_MB = float(os.getenv("AUTOML_CHUNKED_CLEAN_MB", "256"))
+CLEAN_MODES = ("auto", "full", "chunked", "approximate")
+
+
+def _cleaned_path(filepath: str) -> str:
+    # Handle file extension robustly
+    base, ext = os.path.splitext(filepath)
+    return f"{base}_cleaned{ext if ext else '.csv'}"
+
+
+def _median_from_counts(counts: pd.Series) -> float:
+    """Exact median of the values described by a value -> count Series."""
+    counts = counts.sort_index()
+    cumulative = counts.to_numpy().cumsum()
+    total = cumulative[-1]
+    values = counts.index.to_numpy(dtype=np.float64)
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2 + 1)]
+    upper = values[np.searchsorted(cumulative, total // 2 + 1)]
+    return float((lower + upper) / 2)
+
+
+def _mode_from_counts(counts: pd.Series) -> Any:
+    """Most frequent value; ties go to the smallest value like ``Series.mode()[0]``."""
+    top = counts[counts == counts.max()]
+    return top.sort_index().index[0]
+
+
+def collect_fill_values(filepath: str, chunksize: int = PROFILE_CHUNKSIZE, approximate: bool = False) -> Dict[str, Any]:
+    """
+    First pass of the chunked cleaner: compute per-column fill values.
+
+    Numeric columns get their median, other columns their mode. Only columns
+    with missing values are tracked; when the upload's metadata sidecar is
+    current it says which ones, otherwise every column is. Exact mode keeps
+    value counts per column up to ``EXACT_COUNTS_MAX_DISTINCT`` distinct values
+    and uses the column's sketch beyond that; approximate mode keeps only the
+    fixed-size sketch (KLL median, count-min top value). Either way memory does
+    not grow with the cardinality of the file.
+
+    Returns:
+        dict: column -> fill value, only for columns that contain missing values.
+    """
+    metadata = load_metadata(filepath)
+    tracked = None if metadata is None else {col for col, n in metadata["nulls"].items() if n}
+    nulls: Dict[str, int] = {}
+    numeric: Dict[str, bool] = {}
+    counts: Dict[str, BoundedValueCounts] = {}
+    sketches: Dict[str, ColumnSketch] = {}
+
+    for chunk in pd.read_csv(filepath, chunksize=chunksize):
+        chunk_nulls = chunk.isnull().sum()
+        for col in chunk.columns:
+            if tracked is not None and col not in tracked:
+                continue
+            series = chunk[col]
+            nulls[col] = nulls.get(col, 0) + int(chunk_nulls[col])
+            if chunk_nulls[col] == len(series):
+                continue  # all-NaN chunk says nothing about the column's type
+            numeric[col] = numeric.get(col, True) and pd.api.types.is_numeric_dtype(series)
+            if approximate:
+                sketches.setdefault(col, ColumnSketch()).update(series)
+            else:
+                counts.setdefault(col, BoundedValueCounts()).update(series)
+
+    fill_values = {}
+    for col, null_count in nulls.items():
+        if null_count == 0 or col not in numeric:
+            continue
+        if not approximate and counts[col].exact:
+            column_counts = counts[col].counts
+            fill_values[col] = _median_from_counts(column_counts) if numeric[col] else _mode_from_counts(column_counts)
+            continue
+        if not approximate:
+            logging.warning(f"Column {col} has too many distinct values for exact statistics, "
+                            f"filling it from its sketch")
+        sketch = sketches[col] if approximate else counts[col].sketch
+        if numeric[col]:
+            fill_values[col] = sketch.kll.quantiles([0.5])[0]
+        else:
+            top_values = sketch.top_values()
+            if top_values:
+                fill_values[col] = top_values[0]["value"]
+    return fill_values
+
+
+def clean_data_chunked(filepath: str, chunksize: int = PROFILE_CHUNKSIZE, approximate: bool = False) -> str:
+    """
+    Two-pass cleaner with peak memory bounded by ``chunksize``.
+
+    The first pass collects imputation values (see ``collect_fill_values``), the
+    second streams the file again, fills each chunk and appends it to the output.
+    """
+    fill_values = collect_fill_values(filepath, chunksize=chunksize, approximate=approximate)
+    cleaned_path = _cleaned_path(filepath)
+
+    header = True
+    for chunk in pd.read_csv(filepath, chunksize=chunksize):
+        for col, value in fill_values.items():
+            if chunk[col].isnull().any():
+                series = chunk[col]
+                if isinstance(value, str) and series.dtype != object:
+                    series = series.astype(object)
+                chunk[col] = series.fillna(value)
+        chunk.to_csv(cleaned_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+    logging.info(f"Cleaned {filepath} in chunks, filled {len(fill_values)} columns")
+    return cleaned_path
+
+
+def clean_data(filepath: str, mode: str = "auto", chunksize: int = PROFILE_CHUNKSIZE) -> str:
     """
     Cleans the dataset by:
     - Filling missing numerical values with the median
@@ -10,12 +128,29 @@ def clean_data(filepath: str) -> str:
 
     Args:
         filepath (str): Path to the input CSV file
+        mode (str): "full" cleans in memory, "chunked" streams the file in two
+            passes with exact statistics (sketch-based for columns with more
+            than ``EXACT_COUNTS_MAX_DISTINCT`` values), "approximate" streams it with
+            sketch-based medians/modes, "auto" picks chunked for large files.
+        chunksize (int): Rows per chunk when streaming.
 
     Returns:
         str: Path to the cleaned CSV file
+
+    Raises:
+        ValueError: If ``mode`` is not one of CLEAN_MODES.
     """
+    # Validated outside the try so a bad request is not reported as a failed cleaning
+    if mode not in CLEAN_MODES:
+        raise ValueError(f"Unknown cleaning mode '{mode}'. Choose from {list(CLEAN_MODES)}")
     try:
-        df = pd.read_csv(filepath)
+        if mode == "auto":
+            mode = "chunked" if should_stream(filepath, threshold_mb=CHUNKED_CLEAN_MB) else "full"
+        if mode in ("chunked", "approximate"):
+            return clean_data_chunked(filepath, chunksize=chunksize, approximate=mode == "approximate")
+
+        # Work on a private copy, the cached frame is shared with other endpoints
+        df = load_dataset(filepath, copy=True)
 
         # Numeric columns
         for col in df.select_dtypes(include=['number']).columns:
@@ -30,9 +165,7 @@ def clean_data(filepath: str) -> str:
                 if not mode.empty:
                     df[col] = df[col].fillna(mode[0])
 
-        # Handle file extension robustly
-        base, ext = os.path.splitext(filepath)
-        cleaned_path = f"{base}_cleaned{ext if ext else '.csv'}"
+        cleaned_path = _cleaned_path(filepath)
         df.to_csv(cleaned_path, index=False)
 
         return cleaned_path
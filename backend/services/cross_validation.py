@@ -0,0 +1,128 @@
+import os
+import time
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+from sklearn.model_selection import KFold, StratifiedKFold
+
+from services.automl import AUTOML_N_JOBS
+from services.metrics import classification_metrics
+
+logging.basicConfig(level=logging.INFO)
+
+
+def fold_metrics(y_true, y_pred, is_classification: bool) -> Dict[str, float]:
+    """Headline metrics for one fold."""
+    if is_classification:
+        metrics = classification_metrics(y_true, y_pred)
+        return {key: metrics[key] for key in ("accuracy", "f1_macro", "precision_macro", "recall_macro")}
+    return {
+        "r2_score": float(r2_score(y_true, y_pred)),
+        "mse": float(mean_squared_error(y_true, y_pred)),
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+    }
+
+
+def _rows(X, idx):
+    """Rows of a DataFrame, array or CSR matrix by position."""
+    return X.iloc[idx] if hasattr(X, "iloc") else X[idx]
+
+
+def _fit_fold(fold: int, estimator, X, y, train_idx, test_idx, is_classification: bool) -> Dict[str, Any]:
+    """Fit and score one fold. Runs in a worker process."""
+    start = time.perf_counter()
+    estimator.fit(_rows(X, train_idx), y[train_idx])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = estimator.predict(_rows(X, test_idx))
+    metrics = fold_metrics(y[test_idx], y_pred, is_classification)
+    score_time = time.perf_counter() - start
+
+    return {
+        "fold": fold,
+        "train_size": int(len(train_idx)),
+        "test_size": int(len(test_idx)),
+        "fit_time": fit_time,
+        "score_time": score_time,
+        "metrics": metrics,
+    }
+
+
+def make_folds(y, n_folds: int, is_classification: bool, random_state: int):
+    """Shuffled K-fold splits, stratified for classification when every class has ``n_folds`` rows."""
+    if is_classification:
+        _, counts = np.unique(y, return_counts=True)
+        if counts.min() >= n_folds:
+            return list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(np.zeros(len(y)), y))
+        logging.warning(f"Smallest class has {counts.min()} rows, falling back to unstratified {n_folds}-fold CV")
+    return list(KFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(np.zeros(len(y))))
+
+
+def cross_validate_model(
+    estimator,
+    X,
+    y,
+    is_classification: bool,
+    n_folds: int = 5,
+    n_jobs: int = AUTOML_N_JOBS,
+    random_state: int = 42,
+) -> Dict[str, Any]:
+    """
+    K-fold cross-validation with the folds fitted in parallel.
+
+    ``estimator`` is cloned and fitted once per fold. Pass a Pipeline whose
+    first step is the preprocessing together with the raw feature DataFrame
+    ``X``, so that imputation medians and category vocabularies are learned
+    from each fold's training rows only and never see its validation rows.
+    A preprocessed matrix (numpy array or CSR) with a bare estimator also
+    works. joblib memory-maps numeric arrays above 1 MB so workers share them;
+    a DataFrame with text columns is pickled to every worker.
+
+    Returns:
+        dict: per-fold metrics and timings, mean/std/min/max of every metric,
+            wall time and the summed fit+score time a sequential run would take.
+    """
+    if n_folds < 2:
+        raise ValueError("Cross-validation needs at least 2 folds")
+    if len(y) < n_folds:
+        raise ValueError(f"Cannot run {n_folds}-fold cross-validation on {len(y)} rows")
+
+    y = np.asarray(y)
+    folds = make_folds(y, n_folds, is_classification, random_state)
+    workers = min(n_folds, n_jobs if n_jobs > 0 else os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    results = Parallel(n_jobs=workers)(
+        delayed(_fit_fold)(i, clone(estimator), X, y, train_idx, test_idx, is_classification)
+        for i, (train_idx, test_idx) in enumerate(folds)
+    )
+    wall_time = time.perf_counter() - start
+
+    aggregate = {}
+    for name in results[0]["metrics"]:
+        values = np.array([r["metrics"][name] for r in results])
+        aggregate[name] = {
+            "mean": float(values.mean()),
+            "std": float(values.std(ddof=1)),
+            "min": float(values.min()),
+            "max": float(values.max()),
+        }
+    sequential_time = sum(r["fit_time"] + r["score_time"] for r in results)
+
+    logging.info(f"{n_folds}-fold CV on {workers} workers took {wall_time:.2f}s "
+                 f"({sequential_time:.2f}s of fitting and scoring)")
+    return {
+        "n_folds": n_folds,
+        "stratified": bool(is_classification and np.unique(y, return_counts=True)[1].min() >= n_folds),
+        "n_jobs": workers,
+        "folds": results,
+        "aggregate": aggregate,
+        "wall_time": wall_time,
+        "sequential_time": sequential_time,
+        "parallel_speedup": sequential_time / wall_time if wall_time else None,
+    }
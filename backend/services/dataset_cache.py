@@ -0,0 +1,133 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any
+
+import pandas as pd
+
+from services.telemetry import stage
+
+logging.basicConfig(level=logging.INFO)
+
+# Memory budget for parsed DataFrames kept in-process (defaults to 512 MB)
+DATASET_CACHE_MAX_BYTES = int(os.getenv("AUTOML_DATASET_CACHE_MB", "512")) * 1024 * 1024
+
+
+class DatasetCache:
+    """
+    In-process LRU cache of parsed CSV files.
+
+    Entries are keyed by the resolved file path and validated against the file's
+    mtime and size on every lookup, so a re-uploaded or rewritten file is parsed
+    again instead of being served stale. The total in-memory size of cached
+    DataFrames is kept under ``max_bytes`` by evicting the least recently used ones.
+    """
+
+    def __init__(self, max_bytes: int = DATASET_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(filepath) -> str:
+        return str(Path(filepath).resolve())
+
+    @staticmethod
+    def _signature(filepath) -> tuple:
+        stat = os.stat(filepath)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._current_bytes -= entry["nbytes"]
+
+    def get(self, filepath, copy: bool = False) -> pd.DataFrame:
+        """
+        Return the parsed DataFrame for ``filepath``, reading it from disk on a miss.
+
+        Args:
+            filepath: Path to the CSV file.
+            copy (bool): Return a deep copy. Callers that modify the frame in place
+                must pass True so the cached entry stays untouched.
+
+        Returns:
+            pd.DataFrame: The parsed dataset.
+        """
+        key = self._key(filepath)
+        signature = self._signature(filepath)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["signature"] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                df = entry["df"]
+                return df.copy() if copy else df
+            if entry is not None:
+                # File changed on disk since it was cached
+                self._drop(key)
+                self.invalidations += 1
+            self.misses += 1
+
+        # Parse outside the lock so other datasets can still be served meanwhile
+        with stage("csv_read", path=str(filepath)):
+            df = pd.read_csv(filepath)
+        nbytes = int(df.memory_usage(deep=True).sum())
+
+        with self._lock:
+            self._drop(key)
+            if nbytes <= self.max_bytes:
+                self._entries[key] = {"df": df, "signature": signature, "nbytes": nbytes}
+                self._current_bytes += nbytes
+                while self._current_bytes > self.max_bytes and len(self._entries) > 1:
+                    oldest_key, _ = next(iter(self._entries.items()))
+                    self._drop(oldest_key)
+                    self.evictions += 1
+            else:
+                logging.info(f"Dataset {filepath} ({nbytes} bytes) exceeds cache budget, not caching")
+
+        return df.copy() if copy else df
+
+    def invalidate(self, filepath) -> None:
+        """Forget any cached copy of ``filepath``."""
+        key = self._key(filepath)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Shared cache used by all services in this process
+dataset_cache = DatasetCache()
+
+
+def load_dataset(filepath, copy: bool = False) -> pd.DataFrame:
+    """Load a CSV through the shared dataset cache."""
+    return dataset_cache.get(filepath, copy=copy)
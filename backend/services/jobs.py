@@ -0,0 +1,335 @@
+import os
+import uuid
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import joblib
+
+from services.telemetry import replay_job_telemetry, run_captured
+
+logging.basicConfig(level=logging.INFO)
+
+# Number of trainings allowed to run at once (one process each)
+TRAINING_WORKERS = int(os.getenv("AUTOML_TRAINING_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+# Jobs allowed to wait for a free worker before new submissions are rejected
+MAX_QUEUED_JOBS = int(os.getenv("AUTOML_MAX_QUEUED_JOBS", "32"))
+# Finished jobs kept around so clients can still fetch their results
+MAX_FINISHED_JOBS = int(os.getenv("AUTOML_MAX_FINISHED_JOBS", "200"))
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+def run_training_job(
+    filepath: str,
+    target_column: str,
+    model_name: str,
+    test_size: float,
+    model_save_path: str,
+    model_params: Optional[dict] = None,
+    search: Optional[str] = None,
+    n_trials: int = 20,
+    time_budget_s: Optional[float] = None,
+    cv_folds: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Train (and optionally tune) a model and save it with joblib. Runs inside a
+    pool worker process.
+
+    Only the metrics travel back to the API process, the fitted estimator is
+    written straight to ``model_save_path`` (the job's temporary artifact path,
+    see ``JobManager.submit``).
+    """
+    from services.trainer import train_model
+
+    metrics, trained_model = train_model(
+        filepath=filepath,
+        target_column=target_column,
+        model_name=model_name,
+        model_params=model_params,
+        test_size=test_size,
+        search=search,
+        n_trials=n_trials,
+        time_budget_s=time_budget_s,
+        cv_folds=cv_folds,
+    )
+    if trained_model is None:
+        raise RuntimeError("Model training failed unexpectedly.")
+
+    joblib.dump(trained_model, model_save_path)
+    logging.info(f"Model trained and saved to: {model_save_path}")
+    return metrics
+
+
+def run_automl_job(
+    filepath: str,
+    target_column: str,
+    test_size: float,
+    eta: int,
+    model_save_path: str,
+    time_budget_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Race the eligible models with successive halving and save the winner to
+    ``model_save_path``. Runs inside a pool worker process, candidates are
+    fitted in parallel below it.
+    """
+    from services.automl import run_automl
+
+    report, best_model = run_automl(
+        filepath=filepath,
+        target_column=target_column,
+        test_size=test_size,
+        eta=eta,
+        time_budget_s=time_budget_s,
+    )
+    joblib.dump(best_model, model_save_path)
+    logging.info(f"AutoML winner {report['best_model']} saved to: {model_save_path}")
+    return report
+
+
+class JobManager:
+    """
+    Bounded queue of background jobs executed on a process pool.
+
+    At most ``max_workers`` jobs are handed to the pool at a time, the rest wait
+    in a FIFO queue so their position can be reported and they can be cancelled
+    before they start. A running job cannot be interrupted; cancelling it
+    discards its result and the temporary artifact it wrote, leaving the
+    artifact of an earlier job at the same path in place.
+
+    If a worker process dies (e.g. killed for running out of memory) the pool
+    is broken for good: its jobs fail and the next dispatch starts a new pool.
+    """
+
+    def __init__(self, max_workers: int = TRAINING_WORKERS, max_queued: int = MAX_QUEUED_JOBS):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._queue: deque = deque()
+        self._running = 0
+        self._lock = threading.RLock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the module does not spawn processes
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        # Caller must hold the lock. Only the current pool is replaced: jobs of a
+        # broken pool fail one by one, after a new pool may already be running.
+        if executor is self._executor:
+            logging.error("Training worker process died, starting a new process pool")
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        artifact_path: Optional[str] = None,
+        finalize: Optional[Callable[[Any], Any]] = None,
+        **kwargs,
+    ) -> str:
+        """
+        Queue ``fn(*args, **kwargs)`` for execution in a worker process.
+
+        Args:
+            fn: Picklable top-level function to run.
+            artifact_path: File the job produces. ``fn`` is called with
+                ``model_save_path`` set to a per-job temporary file next to it,
+                which is moved into place with ``os.replace`` once the job has
+                completed, so a cancelled or failed job (or another job
+                targeting the same path) never clobbers the current artifact.
+            finalize: Called in the API process with the worker's return value
+                to build the stored result.
+
+        Returns:
+            str: The new job ID.
+        """
+        job_id = uuid.uuid4().hex
+        temp_artifact_path = None
+        if artifact_path is not None:
+            path = Path(artifact_path)
+            temp_artifact_path = str(path.with_name(f"{path.name}.{job_id}.tmp"))
+            kwargs["model_save_path"] = temp_artifact_path
+        job = {
+            "job_id": job_id,
+            "status": PENDING,
+            "fn": fn,
+            "args": args,
+            "kwargs": kwargs,
+            "artifact_path": artifact_path,
+            "temp_artifact_path": temp_artifact_path,
+            "finalize": finalize,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "error_type": None,
+        }
+        with self._lock:
+            if len(self._queue) >= self.max_queued:
+                raise QueueFullError(f"Job queue is full ({self.max_queued} jobs waiting)")
+            self._jobs[job_id] = job
+            self._queue.append(job_id)
+            self._dispatch()
+        return job_id
+
+    def _dispatch(self) -> None:
+        # Caller must hold the lock
+        while self._queue and self._running < self.max_workers:
+            job = self._jobs[self._queue.popleft()]
+            job["status"] = RUNNING
+            job["started_at"] = time.time()
+            self._running += 1
+            executor = self._get_executor()
+            try:
+                # Stage timings and peak RSS are captured in the worker and recorded here
+                future = executor.submit(run_captured, job["fn"], *job["args"], **job["kwargs"])
+            except BrokenProcessPool:
+                # The pool broke before its failed jobs reported back; retry on a new one
+                self._discard_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(run_captured, job["fn"], *job["args"], **job["kwargs"])
+            future.add_done_callback(
+                lambda f, job_id=job["job_id"], executor=executor: self._on_done(job_id, f, executor)
+            )
+
+    def _on_done(self, job_id: str, future, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            self._running -= 1
+            try:
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    self._finish(job, future, executor)
+            finally:
+                # Queued jobs start even if recording this one failed
+                self._prune_finished()
+                self._dispatch()
+
+    def _finish(self, job: Dict[str, Any], future, executor: ProcessPoolExecutor) -> None:
+        # Caller must hold the lock
+        job["finished_at"] = time.time()
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._discard_executor(executor)
+        if job["status"] == CANCELLED:
+            self._remove_artifact(job)
+            return
+        try:
+            if error is not None:
+                raise error
+            result, telemetry = future.result()
+            replay_job_telemetry(job["fn"].__name__, telemetry)
+            if job["finalize"] is not None:
+                result = job["finalize"](result)
+            if job["temp_artifact_path"] is not None:
+                os.replace(job["temp_artifact_path"], job["artifact_path"])
+        except Exception as e:
+            self._remove_artifact(job)
+            job["status"] = FAILED
+            if isinstance(e, BrokenProcessPool):
+                job["error"] = "The worker process running this job died (possibly out of memory)"
+            else:
+                job["error"] = str(e)
+            job["error_type"] = "validation" if isinstance(e, ValueError) else "internal"
+            logging.error(f"Job {job['job_id']} failed: {job['error']}")
+            return
+        job["result"] = result
+        job["status"] = COMPLETED
+
+    @staticmethod
+    def _remove_artifact(job: Dict[str, Any]) -> None:
+        # Only the job's own temporary file, the published artifact is left alone
+        path = job.get("temp_artifact_path")
+        if path and Path(path).exists():
+            Path(path).unlink()
+
+    def _prune_finished(self) -> None:
+        finished = [jid for jid, job in self._jobs.items() if job["finished_at"] is not None]
+        for jid in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[jid]
+
+    def _describe(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        queue_position = None
+        if job["status"] == PENDING:
+            queue_position = list(self._queue).index(job["job_id"]) + 1
+        return {
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "queue_position": queue_position,
+            "submitted_at": job["submitted_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "result": job["result"],
+            "error": job["error"],
+            "error_type": job["error_type"],
+        }
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._describe(job) if job is not None else None
+
+    def list(self) -> list:
+        with self._lock:
+            return [self._describe(job) for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a pending or running job.
+
+        Returns:
+            The job description after cancellation, or None if the job is unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] == PENDING:
+                self._queue.remove(job_id)
+                job["status"] = CANCELLED
+                job["finished_at"] = time.time()
+            elif job["status"] == RUNNING:
+                # Result is dropped in _on_done once the worker returns
+                job["status"] = CANCELLED
+            return self._describe(job)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+                "running": self._running,
+                "queued": len(self._queue),
+                "jobs_by_status": counts,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Shared job manager used by the API for training jobs
+job_manager = JobManager()
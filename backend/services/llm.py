@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from contextlib import closing
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO)
+
+LLM_MODEL = "llama-3.3-70b-versatile"
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Built on first use, importing groq is deferred until an LLM call is made
+_llm_client = None
+_llm_client_ready = False
+_llm_client_lock = threading.Lock()
+
+# Hard deadline for an LLM round trip before the rule-based fallbacks are used
+LLM_TIMEOUT_SECONDS = float(os.getenv("AUTOML_LLM_TIMEOUT_SECONDS", "8"))
+LLM_THREADS = int(os.getenv("AUTOML_LLM_THREADS", "8"))
+
+# On-disk cache of parsed LLM responses
+LLM_CACHE_PATH = Path(os.getenv("AUTOML_LLM_CACHE_PATH", ".cache/llm_cache.sqlite3"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("AUTOML_LLM_CACHE_TTL_HOURS", "168")) * 3600
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("AUTOML_LLM_CACHE_MAX_ENTRIES", "5000"))
+
+
+def get_llm_client():
+    """Return the client used for chat completions (None when no API key is configured)."""
+    global _llm_client, _llm_client_ready
+    if not _llm_client_ready:
+        with _llm_client_lock:
+            if not _llm_client_ready:
+                if GROQ_API_KEY:
+                    from groq import Groq
+
+                    _llm_client = Groq(api_key=GROQ_API_KEY)
+                _llm_client_ready = True
+    return _llm_client
+
+
+def set_llm_client(client) -> None:
+    """Replace the chat completion client, e.g. with a StubLLMClient in tests."""
+    global _llm_client, _llm_client_ready
+    with _llm_client_lock:
+        _llm_client = client
+        _llm_client_ready = True
+
+
+class StubLLMClient:
+    """
+    Offline stand-in for the Groq client exposing ``chat.completions.create``.
+
+    Args:
+        response (str): Text returned for every prompt.
+        latency (float): Seconds to sleep per call, to mimic a network round trip.
+    """
+
+    def __init__(self, response: str = "{}", latency: float = 0.0):
+        self.response = response
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        message = SimpleNamespace(content=self.response)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_THREADS, thread_name_prefix="llm")
+
+
+def submit_llm_call(fn: Callable, *args, **kwargs) -> Future:
+    """
+    Start an LLM-backed call on a background thread so local work can overlap it.
+
+    Pair with ``wait_llm_result`` to collect the result under a deadline.
+    """
+    return _llm_executor.submit(fn, *args, **kwargs)
+
+
+def wait_llm_result(future: Future, started_at: float, timeout: float = LLM_TIMEOUT_SECONDS) -> dict:
+    """
+    Wait for a submitted LLM call until ``started_at + timeout`` (time.monotonic()).
+
+    Returns an empty dict when the deadline passes, which callers already treat as
+    "no suggestions" and answer with their rule-based fallback. A late response
+    still completes in the background and lands in the cache for the next request.
+    """
+    remaining = max(0.0, started_at + timeout - time.monotonic())
+    try:
+        return future.result(timeout=remaining)
+    except FuturesTimeoutError:
+        logging.warning(f"LLM call exceeded the {timeout:.1f}s deadline, using fallback")
+        return {}
+
+
+def llm_fingerprint(kind: str, **inputs: Any) -> str:
+    """
+    Stable cache key for an LLM request.
+
+    Args:
+        kind (str): Which prompt the inputs are for (e.g. "graphs", "model_selector").
+        **inputs: Prompt inputs such as the schema, target dtype/cardinality and
+            a summary; anything JSON-serializable (falls back to ``str``).
+    """
+    payload = json.dumps({"kind": kind, "model": LLM_MODEL, **inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of parsed LLM responses.
+
+    Entries expire after ``ttl_seconds``; once more than ``max_entries`` are stored
+    the least recently used ones are evicted. Hit/miss counters are per process.
+    """
+
+    def __init__(
+        self,
+        path: Path = LLM_CACHE_PATH,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._initialized = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=5)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+            self._initialized = True
+        return conn
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(self._connect()) as conn, conn:
+                    row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                    if row is not None and now - row[1] > self.ttl_seconds:
+                        conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                        row = None
+                    if row is None:
+                        self.misses += 1
+                        return None
+                    conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[0])
+            except sqlite3.Error as e:
+                logging.warning(f"LLM cache read failed: {e}")
+                self.misses += 1
+                return None
+
+    def set(self, key: str, value: dict) -> None:
+        now = time.time()
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(self._connect()) as conn, conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value), now, now),
+                    )
+                    conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+                    overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+                    if overflow > 0:
+                        conn.execute(
+                            "DELETE FROM llm_cache WHERE key IN "
+                            "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                            (overflow,),
+                        )
+                        self.evictions += overflow
+            except sqlite3.Error as e:
+                logging.warning(f"LLM cache write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            if self.path.exists():
+                with closing(self._connect()) as conn, conn:
+                    conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        entries = 0
+        with self._lock:
+            if self.path.exists():
+                try:
+                    with closing(self._connect()) as conn, conn:
+                        entries = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            lookups = self.hits + self.misses
+            return {
+                "path": str(self.path),
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+# Shared cache for all LLM-backed services in this process
+llm_cache = LLMCache()
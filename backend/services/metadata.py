@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from services.profiler import profile_csv, should_stream, PROFILE_SAMPLE_ROWS
+from services.serialization import dumps
+
+logging.basicConfig(level=logging.INFO)
+
+METADATA_VERSION = 2
+SIDECAR_SUFFIX = ".meta.json"
+# Uniform row sample stored in the sidecar for schema/sample questions and plots
+METADATA_SAMPLE_ROWS = int(os.getenv("AUTOML_METADATA_SAMPLE_ROWS", str(PROFILE_SAMPLE_ROWS)))
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def sidecar_path(filepath) -> Path:
+    """Where the metadata of ``filepath`` lives: next to it, e.g. uploads/data.csv.meta.json."""
+    path = Path(filepath)
+    return path.with_name(path.name + SIDECAR_SUFFIX)
+
+
+def copy_and_hash(src, dst_path) -> str:
+    """Copy a file object to ``dst_path`` and return the sha256 of its content, in one pass."""
+    digest = hashlib.sha256()
+    with open(dst_path, "wb") as buffer:
+        while True:
+            block = src.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            buffer.write(block)
+    return digest.hexdigest()
+
+
+def hash_file(filepath) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_metadata(filepath, content_hash: Optional[str] = None,
+                     sample_rows: int = METADATA_SAMPLE_ROWS) -> Dict[str, Any]:
+    """
+    Profile a CSV once and write its metadata sidecar.
+
+    The profile is a single streaming pass (see ``profile_csv``); files large
+    enough to be streamed get sketch-based distinct counts ("unique_exact" is
+    then False and "error_bounds" holds the sketches' bounds) so memory stays
+    bounded. Smaller files are profiled exactly, except for columns with more
+    than ``EXACT_COUNTS_MAX_DISTINCT`` distinct values, which also mark the
+    sidecar approximate.
+
+    Args:
+        filepath: Path to the CSV file.
+        content_hash (Optional[str]): sha256 of the file if the caller already
+            computed it (``/upload`` hashes while writing); hashed here otherwise.
+        sample_rows (int): Size of the stored reservoir sample.
+
+    Returns:
+        dict: The sidecar content (see ``load_sample`` for the sample).
+    """
+    started = time.perf_counter()
+    stat = os.stat(filepath)
+    approximate = should_stream(filepath)
+    profile = profile_csv(str(filepath), sample_rows=sample_rows, approximate=approximate)
+    analysis = profile["analysis"]
+    unique_exact = "error_bounds" not in analysis
+
+    metadata = {
+        "version": METADATA_VERSION,
+        "filename": Path(filepath).name,
+        "size_bytes": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "content_hash": content_hash or hash_file(filepath),
+        "n_rows": int(analysis["shape"][0]),
+        "n_columns": int(analysis["shape"][1]),
+        "columns": list(analysis["dtypes"]),
+        "dtypes": analysis["dtypes"],
+        "nulls": {col: int(n) for col, n in analysis["nulls"].items()},
+        "unique": {col: int(n) for col, n in analysis["unique"].items()},
+        "unique_exact": unique_exact,
+        "error_bounds": None if unique_exact else json.loads(dumps(analysis["error_bounds"])),
+        # Round-trip through pandas' JSON writer for NaN -> null and numpy scalars
+        "summary": json.loads(profile["summary"].to_json(orient="index")),
+        "sample": json.loads(profile["sample"].to_json(orient="split", index=False)),
+    }
+    path = sidecar_path(filepath)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+    os.replace(tmp_path, path)
+
+    logging.info(f"Wrote metadata sidecar {path} in {time.perf_counter() - started:.2f}s")
+    return metadata
+
+
+def load_metadata(filepath) -> Optional[Dict[str, Any]]:
+    """
+    Read the sidecar of ``filepath`` if it exists and still describes the file
+    (same size and mtime); None otherwise.
+    """
+    path = sidecar_path(filepath)
+    try:
+        stat = os.stat(filepath)
+        with open(path, encoding="utf-8") as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (metadata.get("version") != METADATA_VERSION
+            or metadata.get("size_bytes") != stat.st_size
+            or metadata.get("mtime_ns") != stat.st_mtime_ns):
+        return None
+    return metadata
+
+
+def get_metadata(filepath) -> Dict[str, Any]:
+    """Sidecar of ``filepath``, computed and saved first if missing or stale."""
+    metadata = load_metadata(filepath)
+    if metadata is None:
+        metadata = compute_metadata(filepath)
+    return metadata
+
+
+def load_sample(metadata: Dict[str, Any]) -> pd.DataFrame:
+    """The stored reservoir sample as a DataFrame with the file's numeric dtypes restored."""
+    sample = metadata["sample"]
+    df = pd.DataFrame(sample["data"], columns=sample["columns"])
+    for col, dtype in metadata["dtypes"].items():
+        if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            try:
+                df[col] = df[col].astype(dtype)
+            except (TypeError, ValueError):
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def remove_metadata(filepath) -> None:
+    """Delete the sidecar of ``filepath`` (e.g. before the file is overwritten)."""
+    try:
+        sidecar_path(filepath).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,224 @@
+import os
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+
+# Resolution of the score histograms behind the streaming ROC-AUC
+AUC_BINS = int(os.getenv("AUTOML_AUC_BINS", "16384"))
+
+
+def _label_key(label) -> str:
+    """Label as it appears in sklearn's classification_report dict."""
+    return str(label.item() if hasattr(label, "item") else label)
+
+
+def encode_labels(y_true, y_pred) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Encode both label arrays against their sorted union in one hash pass.
+
+    Returns:
+        (true codes, predicted codes, labels) with ``labels[code]`` the label.
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    codes, labels = pd.factorize(np.concatenate([y_true, y_pred]), sort=True)
+    return codes[: len(y_true)], codes[len(y_true):], np.asarray(labels)
+
+
+def confusion_from_codes(true_codes: np.ndarray, pred_codes: np.ndarray, n_labels: int) -> np.ndarray:
+    """Confusion matrix (rows: true, columns: predicted) with a single bincount."""
+    flat = np.bincount(true_codes * n_labels + pred_codes, minlength=n_labels * n_labels)
+    return flat.reshape(n_labels, n_labels)
+
+
+def classification_metrics(y_true, y_pred) -> Dict[str, Any]:
+    """
+    Every classification metric the trainer and tester report, from one
+    confusion matrix.
+
+    Labels are encoded once (see ``encode_labels``), the confusion matrix is
+    one ``bincount``, and the report, accuracy and macro scores are derived from
+    it; the per-label supports give the class distribution. Matches
+    ``classification_report``/``confusion_matrix``/``*_score(average="macro")``
+    with zero_division=0.
+
+    Returns:
+        dict with classification_report, confusion_matrix (list), accuracy,
+        f1_macro, precision_macro, recall_macro, labels (union of true and
+        predicted, sorted) and class_distribution (true label -> count, most
+        frequent first).
+    """
+    true_codes, pred_codes, labels = encode_labels(y_true, y_pred)
+    cm = confusion_from_codes(true_codes, pred_codes, len(labels))
+    report = report_from_confusion(cm, labels)
+    support = cm.sum(axis=1)
+    order = np.argsort(-support, kind="stable")
+    return {
+        "classification_report": report,
+        "confusion_matrix": cm.tolist(),
+        "accuracy": report["accuracy"],
+        "f1_macro": report["macro avg"]["f1-score"],
+        "precision_macro": report["macro avg"]["precision"],
+        "recall_macro": report["macro avg"]["recall"],
+        "labels": labels.tolist(),
+        "class_distribution": {labels[i].item() if hasattr(labels[i], "item") else labels[i]: int(support[i])
+                               for i in order if support[i] > 0},
+    }
+
+
+def report_from_confusion(cm: np.ndarray, labels) -> Dict[str, Any]:
+    """
+    Per-class and averaged precision/recall/F1 from a confusion matrix, laid
+    out like ``classification_report(output_dict=True)`` (zero_division=0).
+    """
+    cm = np.asarray(cm, dtype=np.float64)
+    tp = np.diag(cm)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    total = support.sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        denom = precision + recall
+        f1 = np.where(denom > 0, 2 * precision * recall / denom, 0.0)
+
+    report: Dict[str, Any] = {}
+    for i, label in enumerate(labels):
+        report[_label_key(label)] = {
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1-score": float(f1[i]),
+            "support": int(support[i]),
+        }
+    weights = support / total if total else np.zeros_like(support)
+    report["accuracy"] = float(tp.sum() / total) if total else 0.0
+    report["macro avg"] = {
+        "precision": float(precision.mean()),
+        "recall": float(recall.mean()),
+        "f1-score": float(f1.mean()),
+        "support": int(total),
+    }
+    report["weighted avg"] = {
+        "precision": float((precision * weights).sum()),
+        "recall": float((recall * weights).sum()),
+        "f1-score": float((f1 * weights).sum()),
+        "support": int(total),
+    }
+    return report
+
+
+class ConfusionAccumulator:
+    """
+    Running confusion matrix over label pairs seen so far.
+
+    Labels do not have to be known up front; the matrix is laid out over the
+    sorted union of true and predicted labels, like ``confusion_matrix``.
+    """
+
+    def __init__(self):
+        self.counts: Dict[tuple, int] = {}
+        self.true_counts: Dict[Any, int] = {}
+
+    def update(self, y_true, y_pred) -> None:
+        true_codes, pred_codes, labels = encode_labels(y_true, y_pred)
+        cm = confusion_from_codes(true_codes, pred_codes, len(labels))
+        for i, j in zip(*np.nonzero(cm)):
+            t, p, n = labels[i], labels[j], int(cm[i, j])
+            self.counts[(t, p)] = self.counts.get((t, p), 0) + n
+            self.true_counts[t] = self.true_counts.get(t, 0) + n
+
+    def labels(self) -> list:
+        return sorted({t for t, _ in self.counts} | {p for _, p in self.counts})
+
+    def matrix(self) -> np.ndarray:
+        labels = self.labels()
+        index = {label: i for i, label in enumerate(labels)}
+        cm = np.zeros((len(labels), len(labels)), dtype=np.int64)
+        for (t, p), n in self.counts.items():
+            cm[index[t], index[p]] += n
+        return cm
+
+
+class BinnedROCAUC:
+    """
+    ROC-AUC from fixed-width histograms of the positive-class score per true label.
+
+    Scores in the same bin count as ties, so the estimate is exact for scores
+    quantized to ``1/n_bins`` and otherwise off by at most the share of
+    positive/negative pairs that share a bin. Memory is ``n_bins`` counts per label.
+    """
+
+    def __init__(self, n_bins: int = AUC_BINS):
+        self.n_bins = n_bins
+        self.histograms: Dict[Any, np.ndarray] = {}
+
+    def update(self, y_true, scores) -> None:
+        y_true = np.asarray(y_true)
+        bins = np.clip((np.asarray(scores, dtype=np.float64) * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        for label in np.unique(y_true):
+            hist = self.histograms.setdefault(label, np.zeros(self.n_bins, dtype=np.int64))
+            hist += np.bincount(bins[y_true == label], minlength=self.n_bins)
+
+    def auc(self) -> Optional[float]:
+        """AUC with the larger of exactly two labels as positive (like ``roc_auc_score``); None otherwise."""
+        if len(self.histograms) != 2:
+            return None
+        negative, positive = (self.histograms[label] for label in sorted(self.histograms))
+        n_pos, n_neg = positive.sum(), negative.sum()
+        if n_pos == 0 or n_neg == 0:
+            return None
+        # P(score_pos > score_neg) + 0.5 * P(tie), summed bin by bin
+        negatives_below = np.cumsum(negative) - negative
+        return float((positive * (negatives_below + 0.5 * negative)).sum() / (n_pos * n_neg))
+
+
+class RegressionAccumulator:
+    """Running MSE/MAE/R² and value ranges, merged chunk by chunk."""
+
+    def __init__(self):
+        self.n = 0
+        self.sum_squared_error = 0.0
+        self.sum_absolute_error = 0.0
+        # Running mean and sum of squared deviations of y_true (Chan et al. merge)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.y_range = [np.inf, -np.inf]
+        self.pred_range = [np.inf, -np.inf]
+
+    def update(self, y_true, y_pred) -> None:
+        y_true = np.asarray(y_true, dtype=np.float64)
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        n = len(y_true)
+        if n == 0:
+            return
+        error = y_true - y_pred
+        self.sum_squared_error += float(error @ error)
+        self.sum_absolute_error += float(np.abs(error).sum())
+
+        chunk_mean = float(y_true.mean())
+        chunk_m2 = float(((y_true - chunk_mean) ** 2).sum())
+        total = self.n + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.n * n / total
+        self.n = total
+
+        self.y_range = [min(self.y_range[0], float(y_true.min())), max(self.y_range[1], float(y_true.max()))]
+        self.pred_range = [min(self.pred_range[0], float(y_pred.min())), max(self.pred_range[1], float(y_pred.max()))]
+
+    def metrics(self) -> Dict[str, float]:
+        mse = self.sum_squared_error / self.n
+        if self.m2 > 0:
+            r2 = 1.0 - self.sum_squared_error / self.m2
+        else:  # constant target, scored like r2_score
+            r2 = 1.0 if self.sum_squared_error == 0 else 0.0
+        return {
+            "mse": mse,
+            "rmse": float(np.sqrt(mse)),
+            "r2_score": r2,
+            "mae": self.sum_absolute_error / self.n,
+        }
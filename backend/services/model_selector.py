@@ -2,25 +2,57 @@ import os
 import pandas as pd
 import logging
 import json
-from dotenv import load_dotenv
-from groq import Groq
+import time
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Optional
+
+from sklearn.metrics import accuracy_score, r2_score
+from sklearn.model_selection import train_test_split
+
+from services.metadata import get_metadata, load_sample
+from services.trainer import (
+    HIST_GB_MIN_ROWS,
+    MODEL_MAP,
+    make_preprocessor,
+    engine_params,
+    is_classification_target,
+    split_train_test,
+)
+from services.automl import eligible_models
+from services.llm import (
+    get_llm_client,
+    llm_cache,
+    llm_fingerprint,
+    submit_llm_call,
+    wait_llm_result,
+    LLM_MODEL,
+    LLM_TIMEOUT_SECONDS,
+)
+from services.telemetry import stage
 
-load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+SELECTION_STRATEGIES = ("auto", "proxy", "llm")
+# Proxy ranking: rows sampled from the dataset and total time allowed for the candidate fits
+PROXY_SAMPLE_ROWS = int(os.getenv("AUTOML_PROXY_SAMPLE_ROWS", "2000"))
+PROXY_TIME_BUDGET_S = float(os.getenv("AUTOML_PROXY_TIME_BUDGET_S", "10"))
+# Worker processes the proxy fits run in, so a fit that outlasts the budget can be killed
+PROXY_WORKERS = int(os.getenv("AUTOML_PROXY_WORKERS", "2"))
+# Decimals of the reported validation score; models tied at this precision are ranked by fit time
+PROXY_SCORE_DECIMALS = 3
 
 PROMPT_TEMPLATE = """
 You are an expert machine learning engineer. Given the sample data below and information about the target column, please:
 
-1. Recommend the single best ML model for this prediction task from these model list: RandomForestClassifier, RandomForestRegressor, GradientBoostingClassifier, GradientBoostingRegressor, LogisticRegression
+1. Recommend the single best ML model for this prediction task from these model list: RandomForestClassifier, RandomForestRegressor, GradientBoostingClassifier, GradientBoostingRegressor, LogisticRegression, HistGradientBoostingClassifier, HistGradientBoostingRegressor
 2. Suggest 2-3 alternative eligible models, with a brief explanation of why each model could be suitable.
 3. Explain shortly why you chose the best model.
 
 Dataset sample (first 5 rows):
 {sample}
 
+Number of rows in the dataset: {n_rows}
 Target column name: {target_col}
 Target column type: {target_type}
 Number of unique values in target column: {target_unique}
@@ -45,36 +77,58 @@ Respond only with JSON in this format:
 }}
 """
 
-def call_llm_model_selector(sample_df: pd.DataFrame, target_col: str) -> dict:
+def call_llm_model_selector(sample_df: pd.DataFrame, target_col: str, n_rows: int = 0) -> dict:
     """
     Calls the LLM to get the best and other ML model suggestions with explanations.
     Returns a dict with keys: best_model, other_options.
-    """
-    if not groq_client:
-        logging.warning("No LLM client available, returning empty suggestions.")
-        return {}
 
+    Responses are cached on disk, keyed by the sample's schema, the target's
+    dtype/cardinality and a hash of the sample rows.
+    """
     try:
         target_type = str(sample_df[target_col].dtype)
-        target_unique = sample_df[target_col].nunique()
+        target_unique = int(sample_df[target_col].nunique())
         sample_text = sample_df.head(5).to_csv(index=False)
 
+        cache_key = llm_fingerprint(
+            "model_selector",
+            template=PROMPT_TEMPLATE,
+            schema=sample_df.dtypes.astype(str).to_dict(),
+            target_col=target_col,
+            target_type=target_type,
+            target_unique=target_unique,
+            sample=sample_text,
+            n_rows=n_rows,
+        )
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            logging.info("Using cached LLM model suggestions")
+            return cached
+
+        groq_client = get_llm_client()
+        if not groq_client:
+            logging.warning("No LLM client available, returning empty suggestions.")
+            return {}
+
         prompt = PROMPT_TEMPLATE.format(
             sample=sample_text,
             target_col=target_col,
             target_type=target_type,
             target_unique=target_unique,
+            n_rows=n_rows,
         )
 
-        print("🤖 Calling LLM for model suggestions...")
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=512,
-        )
+        logging.info("Calling LLM for model suggestions")
+        with stage("llm_call", model=LLM_MODEL, kind="model_selection"):
+            response = groq_client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                max_tokens=512,
+                timeout=LLM_TIMEOUT_SECONDS,
+            )
         text = response.choices[0].message.content
-        print(f"📝 LLM Response: {text[:200]}...")
+        logging.debug("LLM response", extra={"response": text[:200]})
 
         # Extract JSON object from response safely
         import re
@@ -82,7 +136,9 @@ def call_llm_model_selector(sample_df: pd.DataFrame, target_col: str) -> dict:
         match = re.search(r"(\{.*\})", text, re.DOTALL)
         if match:
             result_json = json.loads(match.group(1))
-            print("✅ Successfully parsed LLM response")
+            logging.debug("Parsed LLM response")
+            if "best_model" in result_json and "other_options" in result_json:
+                llm_cache.set(cache_key, result_json)
             return result_json
         else:
             logging.warning(f"LLM output did not contain parseable JSON: {text}")
@@ -92,18 +148,30 @@ def call_llm_model_selector(sample_df: pd.DataFrame, target_col: str) -> dict:
         logging.error(f"LLM model selector call failed: {e}")
         return {}
 
-def get_fallback_model_suggestions(df: pd.DataFrame, target_column: str) -> dict:
-    """Fallback rule-based model selection when LLM fails"""
-    print("🔧 Using fallback rule-based model selection...")
+def get_fallback_model_suggestions(df: pd.DataFrame, target_column: str,
+                                   n_rows: Optional[int] = None, target_unique: Optional[int] = None) -> dict:
+    """
+    Fallback rule-based model selection when LLM fails.
+
+    ``df`` may be a sample; pass the full dataset's ``n_rows`` and target
+    ``target_unique`` (e.g. from the metadata sidecar) to decide on those.
+    """
+    logging.debug("Computing rule-based model suggestions")
     
-    target_unique = df[target_column].nunique()
+    if target_unique is None:
+        target_unique = df[target_column].nunique()
+    if n_rows is None:
+        n_rows = len(df)
     target_dtype = df[target_column].dtype
     
     # Determine if classification or regression
-    is_classification = (target_unique <= 10) or (target_dtype == 'object') or (target_dtype == 'bool')
+    is_classification = is_classification_target(df[target_column], n_unique=target_unique)
     
+    if HIST_GB_MIN_ROWS and n_rows >= HIST_GB_MIN_ROWS:
+        return get_large_data_suggestions(is_classification)
+
     if is_classification:
-        print("📊 Detected classification task")
+        logging.debug("Detected classification task")
         if target_unique == 2:
             # Binary classification
             return {
@@ -138,7 +206,7 @@ def get_fallback_model_suggestions(df: pd.DataFrame, target_column: str) -> dict
             }
     else:
         # Regression
-        print("📈 Detected regression task")
+        logging.debug("Detected regression task")
         return {
             "best_model": {
                 "name": "RandomForestRegressor",
@@ -152,54 +220,242 @@ def get_fallback_model_suggestions(df: pd.DataFrame, target_column: str) -> dict
             ]
         }
 
-def select_model(filepath: str, target_column: str) -> dict:
+def get_large_data_suggestions(is_classification: bool) -> dict:
+    """Rule-based suggestions above HIST_GB_MIN_ROWS, led by the histogram boosting engines"""
+    logging.info(f"Large dataset (>= {HIST_GB_MIN_ROWS} rows), suggesting histogram-based boosting")
+    if is_classification:
+        return {
+            "best_model": {
+                "name": "HistGradientBoostingClassifier",
+                "description": "Histogram-based, multi-threaded boosting that trains on millions of rows in minutes and handles missing values and categorical columns natively"
+            },
+            "other_options": [
+                {
+                    "name": "LogisticRegression",
+                    "description": "Fast linear baseline that trains on sparse one-hot features with low memory use"
+                },
+                {
+                    "name": "RandomForestClassifier",
+                    "description": "Robust ensemble, slower on very large tables but parallel across trees"
+                }
+            ]
+        }
+    return {
+        "best_model": {
+            "name": "HistGradientBoostingRegressor",
+            "description": "Histogram-based, multi-threaded boosting that trains on millions of rows in minutes and handles missing values and categorical columns natively"
+        },
+        "other_options": [
+            {
+                "name": "RandomForestRegressor",
+                "description": "Robust ensemble, slower on very large tables but parallel across trees"
+            }
+        ]
+    }
+
+_proxy_executor = None
+_proxy_executor_lock = threading.Lock()
+
+
+def _get_proxy_executor():
+    """Shared pool for proxy fits, created on first use and kept warm between requests."""
+    global _proxy_executor
+    with _proxy_executor_lock:
+        if _proxy_executor is None:
+            # loky's pool can kill its workers, which the stdlib one cannot
+            from joblib.externals.loky import ProcessPoolExecutor
+            _proxy_executor = ProcessPoolExecutor(max_workers=PROXY_WORKERS)
+        return _proxy_executor
+
+
+def _kill_proxy_executor(executor) -> None:
+    """Kill a pool whose fit overran its budget; the next ranking starts a new one."""
+    global _proxy_executor
+    with _proxy_executor_lock:
+        if executor is _proxy_executor:
+            _proxy_executor = None
+    executor.shutdown(wait=False, kill_workers=True)
+
+
+def _proxy_fit(name: str, X_train: pd.DataFrame, y_train, X_val: pd.DataFrame):
+    """Fit one proxy candidate and predict the validation rows. Runs in a proxy worker process."""
+    preprocessor = make_preprocessor(name).fit(X_train)
+    estimator = MODEL_MAP[name](**engine_params(name, preprocessor))
+    fit_started = time.perf_counter()
+    estimator.fit(preprocessor.transform(X_train), y_train)
+    fit_time = time.perf_counter() - fit_started
+    return estimator.predict(preprocessor.transform(X_val)), fit_time
+
+
+def rank_models_by_proxy(
+    df: pd.DataFrame,
+    target_column: str,
+    sample_rows: int = PROXY_SAMPLE_ROWS,
+    time_budget_s: float = PROXY_TIME_BUDGET_S,
+    random_state: int = 42,
+    n_rows: Optional[int] = None,
+) -> dict:
+    """
+    Data-driven model selection: train every eligible MODEL_MAP candidate on a
+    small (stratified for classification) sample and rank them on a held-out
+    part of it.
+
+    Candidates are fitted one after the other in a worker process until
+    ``time_budget_s`` runs out; a fit still running at the deadline is killed
+    and, like the candidates that did not get to run, reported as skipped. Candidates are
+    ranked by validation score; fit time only breaks ties between scores that
+    are equal at the reported precision (``PROXY_SCORE_DECIMALS``).
+    Large datasets are ranked with the engines ``/train`` would actually use
+    (see ``resolve_engine``); pass the full ``n_rows`` when ``df`` is already a
+    sample.
+
+    Returns:
+        dict: best_model / other_options like the other selectors, plus a
+            "ranking" entry with every candidate's score and fit time.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget_s
+    data = df.dropna(subset=[target_column])
+    is_classification = is_classification_target(data[target_column])
+    metric = "accuracy" if is_classification else "r2_score"
+
+    if len(data) > sample_rows:
+        try:
+            data, _ = train_test_split(data, train_size=sample_rows, random_state=random_state,
+                                       stratify=data[target_column] if is_classification else None)
+        except ValueError:
+            data = data.sample(n=sample_rows, random_state=random_state)
+    X, y = data.drop(columns=[target_column]), data[target_column]
+    X_train, X_val, y_train, y_val = split_train_test(X, y, 0.25, random_state, is_classification)
+
+    results, skipped = [], []
+    for name in eligible_models(is_classification, n_rows or len(df)):
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            skipped.append(name)
+            continue
+        executor = _get_proxy_executor()
+        try:
+            y_pred, fit_time = executor.submit(_proxy_fit, name, X_train, y_train, X_val).result(timeout=remaining)
+        except FuturesTimeoutError:
+            logging.warning(f"Proxy training of {name} exceeded the {time_budget_s:.1f}s budget, stopping it")
+            _kill_proxy_executor(executor)
+            skipped.append(name)
+            continue
+        except Exception as e:
+            logging.warning(f"Proxy training of {name} failed: {e}")
+            continue
+        score = accuracy_score(y_val, y_pred) if is_classification else r2_score(y_val, y_pred)
+        results.append({"name": name, "score": float(score), "fit_time": fit_time})
+
+    if not results:
+        raise RuntimeError("No candidate model could be trained within the proxy time budget")
+
+    results.sort(key=lambda r: (-round(r["score"], PROXY_SCORE_DECIMALS), r["fit_time"]))
+    for rank, result in enumerate(results, start=1):
+        result["rank"] = rank
+
+    def describe(result):
+        return {
+            "name": result["name"],
+            "description": (
+                f"Ranked #{result['rank']} by proxy training: {metric} {result['score']:.{PROXY_SCORE_DECIMALS}f} on a "
+                f"{len(y_val)}-row validation split of a {len(data)}-row sample, fitted in {result['fit_time']:.2f}s"
+            ),
+        }
+
+    wall_time = time.perf_counter() - started
+    logging.info("Proxy ranking finished", extra={"seconds": round(wall_time, 3), "ranking": [r["name"] for r in results]})
+    return {
+        "best_model": describe(results[0]),
+        "other_options": [describe(r) for r in results[1:]],
+        "ranking": {
+            "task": "classification" if is_classification else "regression",
+            "metric": metric,
+            "sample_rows": int(len(data)),
+            "candidates": results,
+            "skipped": skipped,
+            "time_budget_s": time_budget_s,
+            "wall_time": wall_time,
+        },
+    }
+
+def select_model(filepath: str, target_column: str, strategy: str = "llm") -> dict:
     """
     Main function to select the best and alternative ML models for the dataset.
 
+    Strategies: "llm" (the default) asks the LLM with the rule-based fallback,
+    "proxy" ranks the candidates by training them on a sample (see
+    ``rank_models_by_proxy``), "auto" uses the proxy ranking and falls back to
+    the LLM path if it fails.
+
     Returns a dict:
     {
         "best_model": {"name": "...", "description": "..."},
         "other_options": [ {"name": "...", "description": "..."}, ... ]
     }
     """
-    print(f"🎯 Starting model selection for: {filepath}")
-    print(f"🎯 Target column: {target_column}")
+    logging.info("Starting model selection", extra={"path": filepath, "target_column": target_column, "strategy": strategy})
     
     try:
-        df = pd.read_csv(filepath)
-        print(f"📊 Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+        # Schema, target stats and a uniform row sample come from the upload's
+        # metadata sidecar, the full file is not read
+        metadata = get_metadata(filepath)
+        df = load_sample(metadata)
+        n_rows = metadata["n_rows"]
+        logging.debug("Dataset metadata loaded", extra={"rows": n_rows, "columns": metadata["n_columns"], "sample_rows": len(df)})
         
         if target_column not in df.columns:
             available_columns = list(df.columns)
             raise ValueError(f"Target column '{target_column}' not found in the dataset. Available columns: {available_columns}")
+        if strategy not in SELECTION_STRATEGIES:
+            raise ValueError(f"Unknown selection strategy '{strategy}'. Choose from {list(SELECTION_STRATEGIES)}")
+
+        if strategy in ("auto", "proxy"):
+            try:
+                return rank_models_by_proxy(df, target_column, n_rows=n_rows)
+            except Exception as e:
+                if strategy == "proxy":
+                    raise
+                logging.warning(f"Proxy ranking failed ({e}), asking the LLM instead")
+
+        # Take a sample for the LLM input (first 5 rows) and query the LLM in the
+        # background while the local target stats and fallback are computed
+        sample_df = df.head(5)
+        llm_started = time.monotonic()
+        llm_future = submit_llm_call(call_llm_model_selector, sample_df, target_column, n_rows)
 
         # Basic data info
         target_info = {
-            "unique_values": df[target_column].nunique(),
-            "data_type": str(df[target_column].dtype),
-            "missing_values": df[target_column].isnull().sum(),
+            "unique_values": metadata["unique"][target_column],
+            "data_type": metadata["dtypes"][target_column],
+            "missing_values": metadata["nulls"][target_column],
             "sample_values": df[target_column].value_counts().head(5).to_dict()
         }
-        print(f"🎯 Target column info: {target_info}")
+        logging.debug("Target column info", extra={"target_info": target_info})
 
-        # Take a sample for the LLM input (first 5 rows)
-        sample_df = df.head(5)
+        fallback_suggestions = get_fallback_model_suggestions(
+            df, target_column, n_rows=n_rows, target_unique=metadata["unique"][target_column]
+        )
 
-        # Try LLM-based model suggestion first
-        llm_suggestions = call_llm_model_selector(sample_df, target_column)
+        # Prefer the LLM suggestion if it arrives before the deadline
+        llm_suggestions = wait_llm_result(llm_future, llm_started)
 
         if llm_suggestions and "best_model" in llm_suggestions and "other_options" in llm_suggestions:
-            print("✅ Using LLM model suggestions")
+            logging.info("Using LLM model suggestions")
             return llm_suggestions
         
         # Fallback: Rule-based model selection
-        print("⚠️  LLM failed or unavailable, using rule-based model selection")
-        return get_fallback_model_suggestions(df, target_column)
+        logging.warning("LLM failed, timed out or unavailable, using rule-based model selection")
+        return fallback_suggestions
         
     except FileNotFoundError as e:
         error_msg = f"Dataset file not found: {filepath}"
         logging.error(error_msg)
         raise FileNotFoundError(error_msg)
+    except ValueError:
+        # Bad target column or strategy: main.py answers 400
+        raise
     except Exception as e:
         error_msg = f"Error in model selection: {str(e)}"
         logging.error(error_msg)
@@ -0,0 +1,107 @@
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+logging.basicConfig(level=logging.INFO)
+
+# Maximum number of raw points a single figure may carry to the browser
+PLOT_POINT_BUDGET = int(os.getenv("AUTOML_PLOT_POINT_BUDGET", "5000"))
+HISTOGRAM_BINS = int(os.getenv("AUTOML_PLOT_HISTOGRAM_BINS", "50"))
+MAX_BAR_CATEGORIES = int(os.getenv("AUTOML_PLOT_MAX_CATEGORIES", "50"))
+DENSITY_GRID = 100
+
+
+def bar_figure(series: pd.Series, title: str, max_categories: int = MAX_BAR_CATEGORIES) -> go.Figure:
+    """Bar chart of the most frequent values, counted server-side."""
+    counts = series.value_counts().head(max_categories)
+    return px.bar(x=counts.index.astype(str), y=counts.to_numpy(), title=title,
+                  labels={"x": series.name, "y": "count"})
+
+
+def histogram_figure(series: pd.Series, title: str, bins: int = HISTOGRAM_BINS) -> go.Figure:
+    """Histogram from precomputed bin counts, so only ``bins`` bars are serialized."""
+    values = series.dropna()
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return bar_figure(series, title)
+    counts, edges = np.histogram(values.to_numpy(dtype=np.float64), bins=bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(go.Bar(x=centers, y=counts, width=np.diff(edges), name=str(series.name)))
+    fig.update_layout(title=title, xaxis_title=str(series.name), yaxis_title="count", bargap=0)
+    return fig
+
+
+def stratified_sample(df: pd.DataFrame, x: str, y: str, point_budget: int,
+                      random_state: int = 42) -> pd.DataFrame:
+    """
+    Downsample to about ``point_budget`` rows, spread over a 2D grid of (x, y) cells.
+
+    Each occupied cell keeps a share of the budget proportional to its row count but
+    at least one row, so sparse regions and outliers survive the downsampling.
+    """
+    data = df[[x, y]].replace([np.inf, -np.inf], np.nan).dropna()
+    if len(data) <= point_budget:
+        return data
+    # Coarse enough that the one-row-per-cell floor uses at most a quarter of the budget
+    grid = max(2, int(np.sqrt(point_budget) / 2))
+    x_bins = pd.cut(data[x], bins=grid, labels=False, duplicates="drop") if pd.api.types.is_numeric_dtype(data[x]) \
+        else data[x].astype("category").cat.codes
+    y_bins = pd.cut(data[y], bins=grid, labels=False, duplicates="drop") if pd.api.types.is_numeric_dtype(data[y]) \
+        else data[y].astype("category").cat.codes
+    cells = pd.Series(x_bins.to_numpy() * (grid + 1) + y_bins.to_numpy(), index=data.index)
+
+    rng = np.random.default_rng(random_state)
+    shuffled = cells.iloc[rng.permutation(len(cells))]
+    rank = shuffled.groupby(shuffled).cumcount()
+    cell_counts = cells.value_counts()
+    share = (point_budget - len(cell_counts)) / len(data)
+    quota = shuffled.map(np.maximum(1, np.floor(cell_counts * share)))
+    return data.loc[shuffled.index[(rank < quota).to_numpy()]]
+
+
+def scatter_figure(df: pd.DataFrame, x: str, y: str, title: str,
+                   point_budget: int = PLOT_POINT_BUDGET, strategy: str = "sample") -> go.Figure:
+    """
+    Scatter plot bounded by ``point_budget``.
+
+    Args:
+        strategy (str): "sample" keeps a stratified subset of the points,
+            "density" replaces them with a 2D binned count heatmap.
+    """
+    n_points = int(df[[x, y]].notna().all(axis=1).sum())
+    if n_points <= point_budget:
+        return px.scatter(df, x=x, y=y, title=title)
+    numeric = all(pd.api.types.is_numeric_dtype(df[c]) for c in (x, y))
+    if strategy == "density" and numeric:
+        data = df[[x, y]].dropna()
+        counts, x_edges, y_edges = np.histogram2d(data[x].to_numpy(dtype=np.float64),
+                                                  data[y].to_numpy(dtype=np.float64), bins=DENSITY_GRID)
+        fig = go.Figure(go.Heatmap(x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+                                   z=counts.T, colorscale="Viridis", colorbar={"title": "count"}))
+        fig.update_layout(title=f"{title} (density of {n_points} points)", xaxis_title=x, yaxis_title=y)
+        return fig
+    sample = stratified_sample(df, x, y, point_budget)
+    return px.scatter(sample, x=x, y=y, title=f"{title} ({len(sample)} of {n_points} points)")
+
+
+def box_figure(series: pd.Series, title: str, max_outliers: int = PLOT_POINT_BUDGET) -> go.Figure:
+    """Box plot from precomputed quartiles and fences, with at most ``max_outliers`` outlier points."""
+    values = series.dropna().to_numpy(dtype=np.float64)
+    name = str(series.name)
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    lower, upper = inside.min(), inside.max()
+    fig = go.Figure(go.Box(name=name, q1=[q1], median=[median], q3=[q3],
+                           lowerfence=[lower], upperfence=[upper], mean=[values.mean()], x=[name]))
+    outliers = values[(values < lower) | (values > upper)]
+    if len(outliers):
+        if len(outliers) > max_outliers:
+            outliers = np.random.default_rng(42).choice(outliers, max_outliers, replace=False)
+        fig.add_trace(go.Scatter(x=[name] * len(outliers), y=outliers, mode="markers",
+                                 name="outliers", marker={"size": 4}))
+    fig.update_layout(title=title, yaxis_title=name)
+    return fig
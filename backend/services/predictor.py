@@ -0,0 +1,155 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import joblib
+import pandas as pd
+
+from services.telemetry import model_label, stage
+
+
+logging.basicConfig(level=logging.INFO)
+
+# Number of unpickled models kept in memory
+MODEL_CACHE_SIZE = int(os.getenv("AUTOML_MODEL_CACHE_SIZE", "8"))
+
+
+class ModelCache:
+    """
+    LRU cache of loaded joblib artifacts keyed by resolved path.
+
+    Each lookup re-checks the file's mtime and size, so retraining a model under
+    the same filename is picked up on the next request.
+    """
+
+    def __init__(self, max_models: int = MODEL_CACHE_SIZE):
+        self.max_models = max_models
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_path) -> Any:
+        key = str(Path(model_path).resolve())
+        stat = os.stat(model_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["signature"] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["model"]
+            self.misses += 1
+
+        model = joblib.load(model_path)
+
+        with self._lock:
+            self._entries[key] = {"model": model, "signature": signature}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_models:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return model
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "models": list(self._entries.keys()),
+                "max_models": self.max_models,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+# Shared model cache used by /predict and /evaluate
+model_cache = ModelCache()
+
+
+def load_model(model_path) -> Any:
+    """Load a trained model through the shared model cache."""
+    return model_cache.get(model_path)
+
+
+def warm_up_models(model_dir: Path, names: str) -> List[str]:
+    """
+    Preload artifacts into the model cache.
+
+    Args:
+        model_dir (Path): Directory holding the .joblib artifacts.
+        names (str): "all" for every artifact (most recent first, up to the cache
+            size) or a comma-separated list of artifact filenames.
+
+    Returns:
+        list: Filenames that were loaded.
+    """
+    if names.strip().lower() == "all":
+        paths = sorted(model_dir.glob("*.joblib"), key=lambda p: p.stat().st_mtime, reverse=True)
+        paths = paths[: model_cache.max_models]
+    else:
+        paths = [model_dir / Path(name.strip()).name for name in names.split(",") if name.strip()]
+
+    loaded = []
+    for path in paths:
+        try:
+            load_model(path)
+            loaded.append(path.name)
+        except Exception as e:
+            logging.warning(f"Could not warm up model {path}: {e}")
+    logging.info(f"Warmed up {len(loaded)} models: {loaded}")
+    return loaded
+
+
+def predict_frame(model: Any, df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Score a frame of raw feature rows.
+
+    Models trained by ``train_model`` carry their preprocessing, so rows are used
+    as-is, and their target encoding, so predictions and classes are returned
+    as the original labels. Older bare estimators go through the legacy one-hot path, which cannot
+    score rows with missing values; those get ``None`` predictions.
+
+    Returns:
+        dict with predictions, probabilities (None if the model has no
+        predict_proba) and classes, one entry per input row. Every row is
+        scored when the model carries its preprocessing, and the model's NumPy
+        arrays are returned as-is for the API's serializer to write directly.
+    """
+    # Imported here so the API can start without loading scikit-learn
+    from services.preprocessing import decode_target, has_fitted_preprocessing, legacy_prepare_features
+
+    predictions: Any = [None] * len(df)
+    probabilities = None
+    classes = None
+    if has_fitted_preprocessing(model):
+        if len(df):
+            with stage("predict", model=model_label(model), rows=len(df)):
+                predictions = decode_target(model, model.predict(df))
+                if hasattr(model, "predict_proba"):
+                    probabilities = model.predict_proba(df)
+                    classes = decode_target(model, model.classes_)
+    else:
+        X = legacy_prepare_features(df, model)
+        positions = df.index.get_indexer(X.index)
+        if len(X):
+            for pos, value in zip(positions, model.predict(X).tolist()):
+                predictions[pos] = value
+            if hasattr(model, "predict_proba"):
+                probabilities = [None] * len(df)
+                for pos, row in zip(positions, model.predict_proba(X).tolist()):
+                    probabilities[pos] = row
+                classes = model.classes_.tolist()
+
+    return {
+        "predictions": predictions,
+        "probabilities": probabilities,
+        "classes": classes,
+        "n_rows": len(df),
+    }
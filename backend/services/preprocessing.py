@@ -0,0 +1,250 @@
+import logging
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from services.telemetry import stage
+
+logging.basicConfig(level=logging.INFO)
+
+# Categorical columns with more distinct values than this are frequency-capped or hashed
+MAX_ONEHOT_CATEGORIES = 50
+# Distinct/non-null ratio above which a column is treated as an ID and hashed
+ID_LIKE_RATIO = 0.5
+HASH_FEATURES = 64
+# With sparse="auto", output CSR when the expected share of non-zeros is below this
+SPARSE_DENSITY_THRESHOLD = 0.3
+# Histogram engines bin a native categorical into at most 255 codes (one is kept for "other")
+MAX_NATIVE_CATEGORIES = 255
+
+
+class TabularPreprocessor(BaseEstimator, TransformerMixin):
+    """
+    Fitted replacement for the ad-hoc ``pd.get_dummies`` + dropna preprocessing.
+
+    ``fit`` records the input columns, the numeric columns with their median
+    (used to impute NaN and +/-inf) and an encoding for every other column,
+    chosen from its cardinality:
+
+    - "onehot": at most ``max_onehot_categories`` values, one column per value
+      named ``<column>_<category>`` like ``pd.get_dummies``.
+    - "capped": more values than that, one-hot for the most frequent
+      ``max_onehot_categories`` plus a ``<column>___other__`` bucket.
+    - "hashed": ID-like columns (distinct/non-null ratio above
+      ``id_like_ratio``), hashed into ``hash_features`` buckets.
+
+    ``transform`` produces exactly the fitted feature layout in one vectorized
+    pass: numeric columns first, then the categorical blocks. Missing and unseen
+    categories encode as all zeros (unseen ones fall in the "other"/hash buckets
+    where those exist), so evaluation data never changes the schema. With
+    ``sparse="auto"`` the output is a scipy CSR matrix whenever the one-hot part
+    makes it mostly zeros, so memory scales with the non-zeros. Passing
+    ``dense_budget_mb`` restricts that to matrices whose dense form would exceed
+    the budget, for estimators that fit much slower on sparse input (trees).
+
+    With ``native_categorical=True`` (for histogram gradient boosting, which
+    handles both natively) NaN is left in the numeric columns and each
+    categorical column becomes a single column of integer codes, NaN when
+    missing; the same encodings apply with the vocabulary capped at
+    ``MAX_NATIVE_CATEGORIES``. ``categorical_mask_`` marks those columns for the
+    estimator's ``categorical_features``.
+
+    It is stored together with the estimator in a sklearn ``Pipeline``, which is
+    what ``train_model`` saves in the joblib artifact.
+    """
+
+    def __init__(
+        self,
+        max_onehot_categories: int = MAX_ONEHOT_CATEGORIES,
+        hash_features: int = HASH_FEATURES,
+        id_like_ratio: float = ID_LIKE_RATIO,
+        sparse="auto",
+        dense_budget_mb: Optional[float] = None,
+        native_categorical: bool = False,
+    ):
+        self.max_onehot_categories = max_onehot_categories
+        self.hash_features = hash_features
+        self.id_like_ratio = id_like_ratio
+        self.sparse = sparse
+        self.dense_budget_mb = dense_budget_mb
+        self.native_categorical = native_categorical
+
+    def fit(self, X: pd.DataFrame, y=None):
+        X = pd.DataFrame(X)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+
+        self.numeric_columns_: List[str] = []
+        self.categorical_columns_: List[str] = []
+        for col in X.columns:
+            if pd.api.types.is_numeric_dtype(X[col]):
+                self.numeric_columns_.append(col)
+            else:
+                self.categorical_columns_.append(col)
+
+        numeric = self._numeric_block(X)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+            medians = np.nanmedian(numeric, axis=0) if numeric.size else np.full(numeric.shape[1], np.nan)
+        self.medians_ = np.where(np.isnan(medians), 0.0, medians)
+
+        max_categories = MAX_NATIVE_CATEGORIES if self.native_categorical else self.max_onehot_categories
+        self.encodings_: Dict[str, str] = {}
+        self.categories_: Dict[str, pd.Index] = {}
+        feature_names = list(self.numeric_columns_)
+        for col in self.categorical_columns_:
+            counts = X[col].value_counts()
+            non_null = int(counts.sum())
+            if len(counts) <= max_categories:
+                self.encodings_[col] = "onehot"
+                self.categories_[col] = pd.Categorical(counts.index).categories
+                feature_names += [f"{col}_{cat}" for cat in self.categories_[col]]
+            elif non_null and len(counts) / non_null > self.id_like_ratio:
+                self.encodings_[col] = "hashed"
+                feature_names += [f"{col}_hash{i}" for i in range(self.hash_features)]
+            else:
+                self.encodings_[col] = "capped"
+                self.categories_[col] = pd.Index(counts.index[: max_categories - 1])
+                feature_names += [f"{col}_{cat}" for cat in self.categories_[col]] + [f"{col}___other__"]
+        self.feature_names_out_ = np.asarray(feature_names, dtype=object)
+
+        if self.native_categorical:
+            self.feature_names_out_ = np.asarray(self.numeric_columns_ + self.categorical_columns_, dtype=object)
+            self.categorical_mask_ = np.array(
+                [False] * len(self.numeric_columns_) + [True] * len(self.categorical_columns_)
+            )
+            self.sparse_output_ = False
+            logging.info(
+                f"Fitted preprocessor: {len(self.numeric_columns_)} numeric, "
+                f"{len(self.categorical_columns_)} native categorical {self.encodings_}"
+            )
+            return self
+
+        # Each row has at most one non-zero per categorical column
+        n_out = len(self.feature_names_out_)
+        density = (len(self.numeric_columns_) + len(self.categorical_columns_)) / n_out if n_out else 1.0
+        if self.sparse != "auto":
+            self.sparse_output_ = bool(self.sparse)
+        else:
+            dense_mb = len(X) * n_out * 8 / (1024 * 1024)
+            over_budget = self.dense_budget_mb is None or dense_mb > self.dense_budget_mb
+            self.sparse_output_ = density < SPARSE_DENSITY_THRESHOLD and over_budget
+
+        logging.info(
+            f"Fitted preprocessor: {len(self.numeric_columns_)} numeric, "
+            f"{len(self.categorical_columns_)} categorical {self.encodings_} -> "
+            f"{n_out} features ({'sparse' if self.sparse_output_ else 'dense'})"
+        )
+        return self
+
+    def _numeric_block(self, X: pd.DataFrame) -> np.ndarray:
+        block = X[self.numeric_columns_]
+        if not all(pd.api.types.is_numeric_dtype(block[c]) for c in block.columns):
+            block = block.apply(pd.to_numeric, errors="coerce")
+        values = block.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        values[~np.isfinite(values)] = np.nan
+        return values
+
+    def _check_columns(self, X: pd.DataFrame) -> None:
+        missing = [c for c in self.feature_names_in_ if c not in X.columns]
+        if missing:
+            raise ValueError(f"Input is missing columns the model was trained on: {missing}")
+
+    def _codes(self, series: pd.Series, col: str) -> Tuple[np.ndarray, int]:
+        """Position of each row's single non-zero within the column's block (-1 for none), and the block width."""
+        encoding = self.encodings_[col]
+        if encoding == "hashed":
+            present = series.notna().to_numpy()
+            codes = np.full(len(series), -1, dtype=np.int64)
+            hashes = pd.util.hash_array(series[present].astype(str).to_numpy(dtype=object))
+            codes[present] = (hashes % np.uint64(self.hash_features)).astype(np.int64)
+            return codes, self.hash_features
+        categories = self.categories_[col]
+        codes = pd.Categorical(series, categories=categories).codes.astype(np.int64)
+        if encoding == "capped":
+            # Non-null values outside the kept vocabulary go to the "other" bucket
+            codes[(codes < 0) & series.notna().to_numpy()] = len(categories)
+            return codes, len(categories) + 1
+        return codes, len(categories)
+
+    def transform(self, X: pd.DataFrame):
+        X = pd.DataFrame(X)
+        self._check_columns(X)
+        n_rows = len(X)
+
+        numeric = self._numeric_block(X)
+        if self.native_categorical:
+            return self._transform_native(X, numeric)
+        missing = np.isnan(numeric)
+        if missing.any():
+            numeric[missing] = np.take(self.medians_, np.nonzero(missing)[1])
+
+        rows, cols = [], []
+        offset = numeric.shape[1]
+        for col in self.categorical_columns_:
+            codes, width = self._codes(X[col], col)
+            present = np.flatnonzero(codes >= 0)
+            rows.append(present)
+            cols.append(offset + codes[present])
+            offset += width
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+
+        if self.sparse_output_:
+            encoded = sparse.csr_matrix(
+                (np.ones(len(rows)), (rows, cols)), shape=(n_rows, len(self.feature_names_out_))
+            )
+            return sparse.hstack([sparse.csr_matrix(numeric), encoded[:, numeric.shape[1]:]], format="csr")
+
+        dense = np.zeros((n_rows, len(self.feature_names_out_)), dtype=np.float64)
+        dense[:, : numeric.shape[1]] = numeric
+        dense[rows, cols] = 1.0
+        return pd.DataFrame(dense, columns=self.feature_names_out_, index=X.index)
+
+    def _transform_native(self, X: pd.DataFrame, numeric: np.ndarray) -> pd.DataFrame:
+        """Numeric columns with NaN kept, then one code column per categorical."""
+        out = np.empty((len(X), len(self.feature_names_out_)), dtype=np.float64)
+        out[:, : numeric.shape[1]] = numeric
+        for i, col in enumerate(self.categorical_columns_, start=numeric.shape[1]):
+            codes, _ = self._codes(X[col], col)
+            out[:, i] = np.where(codes >= 0, codes, np.nan)
+        return pd.DataFrame(out, columns=self.feature_names_out_, index=X.index)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return self.feature_names_out_
+
+
+def has_fitted_preprocessing(model) -> bool:
+    """Whether a loaded artifact carries its own preprocessing (a Pipeline from ``train_model``)."""
+    return hasattr(model, "named_steps") and "preprocess" in model.named_steps
+
+
+def target_classes(model) -> Optional[np.ndarray]:
+    """Original target labels of a classifier whose target was label-encoded for training, else None."""
+    return getattr(model, "target_classes_", None)
+
+
+def decode_target(model, codes) -> np.ndarray:
+    """Map label-encoded predictions (or ``classes_``) back to the original target labels."""
+    classes = target_classes(model)
+    if classes is None:
+        return codes
+    return classes[np.asarray(codes, dtype=int)]
+
+
+def legacy_prepare_features(X: pd.DataFrame, model) -> pd.DataFrame:
+    """
+    Preprocessing for artifacts saved as bare estimators, before the fitted
+    preprocessor was stored with the model: one-hot encode, drop rows with
+    NaN/inf and align the columns to the ones the estimator was fitted on.
+    """
+    with stage("get_dummies", columns=X.shape[1]):
+        X = pd.get_dummies(X)
+    X = X.replace([np.inf, -np.inf], np.nan).dropna()
+    if hasattr(model, "feature_names_in_"):
+        X = X.reindex(columns=model.feature_names_in_, fill_value=0)
+    return X
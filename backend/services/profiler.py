@@ -0,0 +1,217 @@
+import os
+import logging
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.sketches import BoundedValueCounts, ColumnSketch, EXACT_COUNTS_MAX_DISTINCT
+
+logging.basicConfig(level=logging.INFO)
+
+# Rows read per chunk when streaming a CSV
+PROFILE_CHUNKSIZE = int(os.getenv("AUTOML_PROFILE_CHUNKSIZE", "100000"))
+# Size of the uniform row sample kept for plots and LLM prompts
+PROFILE_SAMPLE_ROWS = int(os.getenv("AUTOML_PROFILE_SAMPLE_ROWS", "10000"))
+
+
+def _merge_moments(acc: Dict[str, float], n: int, mean: float, m2: float) -> None:
+    """Combine running count/mean/M2 with a chunk's (Chan et al. parallel update)."""
+    if n == 0:
+        return
+    total = acc["n"] + n
+    delta = mean - acc["mean"]
+    acc["mean"] += delta * n / total
+    acc["m2"] += m2 + delta * delta * acc["n"] * n / total
+    acc["n"] = total
+
+
+def _merge_dtype(dtypes: set, has_nulls: bool) -> str:
+    """
+    Reconcile the dtypes pandas inferred for one column across chunks into the
+    dtype a full ``pd.read_csv`` would have produced.
+    """
+    if not dtypes:
+        return "float64"  # column was empty in every chunk
+    if len(dtypes) == 1:
+        dtype = next(iter(dtypes))
+        if has_nulls and pd.api.types.is_integer_dtype(dtype):
+            return "float64"
+        if has_nulls and pd.api.types.is_bool_dtype(dtype):
+            return "object"
+        return str(dtype)
+    if all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in dtypes):
+        return "float64"
+    string_like = [d for d in dtypes if pd.api.types.is_string_dtype(d) and str(d) != "object"]
+    return str(string_like[0]) if string_like else "object"
+
+
+def profile_csv(
+    filepath: str,
+    chunksize: int = PROFILE_CHUNKSIZE,
+    sample_rows: int = PROFILE_SAMPLE_ROWS,
+    random_state: int = 42,
+    approximate: bool = False,
+    max_distinct: int = EXACT_COUNTS_MAX_DISTINCT,
+) -> Dict[str, Any]:
+    """
+    Profile a CSV in a single streaming pass with memory bounded by ``chunksize``.
+
+    With ``approximate=True`` distinct counts, quartiles and top values come from
+    mergeable sketches (see services/sketches.py) instead of exact value counts,
+    so memory per column stays constant however many distinct values it holds.
+    Exact mode counts values exactly up to ``EXACT_COUNTS_MAX_DISTINCT`` distinct
+    values per column; columns past that cap are described by a sketch and get
+    "error_bounds" entries like in approximate mode.
+
+    Args:
+        filepath (str): Path to the CSV file.
+        chunksize (int): Rows parsed per chunk.
+        sample_rows (int): Size of the uniform reservoir sample kept for plotting.
+        random_state (int): Seed for the reservoir sample.
+        approximate (bool): Use sketches instead of exact value counts.
+        max_distinct (int): Distinct values per column kept exactly in exact mode.
+
+    Returns:
+        dict with keys:
+            analysis: shape/dtypes/nulls/unique, same layout as ``analyze_dataset``.
+            summary: per-column DataFrame of count/unique/top/freq/mean/std/min/max.
+            analysis["error_bounds"]: present when any column was sketched.
+            value_counts: exact per-column value counts (pd.Series, None for columns
+                past ``max_distinct``), None when approximate.
+            sketches: per-column ColumnSketch for the sketched columns.
+            sample: uniform random sample of at most ``sample_rows`` rows.
+    """
+    rng = np.random.default_rng(random_state)
+    columns = None
+    n_rows = 0
+    nulls: Dict[str, int] = {}
+    chunk_dtypes: Dict[str, set] = {}
+    moments: Dict[str, Dict[str, float]] = {}
+    minima: Dict[str, Any] = {}
+    maxima: Dict[str, Any] = {}
+    value_counts: Dict[str, BoundedValueCounts] = {}
+    sketches: Dict[str, ColumnSketch] = {}
+    sample = None
+    sample_keys = np.empty(0)
+
+    for chunk in pd.read_csv(filepath, chunksize=chunksize):
+        if columns is None:
+            columns = list(chunk.columns)
+            for col in columns:
+                nulls[col] = 0
+                chunk_dtypes[col] = set()
+                if approximate:
+                    sketches[col] = ColumnSketch(seed=random_state)
+                else:
+                    value_counts[col] = BoundedValueCounts(max_distinct, seed=random_state)
+        n_rows += len(chunk)
+
+        chunk_nulls = chunk.isnull().sum()
+        for col in columns:
+            series = chunk[col]
+            null_count = int(chunk_nulls[col])
+            nulls[col] += null_count
+            if null_count < len(series):
+                chunk_dtypes[col].add(series.dtype)
+
+            if approximate:
+                sketches[col].update(series)
+            else:
+                value_counts[col].update(series)
+
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                values = series.dropna().to_numpy(dtype="float64")
+                if len(values):
+                    acc = moments.setdefault(col, {"n": 0, "mean": 0.0, "m2": 0.0})
+                    chunk_mean = values.mean()
+                    _merge_moments(acc, len(values), chunk_mean, float(((values - chunk_mean) ** 2).sum()))
+                    lo, hi = values.min(), values.max()
+                    minima[col] = lo if col not in minima else min(minima[col], lo)
+                    maxima[col] = hi if col not in maxima else max(maxima[col], hi)
+
+        # Reservoir sample: keep the rows with the smallest random keys seen so far
+        keys = rng.random(len(chunk))
+        if sample is None:
+            sample, sample_keys = chunk, keys
+        else:
+            sample = pd.concat([sample, chunk])
+            sample_keys = np.concatenate([sample_keys, keys])
+        if len(sample) > sample_rows:
+            keep = np.argpartition(sample_keys, sample_rows)[:sample_rows]
+            sample, sample_keys = sample.iloc[keep], sample_keys[keep]
+
+    if columns is None:
+        raise ValueError(f"No data found in {filepath}")
+
+    dtypes = {col: _merge_dtype(chunk_dtypes[col], nulls[col] > 0) for col in columns}
+    # Moments computed on numeric chunks are meaningless if the column is not numeric overall
+    numeric_cols = [c for c in columns if c in moments and dtypes[c] not in ("object", "str", "string")]
+
+    summary_rows = {}
+    unique = {}
+    error_bounds = {"unique": {}, "quantiles": {}, "top_values": {}}
+    for col in columns:
+        if not approximate and not value_counts[col].exact:
+            logging.warning(f"Column {col} has more than {max_distinct} distinct values, "
+                            f"describing it with sketches")
+            sketches[col] = value_counts[col].sketch
+        if col in sketches:
+            sketch = sketches[col]
+            distinct = sketch.distinct()
+            top_values = sketch.top_values()
+            unique[col] = distinct["estimate"]
+            error_bounds["unique"][col] = distinct
+            error_bounds["top_values"][col] = top_values
+            row = {
+                "count": n_rows - nulls[col],
+                "unique": distinct["estimate"],
+                "top": top_values[0]["value"] if top_values else None,
+                "freq": top_values[0]["count"] if top_values else None,
+            }
+            quartiles = sketch.quartiles() if col in numeric_cols else None
+            if quartiles is not None:
+                error_bounds["quantiles"][col] = quartiles
+                row.update({q: quartiles[q] for q in ("25%", "50%", "75%")})
+        else:
+            counts = value_counts[col].counts
+            unique[col] = int(len(counts))
+            row = {
+                "count": n_rows - nulls[col],
+                "unique": unique[col],
+                "top": counts.idxmax() if len(counts) else None,
+                "freq": int(counts.max()) if len(counts) else None,
+            }
+        if col in numeric_cols:
+            acc = moments[col]
+            row["mean"] = acc["mean"]
+            row["std"] = float(np.sqrt(acc["m2"] / (acc["n"] - 1))) if acc["n"] > 1 else np.nan
+            row["min"] = float(minima[col])
+            row["max"] = float(maxima[col])
+        summary_rows[col] = row
+    summary = pd.DataFrame.from_dict(summary_rows, orient="index")
+
+    analysis = {
+        "shape": (n_rows, len(columns)),
+        "dtypes": dtypes,
+        "nulls": nulls,
+        "unique": unique,
+    }
+    if sketches:
+        analysis["error_bounds"] = error_bounds
+    logging.info(f"Profiled {filepath} in chunks: {n_rows} rows, {len(columns)} columns")
+
+    return {
+        "analysis": analysis,
+        "summary": summary,
+        "value_counts": None if approximate else {col: c.counts for col, c in value_counts.items()},
+        "sketches": sketches,
+        "sample": sample.sort_index(),
+    }
+
+
+def should_stream(filepath: str, threshold_mb: Optional[float] = None) -> bool:
+    """Whether a file is large enough to be profiled in chunks instead of loaded whole."""
+    if threshold_mb is None:
+        threshold_mb = float(os.getenv("AUTOML_CHUNKED_ANALYZE_MB", "256"))
+    return os.path.getsize(filepath) > threshold_mb * 1024 * 1024
@@ -0,0 +1,84 @@
+import logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+logging.basicConfig(level=logging.INFO)
+
+# NumPy arrays and scalars are written by orjson's native encoder; NaN/inf become null
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """
+    Fallback for what orjson does not encode natively. The returned value is
+    encoded in turn, so pandas objects hand back their NumPy array.
+    """
+    if isinstance(obj, np.ndarray):
+        # Object, string or non-contiguous arrays
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.to_numpy()
+    if isinstance(obj, pd.DataFrame):
+        return {str(col): obj[col].to_numpy() for col in obj.columns}
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, pd.Timedelta):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _native_keys(obj: Any) -> Any:
+    """Copy of ``obj`` with NumPy scalar dict keys turned into Python scalars."""
+    if isinstance(obj, dict):
+        return {(k.item() if isinstance(k, np.generic) else k): _native_keys(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_native_keys(item) for item in obj]
+    return obj
+
+
+def dumps(content: Any, indent: bool = False) -> bytes:
+    """
+    Serialize a result dict holding NumPy/pandas values to JSON bytes in one pass.
+
+    Args:
+        content: Any mix of dicts, lists, Python scalars, NumPy arrays/scalars
+            and pandas Series/Index/DataFrame/Timestamp values.
+        indent (bool): Pretty-print with two-space indentation.
+
+    Returns:
+        bytes: UTF-8 JSON.
+    """
+    option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    try:
+        return orjson.dumps(content, default=_default, option=option)
+    except orjson.JSONEncodeError as e:
+        # orjson has no hook for dict keys; NumPy keys are rare, so only then copy
+        if "Dict key" not in str(e):
+            raise
+        return orjson.dumps(_native_keys(content), default=_default, option=option)
+
+
+class NumpyJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson and NumPy/pandas support.
+
+    Endpoints that return one directly skip FastAPI's ``jsonable_encoder``
+    walk, so result dicts are traversed exactly once.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,295 @@
+import os
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Default sketch sizes, chosen so a column's sketches stay well under 1 MB
+HLL_PRECISION = 14           # 16384 registers, ~0.8% relative standard error
+KLL_K = 200                  # ~1.65% normalized rank error
+CMS_EPSILON = 0.001          # over-count of at most 0.1% of the rows...
+CMS_DELTA = 0.01             # ...with 99% probability
+TOP_K = 10
+# Distinct values a column may have before exact value counts give way to its sketch
+EXACT_COUNTS_MAX_DISTINCT = int(os.getenv("AUTOML_EXACT_COUNTS_MAX_DISTINCT", "100000"))
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """
+    64-bit hashes of a column's non-null values.
+
+    Numeric values are hashed as float64 so the same number hashes identically
+    whether a chunk was parsed as int or float.
+    """
+    values = series.dropna()
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.util.hash_array(values.to_numpy(dtype="float64"))
+    return pd.util.hash_array(values.to_numpy(dtype=object))
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length for uint64, exact (split into 32-bit halves for float conversion)."""
+    hi = (values >> np.uint64(32)).astype(np.float64)
+    lo = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    hi_len = np.frexp(hi)[1]
+    lo_len = np.frexp(lo)[1]
+    return np.where(hi_len > 0, hi_len + 32, lo_len)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter. Sketches with the same precision merge by register-wise max."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        shift = np.uint64(64 - self.precision)
+        index = (hashes >> shift).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def estimate(self) -> float:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            # Small-range correction (linear counting)
+            return self.m * math.log(self.m / zeros)
+        return float(raw)
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch over float values.
+
+    Items live in compactors; level ``h`` items carry weight ``2**h``. When a level
+    overflows its capacity it is sorted and every other item is promoted, which
+    keeps the sketch size O(k) regardless of stream length. Sketches merge by
+    concatenating levels and compacting.
+    """
+
+    def __init__(self, k: int = KLL_K, seed: Optional[int] = None):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.n = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                items = np.sort(items)
+                # Odd item out stays at this level so total weight is preserved
+                leftover, items = (items[:1], items[1:]) if len(items) % 2 else (items[:0], items)
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = leftover
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    @property
+    def rank_error(self) -> float:
+        # Empirical normalized rank error of KLL (Apache DataSketches)
+        return 2.446 / self.k ** 0.9433
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        if self.n == 0:
+            return [None for _ in qs]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lvl), 2 ** h, dtype=np.float64) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items)
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return [float(items[min(p, len(items) - 1)]) for p in positions]
+
+
+class CountMinSketch:
+    """Count-min frequency sketch; estimates never under-count and over-count by at most epsilon * N w.p. 1 - delta."""
+
+    def __init__(self, epsilon: float = CMS_EPSILON, delta: float = CMS_DELTA):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = int(math.ceil(math.log(1 / delta)))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.n = 0
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        # Kirsch-Mitzenmacher: derive depth hash functions from two 32-bit halves
+        h1 = (hashes & np.uint64(0xFFFFFFFF)).astype(np.int64)
+        h2 = (hashes >> np.uint64(32)).astype(np.int64) | 1
+        rows = np.arange(self.depth, dtype=np.int64)[:, None]
+        return (h1[None, :] + rows * h2[None, :]) % self.width
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        columns = self._columns(hashes)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], minlength=self.width)
+        self.n += len(hashes)
+
+    def estimate_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        if len(hashes) == 0:
+            return np.empty(0, dtype=np.int64)
+        columns = self._columns(hashes)
+        return np.min(self.table[np.arange(self.depth)[:, None], columns], axis=0)
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        if other.table.shape != self.table.shape:
+            raise ValueError("Cannot merge count-min sketches of different shape")
+        self.table += other.table
+        self.n += other.n
+        return self
+
+    @property
+    def max_overcount(self) -> int:
+        return int(math.ceil(self.epsilon * self.n))
+
+
+class ColumnSketch:
+    """
+    Mergeable approximate profile of one column: distinct count (HyperLogLog),
+    quantiles for numeric values (KLL) and top values (count-min over a bounded
+    set of heavy-hitter candidates).
+    """
+
+    def __init__(self, top_k: int = TOP_K, seed: Optional[int] = None):
+        self.top_k = top_k
+        self.hll = HyperLogLog()
+        self.kll = KLLSketch(seed=seed)
+        self.cms = CountMinSketch()
+        self.numeric = True
+        self.candidates: List[Any] = []
+        # Non-null values seen, an upper bound for the distinct count
+        self.count = 0
+
+    def update(self, series: pd.Series) -> None:
+        values = series.dropna()
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        is_numeric = pd.api.types.is_numeric_dtype(values)
+        self.numeric = self.numeric and is_numeric
+        hashes = hash_values(values)
+        self.hll.update_hashes(hashes)
+        self.cms.update_hashes(hashes)
+        if is_numeric and not pd.api.types.is_bool_dtype(values):
+            self.kll.update(values.to_numpy(dtype=np.float64))
+        chunk_top = values.value_counts().head(self.top_k).index.tolist()
+        self._refresh_candidates(chunk_top)
+
+    def _refresh_candidates(self, new_candidates: List[Any]) -> None:
+        candidates = list(dict.fromkeys(self.candidates + new_candidates))
+        estimates = self.cms.estimate_hashes(hash_values(pd.Series(candidates)))
+        order = np.argsort(-estimates, kind="stable")[: self.top_k]
+        self.candidates = [candidates[i] for i in order]
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        self.hll.merge(other.hll)
+        self.kll.merge(other.kll)
+        self.cms.merge(other.cms)
+        self.count += other.count
+        self.numeric = self.numeric and other.numeric
+        self._refresh_candidates(other.candidates)
+        return self
+
+    def top_values(self) -> List[Dict[str, Any]]:
+        if not self.candidates:
+            return []
+        estimates = self.cms.estimate_hashes(hash_values(pd.Series(self.candidates)))
+        return [
+            {"value": value, "count": int(count), "max_overcount": self.cms.max_overcount}
+            for value, count in zip(self.candidates, estimates)
+        ]
+
+    def distinct(self) -> Dict[str, float]:
+        estimate = self.hll.estimate()
+        # Relative standard error, widened to ~95% confidence
+        margin = 2 * self.hll.relative_error * estimate
+        # A column cannot have more distinct values than non-null values
+        return {
+            "estimate": int(min(round(estimate), self.count)),
+            "lower": int(min(max(0, math.floor(estimate - margin)), self.count)),
+            "upper": int(min(math.ceil(estimate + margin), self.count)),
+            "relative_std_error": self.hll.relative_error,
+        }
+
+    def quartiles(self) -> Optional[Dict[str, Any]]:
+        if self.kll.n == 0 or not self.numeric:
+            return None
+        q25, q50, q75 = self.kll.quantiles([0.25, 0.5, 0.75])
+        return {"25%": q25, "50%": q50, "75%": q75, "rank_error": self.kll.rank_error}
+
+
+class BoundedValueCounts:
+    """
+    Exact value counts of a streamed column while it has at most ``max_distinct``
+    distinct values, handed over to a ColumnSketch beyond that.
+
+    The sketch is only built on overflow, seeded from the counts gathered so far,
+    so low-cardinality columns pay for the counts alone and high-cardinality ones
+    (continuous floats, ID columns) stay bounded by ``max_distinct`` plus the sketch.
+    """
+
+    def __init__(self, max_distinct: int = EXACT_COUNTS_MAX_DISTINCT, seed: Optional[int] = None):
+        self.max_distinct = max_distinct
+        self.seed = seed
+        self.counts: Optional[pd.Series] = pd.Series(dtype="int64")
+        self.sketch: Optional[ColumnSketch] = None
+
+    @property
+    def exact(self) -> bool:
+        return self.counts is not None
+
+    def update(self, series: pd.Series) -> None:
+        if self.sketch is not None:
+            self.sketch.update(series)
+            return
+        counts = self.counts.add(series.value_counts(dropna=True), fill_value=0)
+        if len(counts) <= self.max_distinct:
+            self.counts = counts
+            return
+        self.sketch = ColumnSketch(seed=self.seed)
+        self.sketch.update(pd.Series(counts.index.repeat(counts.to_numpy().astype(np.int64))))
+        self.counts = None
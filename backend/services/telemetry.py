@@ -0,0 +1,285 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Root log level and line format: "json" (one object per line) or "text" (key=value)
+LOG_LEVEL = os.getenv("AUTOML_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("AUTOML_LOG_FORMAT", "json")
+
+# Histogram bucket upper bounds
+DURATION_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RSS_BUCKETS_BYTES = tuple(mb * 1024 * 1024 for mb in (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384))
+
+# Polled endpoints whose "request finished" lines are logged at DEBUG
+QUIET_ENDPOINTS = {"/health", "/metrics"}
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Log lines with the timestamp, level, logger, message and every ``extra`` field,
+    as a JSON object or as ``key=value`` pairs.
+    """
+
+    def __init__(self, as_json: bool = True):
+        super().__init__()
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if self.as_json:
+            return json.dumps(entry, default=str)
+        fields = " ".join(f"{k}={v}" for k, v in entry.items() if k not in ("ts", "level", "logger", "message"))
+        return f"{entry['ts']} {entry['level']:<7} {entry['logger']} {entry['message']}" + (f" {fields}" if fields else "")
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """Route all logging through one structured handler on the root logger."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter(as_json=fmt == "json"))
+    logging.basicConfig(level=level, handlers=[handler], force=True)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound)) if bound != int(bound) or bound < 1e6 else str(int(bound))
+
+
+class Histogram:
+    """
+    Cumulative histogram with labels, rendered in the Prometheus text format.
+
+    Args:
+        name (str): Metric name.
+        documentation (str): HELP text.
+        labelnames (Sequence[str]): Label names; missing labels render as "".
+        buckets (Sequence[float]): Sorted bucket upper bounds (+Inf is implied).
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        for key, (counts, total) in series:
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key))
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{_format_bound(bound)}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "automl_stage_duration_seconds", "Time spent in each pipeline stage.",
+    ("stage", "model"), DURATION_BUCKETS_S,
+)
+REQUEST_SECONDS = Histogram(
+    "automl_request_duration_seconds", "HTTP request latency.",
+    ("method", "endpoint", "status"), DURATION_BUCKETS_S,
+)
+REQUEST_PEAK_RSS = Histogram(
+    "automl_request_peak_rss_bytes",
+    "Peak resident memory of the API process while a request ran (overlapping requests share the window).",
+    ("endpoint",), RSS_BUCKETS_BYTES,
+)
+JOB_PEAK_RSS = Histogram(
+    "automl_job_peak_rss_bytes", "Peak resident memory of the worker process running a background job.",
+    ("job",), RSS_BUCKETS_BYTES,
+)
+REGISTRY = (STAGE_SECONDS, REQUEST_SECONDS, REQUEST_PEAK_RSS, JOB_PEAK_RSS)
+
+
+def _proc_status_bytes(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident memory of this process (Linux; None elsewhere)."""
+    return _proc_status_bytes("VmRSS")
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident memory since start or since the last ``reset_peak_rss``."""
+    peak = _proc_status_bytes("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def reset_peak_rss() -> bool:
+    """Restart the peak RSS measurement at the current RSS (Linux only). Returns whether it worked."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# Stage observations of the running job, set while ``capture_stages`` is active
+_captured: Optional[List[Tuple[str, str, float]]] = None
+
+
+def record_stage(name: str, seconds: float, model: str = "") -> None:
+    STAGE_SECONDS.observe(seconds, stage=name, model=model)
+    if _captured is not None:
+        _captured.append((name, model, seconds))
+
+
+@contextmanager
+def stage(name: str, model: str = "", **fields: Any):
+    """
+    Time the block as pipeline stage ``name`` (e.g. "csv_read", "fit") and log it at DEBUG.
+
+    Args:
+        name (str): Stage label.
+        model (str): Model label, e.g. the estimator class; "" when not model specific.
+        **fields: Extra fields for the log line (rows, path, ...).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        record_stage(name, seconds, model)
+        logging.debug("stage finished", extra={"stage": name, "model": model, "seconds": round(seconds, 4), **fields})
+
+
+def model_label(model: Any) -> str:
+    """Class name of the estimator, or of the last step of a Pipeline."""
+    steps = getattr(model, "steps", None)
+    return type(steps[-1][1] if steps else model).__name__
+
+
+@contextmanager
+def capture_stages():
+    """
+    Collect the stages and peak RSS of a job running in a worker process, so
+    the API process can record them with ``replay_job_telemetry``.
+    """
+    global _captured
+    previous, _captured = _captured, []
+    reset_peak_rss()
+    telemetry: Dict[str, Any] = {"stages": _captured}
+    try:
+        yield telemetry
+    finally:
+        telemetry["peak_rss_bytes"] = peak_rss_bytes()
+        _captured = previous
+
+
+def run_captured(fn, *args, **kwargs):
+    """Call ``fn`` under ``capture_stages``; returns (result, telemetry). Picklable for process pools."""
+    with capture_stages() as telemetry:
+        result = fn(*args, **kwargs)
+    return result, telemetry
+
+
+def replay_job_telemetry(job: str, telemetry: Dict[str, Any]) -> None:
+    """Record the stages and peak RSS a worker process captured for ``job``."""
+    for name, model, seconds in telemetry.get("stages", []):
+        STAGE_SECONDS.observe(seconds, stage=name, model=model)
+    if telemetry.get("peak_rss_bytes"):
+        JOB_PEAK_RSS.observe(telemetry["peak_rss_bytes"], job=job)
+
+
+_inflight = 0
+_inflight_lock = threading.Lock()
+
+
+@contextmanager
+def track_request(method: str):
+    """
+    Measure one HTTP request. The caller sets ``endpoint`` and ``status`` on the
+    yielded dict; latency and peak RSS are recorded on exit.
+
+    The peak RSS window restarts whenever the API goes from idle to busy, so a
+    request's peak includes the requests that overlapped it.
+    """
+    global _inflight
+    with _inflight_lock:
+        if _inflight == 0:
+            reset_peak_rss()
+        _inflight += 1
+    info = {"endpoint": "unmatched", "status": 500}
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        seconds = time.perf_counter() - start
+        with _inflight_lock:
+            _inflight -= 1
+        peak = peak_rss_bytes()
+        REQUEST_SECONDS.observe(seconds, method=method, endpoint=info["endpoint"], status=info["status"])
+        REQUEST_PEAK_RSS.observe(peak, endpoint=info["endpoint"])
+        level = logging.DEBUG if info["endpoint"] in QUIET_ENDPOINTS and info["status"] < 400 else logging.INFO
+        logging.log(level, "request finished", extra={
+            "method": method, "endpoint": info["endpoint"], "status": info["status"],
+            "seconds": round(seconds, 4), "peak_rss_mb": round(peak / 2**20, 1),
+        })
+
+
+def render_metrics() -> str:
+    """All metrics plus current and peak process RSS, in the Prometheus text format."""
+    lines = []
+    for histogram in REGISTRY:
+        lines.extend(histogram.render())
+    rss = current_rss_bytes()
+    if rss is not None:
+        lines += ["# HELP automl_process_resident_memory_bytes Resident memory of the API process.",
+                  "# TYPE automl_process_resident_memory_bytes gauge",
+                  f"automl_process_resident_memory_bytes {rss}"]
+    return "\n".join(lines) + "\n"
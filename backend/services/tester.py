@@ -1,35 +1,30 @@
+import os
 import numpy as np
 import pandas as pd
 import logging
 from typing import Any, Dict, Optional
 from sklearn.metrics import (
-    classification_report,
-    confusion_matrix,
     roc_auc_score,
     mean_squared_error,
     r2_score,
     mean_absolute_error,
 )
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from services.metrics import (
+    ConfusionAccumulator,
+    RegressionAccumulator,
+    BinnedROCAUC,
+    classification_metrics,
+    report_from_confusion,
+)
+from services.preprocessing import decode_target, has_fitted_preprocessing, legacy_prepare_features
+from services.profiler import PROFILE_CHUNKSIZE
+from services.telemetry import model_label, stage
 
 logging.basicConfig(level=logging.INFO)
 
-def convert_numpy_types(obj):
-    """Convert NumPy types to Python native types for JSON serialization"""
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {key: convert_numpy_types(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
-    elif hasattr(obj, 'item'):  # Handle numpy scalars
-        return obj.item()
-    return obj
+# Test files above this size are evaluated in chunks when mode is "auto"
+CHUNKED_EVALUATE_MB = float(os.getenv("AUTOML_CHUNKED_EVALUATE_MB", "256"))
 
 def evaluate_model(
     model: Any,
@@ -53,8 +48,9 @@ def evaluate_model(
     """
 
     # Infer task type if not supplied
+    n_unique = pd.Series(y_test).nunique()
     if task_type is None:
-        if len(np.unique(y_test)) <= 20 and len(y_test) >= 10:
+        if n_unique <= 20 and len(y_test) >= 10:
             task_type = "classification"
         else:
             task_type = "regression"
@@ -63,27 +59,24 @@ def evaluate_model(
 
     results = {}
 
-    # Perform predictions
-    y_pred = model.predict(X_test)
+    # Perform predictions; models with a label-encoded target are scored on
+    # the original labels, as they appear in the test data
+    with stage("predict", model=model_label(model), rows=len(X_test)):
+        y_pred = decode_target(model, model.predict(X_test))
 
     if task_type == "classification":
-        # Get classification report
-        class_report = classification_report(y_test, y_pred, output_dict=True)
-        results["classification_report"] = convert_numpy_types(class_report)
-        
-        # Get confusion matrix
-        cm = confusion_matrix(y_test, y_pred)
-        results["confusion_matrix"] = cm.tolist()
-        
-        # Add summary metrics
-        from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
-        results["accuracy"] = float(accuracy_score(y_test, y_pred))
-        results["f1_macro"] = float(f1_score(y_test, y_pred, average="macro"))
-        results["precision_macro"] = float(precision_score(y_test, y_pred, average="macro"))
-        results["recall_macro"] = float(recall_score(y_test, y_pred, average="macro"))
+        # Labels are encoded once; the report, confusion matrix and summary
+        # metrics are all derived from a single confusion matrix
+        metrics = classification_metrics(y_test, y_pred)
+        results["classification_report"] = metrics["classification_report"]
+        results["confusion_matrix"] = metrics["confusion_matrix"]
+        results["accuracy"] = metrics["accuracy"]
+        results["f1_macro"] = metrics["f1_macro"]
+        results["precision_macro"] = metrics["precision_macro"]
+        results["recall_macro"] = metrics["recall_macro"]
 
         # ROC-AUC if binary classification and predict_proba available
-        if hasattr(model, "predict_proba") and len(np.unique(y_test)) == 2:
+        if hasattr(model, "predict_proba") and n_unique == 2:
             try:
                 probs = model.predict_proba(X_test)[:, 1]
                 results["roc_auc"] = float(roc_auc_score(y_test, probs))
@@ -93,10 +86,10 @@ def evaluate_model(
         # Add metadata
         results["meta"] = {
             "task_type": "classification",
-            "n_classes": int(len(np.unique(y_test))),
+            "n_classes": int(n_unique),
             "test_samples": int(len(y_test)),
             "feature_count": int(X_test.shape[1]),
-            "class_distribution": {int(k): int(v) for k, v in pd.Series(y_test).value_counts().items()}
+            "class_distribution": {k: int(v) for k, v in metrics["class_distribution"].items()}
         }
 
         if plot:
@@ -132,13 +125,121 @@ def evaluate_model(
     else:
         raise ValueError(f"Unknown task_type: {task_type}")
 
-    # Ensure all values are JSON-serializable
-    results = convert_numpy_types(results)
-    
     logging.info(f"Evaluation completed for {task_type}. Main metric: {results.get('accuracy', results.get('r2_score', 'N/A'))}")
 
     return results
 
+def evaluate_model_chunked(
+    model: Any,
+    filepath: str,
+    target_column: str,
+    task_type: Optional[str] = None,
+    chunksize: int = PROFILE_CHUNKSIZE,
+) -> Dict:
+    """
+    Evaluate a trained model on a test CSV streamed in chunks.
+
+    Each chunk is predicted and folded into running accumulators (confusion
+    matrix, error sums, score histograms for ROC-AUC; see services/metrics.py),
+    so memory is bounded by ``chunksize`` whatever the size of the file. Returns
+    the same dict as ``evaluate_model``; ROC-AUC is computed from binned scores.
+
+    Args:
+        model: Trained model, a Pipeline from ``train_model`` or a legacy bare estimator.
+        filepath: Test CSV, including the target column.
+        target_column: Name of the target column.
+        task_type: 'classification' or 'regression'. If None, inferred like
+            ``evaluate_model`` (at most 20 distinct targets and 10+ rows).
+        chunksize: Rows per chunk.
+    """
+    confusion = ConfusionAccumulator() if task_type != "regression" else None
+    regression = RegressionAccumulator() if task_type != "classification" else None
+    roc = BinnedROCAUC() if task_type != "regression" and hasattr(model, "predict_proba") else None
+    feature_count = None
+    n_rows = 0
+
+    for chunk in pd.read_csv(filepath, chunksize=chunksize):
+        if target_column not in chunk.columns:
+            raise ValueError(f"Target column '{target_column}' not found in test data. Available columns: {list(chunk.columns)}")
+        # The target itself is never imputed
+        chunk = chunk.dropna(subset=[target_column])
+        X = chunk.drop(columns=[target_column])
+        y = chunk[target_column]
+        if not has_fitted_preprocessing(model):
+            X = legacy_prepare_features(X, model)
+            y = y.loc[X.index]
+        if len(X) == 0:
+            continue
+        feature_count = X.shape[1]
+        n_rows += len(X)
+
+        with stage("predict", model=model_label(model), rows=len(X)):
+            y_pred = decode_target(model, model.predict(X))
+        if confusion is not None:
+            confusion.update(y, y_pred)
+            if task_type is None and len(confusion.true_counts) > 20:
+                confusion = roc = None  # too many distinct targets: regression
+        if roc is not None:
+            try:
+                roc.update(y, model.predict_proba(X)[:, 1])
+            except Exception as e:
+                logging.warning(f"Could not calculate ROC-AUC: {e}")
+                roc = None
+        if regression is not None:
+            if pd.api.types.is_numeric_dtype(y) and np.issubdtype(np.asarray(y_pred).dtype, np.number):
+                regression.update(y, y_pred)
+            else:
+                regression = None
+
+    if n_rows == 0:
+        raise ValueError("No valid test samples after preprocessing")
+    if task_type is None:
+        task_type = "classification" if confusion is not None and n_rows >= 10 else "regression"
+    logging.info(f"Evaluated model in chunks for task type: {task_type}")
+
+    results = {}
+    if task_type == "classification":
+        if confusion is None:
+            raise ValueError("Classification metrics need label predictions")
+        labels = confusion.labels()
+        cm = confusion.matrix()
+        report = report_from_confusion(cm, labels)
+        results["classification_report"] = report
+        results["confusion_matrix"] = cm.tolist()
+        results["accuracy"] = report["accuracy"]
+        results["f1_macro"] = report["macro avg"]["f1-score"]
+        results["precision_macro"] = report["macro avg"]["precision"]
+        results["recall_macro"] = report["macro avg"]["recall"]
+        auc = roc.auc() if roc is not None else None
+        if auc is not None:
+            results["roc_auc"] = auc
+        results["meta"] = {
+            "task_type": "classification",
+            "n_classes": len(confusion.true_counts),
+            "test_samples": n_rows,
+            "feature_count": int(feature_count),
+            "class_distribution": {
+                k: v for k, v in sorted(confusion.true_counts.items(), key=lambda kv: -kv[1])
+            },
+        }
+    elif task_type == "regression":
+        if regression is None:
+            raise ValueError("Regression metrics need a numeric target and predictions")
+        results.update(regression.metrics())
+        results["meta"] = {
+            "task_type": "regression",
+            "test_samples": n_rows,
+            "feature_count": int(feature_count),
+            "target_range": regression.y_range,
+            "prediction_range": regression.pred_range,
+        }
+    else:
+        raise ValueError(f"Unknown task_type: {task_type}")
+
+    logging.info(f"Chunked evaluation completed for {task_type} on {n_rows} rows. "
+                 f"Main metric: {results.get('accuracy', results.get('r2_score', 'N/A'))}")
+    return results
+
 if __name__ == "__main__":
     import joblib
     import sys
@@ -159,10 +260,10 @@ if __name__ == "__main__":
 
         results = evaluate_model(model, X_test, y_test, plot=True)
 
-        import json
+        from services.serialization import dumps
 
         print("Evaluation Results:")
-        print(json.dumps(results, indent=2))
+        print(dumps(results, indent=True).decode())
 
     except Exception as e:
         logging.error(f"Evaluation failed: {e}")
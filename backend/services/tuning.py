@@ -0,0 +1,229 @@
+import os
+import math
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import Matern, WhiteKernel
+from scipy.stats import norm
+
+from services.automl import successive_halving, AUTOML_N_JOBS, AUTOML_MIN_RESOURCES
+from services.trainer import split_train_test
+
+logging.basicConfig(level=logging.INFO)
+
+SEARCH_MODES = ("random", "bayesian")
+# Trials raced against each other in one successive-halving bracket
+TRIALS_PER_BRACKET = int(os.getenv("AUTOML_TRIALS_PER_BRACKET", "8"))
+# Share of the training split held out to score trials (the test split is never used for tuning)
+TUNING_VALIDATION_SIZE = 0.2
+# Random candidates scored by the surrogate for each Bayesian proposal batch
+BAYES_CANDIDATES = 1000
+
+# Search spaces per MODEL_MAP entry: ("int"|"float", low, high, log) or ("choice", [values])
+SEARCH_SPACES: Dict[str, Dict[str, tuple]] = {
+    "RandomForestClassifier": {
+        "n_estimators": ("int", 50, 500, True),
+        "max_depth": ("choice", [None, 4, 8, 16, 32]),
+        "min_samples_split": ("int", 2, 20, False),
+        "min_samples_leaf": ("int", 1, 10, False),
+        "max_features": ("choice", ["sqrt", "log2", 1.0]),
+    },
+    "GradientBoostingClassifier": {
+        "n_estimators": ("int", 50, 400, True),
+        "learning_rate": ("float", 0.01, 0.3, True),
+        "max_depth": ("int", 2, 6, False),
+        "subsample": ("float", 0.5, 1.0, False),
+        "min_samples_leaf": ("int", 1, 20, False),
+    },
+    "LogisticRegression": {
+        "C": ("float", 1e-3, 1e2, True),
+        "class_weight": ("choice", [None, "balanced"]),
+    },
+}
+SEARCH_SPACES["HistGradientBoostingClassifier"] = {
+    "max_iter": ("int", 50, 500, True),
+    "learning_rate": ("float", 0.01, 0.3, True),
+    "max_leaf_nodes": ("int", 15, 127, True),
+    "min_samples_leaf": ("int", 5, 100, True),
+    "l2_regularization": ("float", 1e-4, 10.0, True),
+}
+SEARCH_SPACES["HistGradientBoostingRegressor"] = SEARCH_SPACES["HistGradientBoostingClassifier"]
+SEARCH_SPACES["RandomForestRegressor"] = SEARCH_SPACES["RandomForestClassifier"]
+SEARCH_SPACES["GradientBoostingRegressor"] = SEARCH_SPACES["GradientBoostingClassifier"]
+
+
+def sample_params(space: Dict[str, tuple], rng: np.random.Generator) -> Dict[str, Any]:
+    """Draw one configuration uniformly (log-uniformly where flagged) from ``space``."""
+    params = {}
+    for name, spec in space.items():
+        if spec[0] == "choice":
+            params[name] = spec[1][rng.integers(len(spec[1]))]
+            continue
+        kind, low, high, log = spec
+        value = math.exp(rng.uniform(math.log(low), math.log(high))) if log else rng.uniform(low, high)
+        params[name] = int(round(value)) if kind == "int" else float(value)
+    return params
+
+
+def encode_params(params: Dict[str, Any], space: Dict[str, tuple]) -> np.ndarray:
+    """Map a configuration to the unit cube, the input space of the surrogate model."""
+    encoded = []
+    for name, spec in space.items():
+        value = params[name]
+        if spec[0] == "choice":
+            encoded.append(spec[1].index(value) / max(1, len(spec[1]) - 1))
+            continue
+        _, low, high, log = spec
+        if log:
+            encoded.append((math.log(value) - math.log(low)) / (math.log(high) - math.log(low)))
+        else:
+            encoded.append((value - low) / (high - low))
+    return np.asarray(encoded, dtype=np.float64)
+
+
+def propose_bayesian(space: Dict[str, tuple], observed: List[Dict[str, Any]], n: int,
+                     rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """
+    Propose ``n`` configurations by expected improvement.
+
+    The Gaussian-process surrogate is fitted on every halving round observed so
+    far, with the round's share of the training data as an extra input, and is
+    queried at full budget. This lets the cheap early-stopped rounds inform the
+    search instead of only the few trials that reached the last round.
+    """
+    X_obs = np.array([np.append(encode_params(o["params"], space), o["fidelity"]) for o in observed])
+    y_obs = np.array([o["score"] for o in observed])
+
+    gp = GaussianProcessRegressor(
+        kernel=Matern(nu=2.5) + WhiteKernel(noise_level=1e-3),
+        normalize_y=True,
+        random_state=int(rng.integers(2**31)),
+    )
+    gp.fit(X_obs, y_obs)
+
+    pool = [sample_params(space, rng) for _ in range(BAYES_CANDIDATES)]
+    X_pool = np.array([np.append(encode_params(p, space), 1.0) for p in pool])
+    mean, std = gp.predict(X_pool, return_std=True)
+    best = y_obs[X_obs[:, -1] == X_obs[:, -1].max()].max()
+    std = np.maximum(std, 1e-9)
+    z = (mean - best - 0.01) / std
+    expected_improvement = (mean - best - 0.01) * norm.cdf(z) + std * norm.pdf(z)
+
+    proposals, seen = [], set()
+    for idx in np.argsort(-expected_improvement):
+        key = tuple(sorted((k, str(v)) for k, v in pool[idx].items()))
+        if key not in seen:
+            seen.add(key)
+            proposals.append(pool[idx])
+        if len(proposals) == n:
+            break
+    return proposals
+
+
+def tune_hyperparameters(
+    model_name: str,
+    model_class,
+    X_train,
+    y_train,
+    is_classification: bool,
+    search: str = "random",
+    n_trials: int = 20,
+    time_budget_s: Optional[float] = None,
+    fixed_params: Optional[dict] = None,
+    eta: int = 2,
+    n_jobs: int = AUTOML_N_JOBS,
+    random_state: int = 42,
+) -> Dict[str, Any]:
+    """
+    Search hyperparameters for ``model_class`` on an already preprocessed matrix.
+
+    Trials are raced in brackets of successive halving (see
+    ``services.automl.successive_halving``): poor configurations are stopped
+    after fitting on a small subsample. Each bracket's trials are fitted in
+    parallel worker processes; joblib memory-maps ``X_train`` so workers share it
+    instead of receiving a copy. "random" samples every bracket independently,
+    "bayesian" proposes later brackets by expected improvement.
+
+    The wall-clock budget is checked between halving rounds: once exceeded, no
+    new bracket starts and the running bracket goes straight to its final round.
+
+    Returns:
+        dict: best_params (merged with ``fixed_params``), best_score, the metric,
+            the history of every trial and timing information.
+    """
+    if search not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{search}'. Choose from {list(SEARCH_MODES)}")
+    fixed_params = fixed_params or {}
+    space = {k: v for k, v in SEARCH_SPACES.get(model_name, {}).items() if k not in fixed_params}
+    if not space:
+        raise ValueError(f"No tunable hyperparameters for '{model_name}'")
+
+    start = time.perf_counter()
+    deadline = start + time_budget_s if time_budget_s else None
+    rng = np.random.default_rng(random_state)
+
+    X_fit, X_val, y_fit, y_val = split_train_test(
+        X_train, y_train, TUNING_VALIDATION_SIZE, random_state, is_classification
+    )
+    n_fit = X_fit.shape[0]
+
+    trials: List[Dict[str, Any]] = []
+    observed: List[Dict[str, Any]] = []
+    best: Optional[Dict[str, Any]] = None
+    bracket = 0
+    while len(trials) < n_trials and (deadline is None or time.perf_counter() < deadline):
+        size = min(TRIALS_PER_BRACKET, n_trials - len(trials))
+        if search == "bayesian" and observed:
+            configs = propose_bayesian(space, observed, size, rng)
+        else:
+            configs = [sample_params(space, rng) for _ in range(size)]
+
+        names = [f"trial_{len(trials) + i}" for i in range(size)]
+        candidates = {name: model_class(**fixed_params, **params) for name, params in zip(names, configs)}
+        leaderboard, _ = successive_halving(
+            candidates, X_fit, y_fit, X_val, y_val, is_classification,
+            eta=eta, min_resources=AUTOML_MIN_RESOURCES, n_jobs=n_jobs,
+            random_state=random_state, deadline=deadline,
+        )
+
+        params_by_name = dict(zip(names, configs))
+        for entry in sorted(leaderboard, key=lambda e: int(e["name"].split("_")[1])):
+            params = params_by_name[entry["name"]]
+            trial = {
+                "trial": int(entry["name"].split("_")[1]),
+                "bracket": bracket,
+                "params": params,
+                "score": entry["final_score"],
+                "n_samples": entry["final_n_samples"],
+                "rounds": entry["rounds"],
+                "stopped_early": entry["final_n_samples"] < n_fit,
+            }
+            trials.append(trial)
+            observed += [{"params": params, "fidelity": r["n_samples"] / n_fit, "score": r["score"]}
+                         for r in entry["rounds"]]
+            if not trial["stopped_early"] and (best is None or trial["score"] > best["score"]):
+                best = trial
+        bracket += 1
+
+    if best is None:
+        raise RuntimeError("Hyperparameter search finished no trial within the time budget")
+
+    wall_time = time.perf_counter() - start
+    logging.info(f"Tuned {model_name} with {search} search: {len(trials)} trials in {wall_time:.2f}s, "
+                 f"best score {best['score']:.4f} with {best['params']}")
+    return {
+        "search": search,
+        "metric": "accuracy" if is_classification else "r2_score",
+        "best_params": {**fixed_params, **best["params"]},
+        "best_score": best["score"],
+        "best_trial": best["trial"],
+        "n_trials": len(trials),
+        "brackets": bracket,
+        "trials": trials,
+        "time_budget_s": time_budget_s,
+        "budget_exhausted": deadline is not None and time.perf_counter() >= deadline,
+        "wall_time": wall_time,
+    }
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Tests import the services the way main.py does, from the backend directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def string_target_csv(tmp_path):
+    """Small classification dataset with a yes/no target driven by ``num``."""
+    rng = np.random.default_rng(0)
+    n_rows = 200
+    num = rng.normal(size=n_rows)
+    df = pd.DataFrame({
+        "num": num,
+        "cat": rng.choice(["a", "b", "c"], n_rows),
+        "y": np.where(num + rng.normal(scale=0.3, size=n_rows) > 0, "yes", "no"),
+    })
+    path = tmp_path / "string_target.csv"
+    df.to_csv(path, index=False)
+    return path
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from services.analyzer import analyze_dataset
+from services.llm import set_llm_client
+from services.metadata import compute_metadata
+
+
+def test_auto_mode_does_not_serve_approximate_sidecar_counts(tmp_path, monkeypatch):
+    set_llm_client(None)
+    path = tmp_path / "ids.csv"
+    pd.DataFrame({"id": [f"u{i}" for i in range(3000)], "group": ["a", "b", "c"] * 1000}).to_csv(path, index=False)
+    # Every file counts as large, so the sidecar gets sketch-based distinct counts
+    monkeypatch.setenv("AUTOML_CHUNKED_ANALYZE_MB", "0")
+    metadata = compute_metadata(path)
+    assert metadata["unique_exact"] is False
+
+    exact = analyze_dataset(str(path))["analysis"]
+    assert exact["unique_exact"] is True
+    assert exact["unique"] == {"id": 3000, "group": 3}
+    assert "error_bounds" not in exact
+
+    approximate = analyze_dataset(str(path), mode="approximate")["analysis"]
+    assert approximate["unique_exact"] is False
+    bounds = approximate["error_bounds"]["unique"]["id"]
+    assert bounds["lower"] <= 3000 <= bounds["upper"]
+
+
+def test_analyze_dataset_rejects_unknown_mode(string_target_csv):
+    with pytest.raises(ValueError, match="Unknown analysis mode"):
+        analyze_dataset(str(string_target_csv), mode="bogus")
+
+
+def test_analyze_endpoint_returns_400_for_unknown_mode(string_target_csv, tmp_path, monkeypatch):
+    # /analyze resolves the file name under uploads/ in the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "uploads").mkdir()
+    (tmp_path / "uploads" / "data.csv").write_bytes(string_target_csv.read_bytes())
+    from main import app
+
+    response = TestClient(app).post("/analyze", json={"filepath": "data.csv", "mode": "bogus"})
+    assert response.status_code == 400
+    assert "Unknown analysis mode" in response.json()["detail"]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from services.cleaner import clean_data
+from services.sketches import BoundedValueCounts
+
+
+def test_clean_data_rejects_unknown_mode(string_target_csv):
+    with pytest.raises(ValueError, match="Unknown cleaning mode"):
+        clean_data(str(string_target_csv), mode="bogus")
+
+
+def test_clean_endpoint_returns_400_for_unknown_mode(string_target_csv, monkeypatch):
+    # main creates uploads/ in the working directory on import
+    monkeypatch.chdir(string_target_csv.parent)
+    from main import app
+
+    response = TestClient(app).post("/clean", json={"filepath": str(string_target_csv), "mode": "bogus"})
+    assert response.status_code == 400
+    assert "Unknown cleaning mode" in response.json()["detail"]
+
+
+def test_chunked_cleaning_matches_full_cleaning(tmp_path):
+    rng = np.random.default_rng(0)
+    n_rows = 1000
+    df = pd.DataFrame({
+        "value": rng.normal(size=n_rows).round(3),
+        "count": rng.integers(0, 5, n_rows).astype(float),
+        "color": rng.choice(["red", "green", "blue"], n_rows, p=[0.5, 0.3, 0.2]),
+        "id": [f"id{i}" for i in range(n_rows)],
+    })
+    for col in ("value", "count", "color"):
+        df.loc[rng.random(n_rows) < 0.1, col] = None
+    path = tmp_path / "nulls.csv"
+    df.to_csv(path, index=False)
+
+    full = pd.read_csv(clean_data(str(path), mode="full"))
+    chunked = pd.read_csv(clean_data(str(path), mode="chunked", chunksize=128))
+    pd.testing.assert_frame_equal(full, chunked)
+
+
+def test_bounded_value_counts_fall_back_to_the_sketch():
+    counts = BoundedValueCounts(max_distinct=50)
+    counts.update(pd.Series(["a", "b", "a", None]))
+    assert counts.exact
+    assert counts.counts.to_dict() == {"a": 2, "b": 1}
+
+    counts.update(pd.Series([f"id{i}" for i in range(100)]))
+    assert not counts.exact
+    assert counts.sketch.count == 103
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+from services.cross_validation import cross_validate_model
+from services.trainer import make_preprocessor, train_model, MODEL_MAP
+
+
+def test_cross_validation_fits_a_preprocessing_pipeline_per_fold(string_target_csv):
+    df = pd.read_csv(string_target_csv)
+    X, y = df.drop(columns=["y"]), (df["y"] == "yes").to_numpy()
+    model = Pipeline([("preprocess", make_preprocessor("LogisticRegression")),
+                      ("model", MODEL_MAP["LogisticRegression"]())])
+
+    results = cross_validate_model(model, X, y, is_classification=True, n_folds=4, n_jobs=1)
+
+    assert [fold["train_size"] for fold in results["folds"]] == [150] * 4
+    assert results["aggregate"]["accuracy"]["mean"] > 0.8
+
+
+def test_train_model_cross_validates_raw_features(string_target_csv):
+    report, _ = train_model(str(string_target_csv), "y", "HistGradientBoostingClassifier", cv_folds=3)
+    cv = report["cross_validation"]
+    assert cv["n_folds"] == 3
+    assert np.isfinite(cv["aggregate"]["accuracy"]["mean"])
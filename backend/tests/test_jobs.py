@@ -0,0 +1,81 @@
+import os
+import signal
+import time
+
+from services.jobs import CANCELLED, COMPLETED, FAILED, JobManager
+
+
+def add(a, b):
+    return a + b
+
+
+def die():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def write_artifact(content, delay, model_save_path):
+    with open(model_save_path, "w") as f:
+        f.write(content)
+    time.sleep(delay)
+    return content
+
+
+def wait_for(manager, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job["finished_at"] is not None:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish: {manager.get(job_id)}")
+
+
+def test_killed_worker_fails_its_job_and_the_pool_recovers():
+    manager = JobManager(max_workers=1)
+    try:
+        killed = wait_for(manager, manager.submit(die))
+        assert killed["status"] == FAILED
+        assert "died" in killed["error"]
+
+        job = wait_for(manager, manager.submit(add, 1, 2))
+        assert job["status"] == COMPLETED
+        assert job["result"] == 3
+    finally:
+        manager.shutdown()
+
+
+def test_failing_finalize_fails_the_job_and_starts_the_next():
+    def broken_finalize(result):
+        raise KeyError("missing")
+
+    manager = JobManager(max_workers=1)
+    try:
+        first = manager.submit(add, 1, 2, finalize=broken_finalize)
+        second = manager.submit(add, 2, 3)
+
+        failed = wait_for(manager, first)
+        assert failed["status"] == FAILED
+        assert "missing" in failed["error"]
+        assert wait_for(manager, second)["result"] == 5
+    finally:
+        manager.shutdown()
+
+
+def test_cancelled_job_keeps_the_published_artifact(tmp_path):
+    artifact = tmp_path / "model.joblib"
+    manager = JobManager(max_workers=1)
+    try:
+        first = wait_for(manager, manager.submit(write_artifact, "good", 0, artifact_path=str(artifact)))
+        assert first["status"] == COMPLETED
+        assert artifact.read_text() == "good"
+
+        retrain = manager.submit(write_artifact, "retrained", 1, artifact_path=str(artifact))
+        while manager.get(retrain)["status"] != "running":
+            time.sleep(0.05)
+        manager.cancel(retrain)
+        assert wait_for(manager, retrain)["status"] == CANCELLED
+
+        assert artifact.read_text() == "good"
+        assert [p.name for p in tmp_path.iterdir()] == ["model.joblib"]
+    finally:
+        manager.shutdown()
@@ -0,0 +1,33 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.model_selector import PROXY_SCORE_DECIMALS, _get_proxy_executor, rank_models_by_proxy, select_model
+
+
+def test_proxy_ranking_is_ordered_by_score(string_target_csv):
+    ranking = rank_models_by_proxy(pd.read_csv(string_target_csv), "y")["ranking"]["candidates"]
+    scores = [round(r["score"], PROXY_SCORE_DECIMALS) for r in ranking]
+    assert scores == sorted(scores, reverse=True)
+    assert [r["rank"] for r in ranking] == list(range(1, len(ranking) + 1))
+
+
+@pytest.mark.parametrize("target, strategy", [("missing", "proxy"), ("y", "bogus")])
+def test_select_model_raises_value_error_for_bad_input(string_target_csv, target, strategy):
+    with pytest.raises(ValueError):
+        select_model(str(string_target_csv), target, strategy)
+
+
+def test_proxy_fit_is_stopped_at_the_time_budget():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(2000, 40)), columns=[f"x{i}" for i in range(40)])
+    df["y"] = np.where(df["x0"] > 0, "yes", "no")
+    # Warm the worker so the budget is spent fitting, not starting the process
+    _get_proxy_executor().submit(int).result()
+
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError, match="time budget"):
+        rank_models_by_proxy(df, "y", time_budget_s=0.2)
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,19 @@
+import joblib
+import pandas as pd
+
+from services.predictor import predict_frame
+from services.trainer import train_model
+
+
+def test_predict_frame_returns_original_labels_for_string_target(string_target_csv, tmp_path):
+    report, model = train_model(str(string_target_csv), "y", "LogisticRegression")
+    assert report["meta"]["classes"] == ["no", "yes"]
+
+    # Round-trip through joblib like /train and /predict do
+    artifact = tmp_path / "model.joblib"
+    joblib.dump(model, artifact)
+    result = predict_frame(joblib.load(artifact), pd.DataFrame({"num": [-3.0, 3.0], "cat": ["a", "b"]}))
+
+    assert list(result["predictions"]) == ["no", "yes"]
+    assert list(result["classes"]) == ["no", "yes"]
+    assert result["probabilities"].shape == (2, 2)
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from services.profiler import profile_csv
+
+
+def test_exact_profile_sketches_only_high_cardinality_columns(tmp_path):
+    path = tmp_path / "ids.csv"
+    pd.DataFrame({"id": [f"u{i}" for i in range(3000)], "group": ["a", "b", "c"] * 1000}).to_csv(path, index=False)
+
+    profile = profile_csv(str(path), chunksize=500, max_distinct=100)
+    analysis = profile["analysis"]
+
+    assert analysis["unique"]["group"] == 3
+    assert profile["value_counts"]["group"].to_dict() == {"a": 1000, "b": 1000, "c": 1000}
+    assert profile["value_counts"]["id"] is None
+    assert list(profile["sketches"]) == ["id"]
+    bounds = analysis["error_bounds"]["unique"]
+    assert list(bounds) == ["id"]
+    assert bounds["id"]["lower"] <= 3000 <= bounds["id"]["upper"]
+    assert profile["summary"].loc["id", "count"] == 3000
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from services.sketches import ColumnSketch
+
+
+def test_distinct_is_clamped_to_the_non_null_count():
+    n_rows = 25_000
+    sketch = ColumnSketch()
+    # Streamed in chunks and merged, like profile_csv does
+    for start in range(0, n_rows, 10_000):
+        part = ColumnSketch()
+        part.update(pd.Series([f"id{i}" for i in range(start, min(start + 10_000, n_rows))] + [None]))
+        sketch.merge(part)
+
+    distinct = sketch.distinct()
+    assert sketch.count == n_rows
+    assert distinct["estimate"] <= n_rows
+    assert distinct["upper"] == n_rows
+    assert distinct["lower"] <= distinct["estimate"] <= distinct["upper"]
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from services.serialization import dumps
+from services.tester import evaluate_model, evaluate_model_chunked
+from services.trainer import train_model
+
+
+def test_evaluate_string_target_full_and_chunked(string_target_csv):
+    _, model = train_model(str(string_target_csv), "y", "LogisticRegression")
+    df = pd.read_csv(string_target_csv)
+
+    full = evaluate_model(model, df.drop(columns=["y"]), df["y"], plot=False)
+    chunked = evaluate_model_chunked(model, str(string_target_csv), "y", chunksize=64)
+
+    for results in (full, chunked):
+        assert results["accuracy"] > 0.8
+        assert set(results["meta"]["class_distribution"]) == {"no", "yes"}
+        assert {"no", "yes"} <= set(results["classification_report"])
+        dumps(results)
+    assert full["accuracy"] == chunked["accuracy"]
+    assert full["meta"]["class_distribution"] == chunked["meta"]["class_distribution"]
@@ -0,0 +1,24 @@
+import typing
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services.tuning import SEARCH_MODES
+
+
+def test_training_request_accepts_the_tuning_search_modes():
+    from main import TrainingRequest
+
+    search = TrainingRequest.model_fields["search"].annotation
+    assert set(typing.get_args(typing.get_args(search)[0])) == set(SEARCH_MODES)
+
+
+@pytest.mark.parametrize("params", [{"n_trials": 0}, {"n_trials": 100_000}, {"search": "grid"}])
+def test_train_endpoint_rejects_bad_search_settings(string_target_csv, monkeypatch, params):
+    # main creates uploads/ in the working directory on import
+    monkeypatch.chdir(string_target_csv.parent)
+    from main import app
+
+    body = {"filepath": string_target_csv.name, "target_column": "y", "model_name": "LogisticRegression", **params}
+    response = TestClient(app).post("/train", json=body)
+    assert response.status_code == 422
@@ -82,6 +82,8 @@ const ModelSelection: React.FC<ModelSelectionProps> = ({
       'GradientBoostingClassifier': 'Sequential tree building for high-accuracy classification',
       'GradientBoostingRegressor': 'Sequential tree building for high-accuracy regression',
       'LogisticRegression': 'Linear model with sigmoid function for interpretable classification',
+      'HistGradientBoostingClassifier': 'Histogram-based boosting for fast classification on large tables',
+      'HistGradientBoostingRegressor': 'Histogram-based boosting for fast regression on large tables',
     };
     return descriptions[modelName] || 'Advanced machine learning algorithm';
   };
@@ -59,7 +59,26 @@ const ModelTraining: React.FC<ModelTrainingProps> = ({
         throw new Error(`Training failed: ${response.status}`);
       }
 
-      const trainingResult = await response.json();
+      // Training runs as a background job, poll until it finishes
+      const { job_id } = await response.json();
+      let job;
+      do {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const jobResponse = await fetch(`http://localhost:8000/jobs/${job_id}`);
+        if (!jobResponse.ok) {
+          throw new Error(`Training failed: ${jobResponse.status}`);
+        }
+        job = await jobResponse.json();
+        if (job.status === 'pending' && job.queue_position) {
+          setCurrentStep(`Waiting in queue (position ${job.queue_position})...`);
+        }
+      } while (job.status === 'pending' || job.status === 'running');
+
+      if (job.status !== 'completed') {
+        throw new Error(job.error || `Training ${job.status}`);
+      }
+
+      const trainingResult = job.result;
       setProgress(100);
       setCurrentStep('Training completed!');
       setResult(trainingResult);